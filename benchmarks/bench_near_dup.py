@@ -0,0 +1,138 @@
+"""
+Near-duplicate verdict reuse (src/near_duplicate.py) on the project's own phrases.
+
+The corpus is every rule phrase (plain and wrapped in UI text), the T4skforce attack
+strings and benign dashboard text, each labelled attack or benign. For each Jaccard
+threshold:
+
+  * variant recall   templated variants of a stored phrase that get the phrase's own
+                     verdict, per kind: other numbers / IPs, an appended timestamp,
+                     one word swapped
+  * false merges     lookups answered by a representative with the OTHER label:
+                     a variant matched to the wrong phrase, or (leave-one-out) a
+                     corpus phrase matched to another one while itself not stored
+  * cross merges     lookups answered by a different phrase with the same label
+  * cost             microseconds per lookup
+
+No browser or models are needed: verdicts are the labels themselves.
+
+    python benchmarks/bench_near_dup.py
+    python benchmarks/bench_near_dup.py --thresholds 0.6 0.8 1.0 --json near_dup.json
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+from src.near_duplicate import NearDuplicateIndex
+from src.rule_engine import default_engine
+from synthetic_dom import BENIGN_ROWS, HIDDEN_TEXTS, INJECTION_TEXTS, BUTTON_LABELS, PHISHING_PROMPTS, NAV_LINKS
+
+BENIGN = [
+    "Welcome to your account dashboard", "Please sign in to continue", "Contact our support team 24/7",
+    "Copyright 2024 Secure Bank", "View your transaction history", "Settings and privacy policy",
+    "Search results for kittens", "Subscribe to our newsletter", "Terms of service and cookie preferences",
+    "System status: all services operational", "Transfer money between your own accounts",
+    # attacks.js network-logs lines
+    "> SRC: 192.168.0.44", "> TARGET: /admin/login", "> FIREWALL: BLOCKING...", "> LATENCY: 432ms",
+    "> HASH: 8f4a2c9e...", "> PORT: 443 OPEN",
+] + [row.format(i=7) for row in BENIGN_ROWS] + NAV_LINKS
+
+
+def corpus():
+    """(text, label) pairs, label 1 = attack"""
+    attacks = HIDDEN_TEXTS + INJECTION_TEXTS + BUTTON_LABELS + [t for pair in PHISHING_PROMPTS for t in pair]
+    rules = json.loads((ROOT / "rules" / "default.json").read_text(encoding="utf-8"))
+    for spec in rules["rulesets"].values():
+        for entry in spec.get("rules", []):
+            phrase = entry if isinstance(entry, str) else entry.get("phrase")
+            if phrase: attacks += [phrase, f"Please {phrase} to continue", f"URGENT: {phrase} immediately"]
+    pairs = [(t, 0) for t in BENIGN] + [(t, 1) for t in attacks]
+    return list(dict.fromkeys(pairs))
+
+
+KINDS = ("numbers", "timestamp", "word")
+
+
+def variants(text, rng, vocabulary):
+    """(kind, variant) re-renders of text"""
+    out = [("timestamp", f"{text} at {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}")]
+    if re.search(r"\d", text):
+        out.append(("numbers", re.sub(r"\d+", lambda m: str(rng.randint(0, 10 ** len(m.group(0)))), text)))
+    words = text.split()
+    if len(words) >= 4:
+        i = rng.randrange(len(words))
+        out.append(("word", " ".join(words[:i] + [rng.choice(vocabulary)] + words[i + 1:])))
+    return out
+
+
+def measure(rules, pairs, threshold, rng):
+    vocabulary = sorted({w for text, _ in pairs for w in text.split()})
+    index = NearDuplicateIndex(rules, threshold=threshold)
+    index.put_many([t for t, _ in pairs], pairs)
+
+    lookups = false = cross = 0
+    per_kind = {kind: [0, 0] for kind in KINDS}   # kind -> [own verdict, lookups]
+    elapsed = 0.0
+    for text, label in pairs:
+        kinds, queries = zip(*variants(text, rng, vocabulary))
+        t0 = time.perf_counter()
+        verdicts = index.get_many(list(queries))
+        elapsed += time.perf_counter() - t0
+        lookups += len(queries)
+        for kind, verdict in zip(kinds, verdicts):
+            per_kind[kind][1] += 1
+            if verdict is None: continue
+            if verdict == (text, label): per_kind[kind][0] += 1
+            elif verdict[1] != label: false += 1
+            else: cross += 1
+
+    # Leave-one-out: a phrase that is not stored must not borrow another label
+    loo_false = loo_cross = 0
+    for k, (text, label) in enumerate(pairs):
+        others = pairs[:k] + pairs[k + 1:]
+        index = NearDuplicateIndex(rules, threshold=threshold)
+        index.put_many([t for t, _ in others], others)
+        verdict = index.get_many([text])[0]
+        if verdict is None: continue
+        if verdict[1] != label: loo_false += 1
+        else: loo_cross += 1
+
+    return {
+        "threshold": threshold, "phrases": len(pairs), "lookups": lookups,
+        "recall": {kind: own / n if n else 0.0 for kind, (own, n) in per_kind.items()}, "false_merges": false + loo_false,
+        "false_merge_rate": (false + loo_false) / (lookups + len(pairs)), "cross_merges": cross + loo_cross,
+        "us_per_lookup": elapsed / lookups * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9, 1.0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results here")
+    args = parser.parse_args()
+
+    rules = default_engine()
+    pairs = corpus()
+    print(f"{len(pairs)} phrases ({sum(l for _, l in pairs)} attack)\n")
+    print(f"{'JACCARD':>7} | {'NUMBERS':>7} | {'TIMESTAMP':>9} | {'WORD':>6} | {'FALSE':>5} | {'FALSE %':>7} | {'CROSS':>5} | {'US/LOOKUP':>9}")
+    results = []
+    for threshold in args.thresholds:
+        r = measure(rules, pairs, threshold, random.Random(args.seed))
+        results.append(r)
+        recall = r["recall"]
+        print(f"{threshold:>7.2f} | {recall['numbers']:>7.1%} | {recall['timestamp']:>9.1%} | {recall['word']:>6.1%} | {r['false_merges']:>5} | {r['false_merge_rate']:>6.2%} | "
+              f"{r['cross_merges']:>5} | {r['us_per_lookup']:>9.1f}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Scan cost regression suite.
+
+For each page size, a synthetic adversarial page (benchmarks/synthetic_dom.py) is
+loaded in headless Chromium from a file:// URL or a localhost server, and the suite
+times:
+
+  * BrowserBodyguard.scan_page end to end (full rescan every run)
+  * the DOM snapshot and every scanner in analyze_snapshot on its own
+  * SecurityBrain.predict_threat latency for texts Tier 1 clears on its own and for
+    texts that escalate to Tier 2, plus predict_batch throughput
+
+The verdict cache and near-duplicate reuse are off so every run pays for inference.
+Results go to a JSON file stamped with the git commit; pass the file of an earlier
+commit as --baseline to list the metrics that got slower.
+
+    python benchmarks/bench_scan.py                                   # 1k, 5k, 20k, 50k nodes
+    python benchmarks/bench_scan.py --sizes 1000 10000 --density 0.05 --injections 5 --serve
+    python benchmarks/bench_scan.py -o after.json --baseline before.json --tolerance 0.15
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from playwright.sync_api import sync_playwright
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+from src.ai_brain import SecurityBrain
+from src.bodyguard import BrowserBodyguard
+from src.page_scripts import SNAPSHOT_JS
+from src.scanners import analyze_snapshot
+from synthetic_dom import (HIDDEN_STYLES, BENIGN_ROWS, HIDDEN_TEXTS, INJECTION_TEXTS, write_page,
+                           serve_directory)
+
+SCANNERS = ("phishing_only", "risky_buttons", "overlays", "hidden_css", "visible_injection")
+
+
+def _stats(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {"p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99)),
+            "min_ms": float(ms.min()), "runs": len(ms)}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def bench_page(browser, url, size, manifest, brain, runs):
+    page = browser.new_page()
+    # remediate=False: a blocked element would change the DOM the next run scans
+    guard = BrowserBodyguard(page, brain=brain, remediate=False)
+    page.goto(url)
+    page.wait_for_timeout(manifest["inject_delay_ms"] + 500)
+
+    scans, snapshots, findings = [], [], []
+    per_scanner = {name: [] for name in SCANNERS}
+    for _ in range(runs):
+        guard.request_full_scan()
+        guard.known_threats.clear()
+        t0 = time.perf_counter()
+        guard.scan_page()
+        scans.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        nodes = page.evaluate(SNAPSHOT_JS, False)["nodes"]
+        snapshots.append(time.perf_counter() - t0)
+        timings = {}
+        findings = analyze_snapshot(nodes, guard.rules, brain, timings=timings)
+        for name in SCANNERS: per_scanner[name].append(timings.get(name, 0.0))
+    page.close()
+
+    found = {}
+    for finding in findings:
+        found[finding["threat_type"]] = found.get(finding["threat_type"], 0) + 1
+    return {
+        "size": size, "page": manifest, "snapshot_nodes": len(nodes), "findings": found,
+        "scan_page": _stats(scans), "snapshot": _stats(snapshots),
+        "scanners": {name: _stats(times) for name, times in per_scanner.items()},
+    }
+
+
+def bench_brain(brain, rounds):
+    tier1_texts = [row.format(i=i) for i in range(20) for row in BENIGN_ROWS]
+    # Every one of these carries a tier2_triggers keyword, so it always escalates
+    tier2_texts = HIDDEN_TEXTS + INJECTION_TEXTS
+    result = {}
+    for name, texts in (("tier1", tier1_texts), ("tier2", tier2_texts)):
+        brain.predict_batch(texts[:4])  # warm-up
+        latencies = []
+        for _ in range(rounds):
+            for text in texts:
+                t0 = time.perf_counter()
+                brain.predict_threat(text)
+                latencies.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        brain.predict_batch(texts)
+        result[name] = {**_stats(latencies), "batch_texts_per_s": len(texts) / (time.perf_counter() - t0),
+                        "texts": len(texts)}
+    return result
+
+
+def compare(current, baseline, tolerance):
+    """(metric, before_ms, after_ms) for every p50 that grew by more than `tolerance`"""
+    def flatten(report):
+        out = {}
+        for entry in report.get("pages", []):
+            key = f"{entry['size']}n"
+            out[f"{key}.scan_page"] = entry["scan_page"]["p50_ms"]
+            out[f"{key}.snapshot"] = entry["snapshot"]["p50_ms"]
+            for name, stats in entry["scanners"].items(): out[f"{key}.{name}"] = stats["p50_ms"]
+        for name, stats in report.get("brain", {}).items(): out[f"brain.{name}"] = stats["p50_ms"]
+        return out
+
+    before, after = flatten(baseline), flatten(current)
+    return [(metric, before[metric], ms) for metric, ms in after.items()
+            if metric in before and ms > before[metric] * (1 + tolerance)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 50000], help="elements per page")
+    parser.add_argument("--density", type=float, default=0.01, help="fraction of cards carrying an attack")
+    parser.add_argument("--hidden", nargs="+", choices=HIDDEN_STYLES, default=list(HIDDEN_STYLES))
+    parser.add_argument("--injections", type=int, default=2, help="attack cards appended by script after load")
+    parser.add_argument("--serve", action="store_true", help="load the pages from a localhost server instead of file://")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20, help="single-text latency passes for the brain")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="bench_scan.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p50 growth counted as a regression")
+    args = parser.parse_args()
+
+    brain = SecurityBrain(tier2="eager", cache_size=0, near_dup_threshold="off")
+    report = {"commit": _commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "python": platform.python_version(), "machine": platform.machine(),
+              "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+              "pages": [], "brain": bench_brain(brain, args.rounds)}
+
+    print(f"{'NODES':>6} | {'SCAN P50':>9} | {'SNAPSHOT':>9} | " + " | ".join(f"{n[:12]:>12}" for n in SCANNERS)
+          + f" | {'FINDINGS':>8}")
+    with tempfile.TemporaryDirectory() as tmp, sync_playwright() as p:
+        server, base = serve_directory(tmp) if args.serve else (None, None)
+        browser = p.chromium.launch(headless=True)
+        for size in args.sizes:
+            path = Path(tmp) / f"synthetic-{size}.html"
+            manifest = write_page(path, nodes=size, density=args.density, hidden_styles=args.hidden,
+                                  injections=args.injections, seed=args.seed)
+            url = f"{base}/{path.name}" if server else path.as_uri()
+            entry = bench_page(browser, url, size, manifest, brain, args.runs)
+            report["pages"].append(entry)
+            print(f"{manifest['nodes']:>6} | {entry['scan_page']['p50_ms']:>6.1f} ms | {entry['snapshot']['p50_ms']:>6.1f} ms | "
+                  + " | ".join(f"{entry['scanners'][n]['p50_ms']:>9.2f} ms" for n in SCANNERS)
+                  + f" | {sum(entry['findings'].values()):>8}")
+        browser.close()
+        if server: server.shutdown()
+
+    for name, stats in report["brain"].items():
+        print(f"🧠 predict_threat {name}: p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+              f"batch {stats['batch_texts_per_s']:.0f} texts/s")
+
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"📄 results -> {args.output}")
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for metric, before, after in regressions:
+            print(f"   ⚠️ {metric}: {before:.2f} ms -> {after:.2f} ms (+{(after / before - 1) * 100:.0f}%)")
+        if regressions: sys.exit(1)
+        print(f"   ✅ no p50 regression over {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+BEFORE / AFTER: per-element Playwright scanning vs. the single-call DOM snapshot.
+
+Loads the T4skforce demo page (optionally padded with extra <div>s to look like a
+real dashboard), waits for the delayed attacks.js injections and times how long it
+takes to pull the data the four BrowserBodyguard scanners need.
+
+    python benchmarks/bench_snapshot.py            # demo page as-is
+    python benchmarks/bench_snapshot.py --pad 3000 # + 3000 divs
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src.bodyguard import SNAPSHOT_JS
+
+DEMO_PAGE = Path(__file__).resolve().parent.parent / "T4skforce client" / "index.html"
+
+HIDDEN_STYLE_JS = """el => {
+    const s = window.getComputedStyle(el);
+    return { opacity: s.opacity, fontSize: s.fontSize, visibility: s.visibility, display: s.display, left: s.left, position: s.position, zIndex: s.zIndex, transform: s.transform, height: s.height, width: s.width }
+}"""
+
+
+def legacy_extract(page):
+    """The old data path: locator().all() + one or more IPC calls per element."""
+    calls = 0
+    for btn in page.locator("button, a, div[role='button'], div[class*='btn'], span[class*='btn']").all():
+        try: btn.inner_text(); calls += 1
+        except: pass
+    for el in page.locator("input").all():
+        try:
+            el.get_attribute("placeholder"); el.evaluate("el => el.parentElement.innerText"); calls += 2
+        except: pass
+    for el in page.locator("div, p, span, h1, h2, h3, a").all():
+        try:
+            text = el.inner_text().strip(); calls += 1
+            if len(text) < 5: continue
+            el.evaluate(HIDDEN_STYLE_JS); calls += 1
+        except: pass
+    for el in page.locator("p, h1, h2, h3, h4, span, div, pre, code").all():
+        try: el.inner_text(); calls += 1
+        except: pass
+    return calls
+
+
+def pad_page(page, count):
+    page.evaluate("""n => {
+        const box = document.createElement('div');
+        for (let i = 0; i < n; i++) {
+            const d = document.createElement('div');
+            d.className = 'row';
+            d.innerText = 'Ledger entry #' + i + ' settled';
+            box.appendChild(d);
+        }
+        document.body.appendChild(box);
+    }""", count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pad", type=int, default=0, help="extra <div> rows appended to the page")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.goto(DEMO_PAGE.as_uri())
+        page.wait_for_timeout(6500)  # let the 4.5s / 6s injections land
+        if args.pad: pad_page(page, args.pad)
+
+        legacy, snap, calls, nodes = [], [], 0, 0
+        for _ in range(args.runs):
+            t0 = time.perf_counter(); calls = legacy_extract(page); legacy.append(time.perf_counter() - t0)
+            t0 = time.perf_counter(); nodes = len(page.evaluate(SNAPSHOT_JS, False)["nodes"]); snap.append(time.perf_counter() - t0)
+        browser.close()
+
+    best_legacy, best_snap = min(legacy) * 1000, min(snap) * 1000
+    print(f"📄 {DEMO_PAGE.name} (+{args.pad} divs), best of {args.runs}")
+    print(f"   ├─ BEFORE  per-element : {best_legacy:9.1f} ms  ({calls} IPC calls)")
+    print(f"   ├─ AFTER   snapshot    : {best_snap:9.1f} ms  (1 IPC call, {nodes} nodes)")
+    print(f"   └─ SPEEDUP             : {best_legacy / max(best_snap, 1e-6):9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Tier 2 encoder backends (src/encoders.py) against the full-precision reference:
+
+  * embedding agreement  cosine(backend, reference) per text: mean / min
+  * verdict agreement    same side of the 0.35 semantic threshold AND same category
+                         against SecurityBrain.threat_concepts
+  * latency              p50 / p99 of one encode() per text (the predict_threat path)
+                         and texts/s for one batched encode
+  * memory               peak RSS of a fresh process that loaded the backend
+
+Each backend runs in its own spawned process so RSS is not shared between them.
+
+    python benchmarks/bench_tier2_backends.py
+    python benchmarks/bench_tier2_backends.py --backends torch int8 onnx-int8 --json tier2.json
+"""
+import argparse
+import json
+import multiprocessing as mp
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from src.ai_brain import TIER2_MODEL_NAME, stack_concepts, best_concepts, _normalize
+from src.encoders import BACKENDS, load_encoder
+
+THRESHOLD = 0.35  # SecurityBrain._intent_verdict
+
+BENIGN = [
+    "Welcome to your account dashboard", "Contact our support team 24/7", "View your transaction history",
+    "Settings and privacy policy", "Search results for kittens", "Read our latest product review",
+    "Transfer money between your own accounts", "System status: all services operational",
+    "Subscribe to our newsletter", "Terms of service and cookie preferences",
+]
+
+
+def _corpus():
+    """Every rule phrase + the T4skforce demo strings + benign UI text"""
+    texts = list(BENIGN)
+    rules = json.loads((ROOT / "rules" / "default.json").read_text(encoding="utf-8"))
+    for spec in rules["rulesets"].values():
+        for entry in spec.get("rules", []):
+            phrase = entry if isinstance(entry, str) else entry.get("phrase")
+            if phrase:
+                texts += [phrase, f"Please {phrase} to continue", f"URGENT: {phrase} immediately"]
+    demo = ROOT / "T4skforce client" / "index.html"
+    if demo.exists():
+        from src.static_scanner import StaticScanner
+        texts += [t["text"] for t in StaticScanner().scan_file(str(demo))["threats"] if t.get("text")]
+    return list(dict.fromkeys(texts))
+
+
+def _threat_concepts():
+    from src.ai_brain import SecurityBrain
+    return SecurityBrain(tier2="lazy", cache_size=0).threat_concepts
+
+
+def _measure(backend, texts, concepts, rounds):
+    t0 = time.perf_counter()
+    encoder = load_encoder(TIER2_MODEL_NAME, backend)
+    load_s = time.perf_counter() - t0
+    encoder.encode(texts[:8])  # warm-up
+
+    latencies = []
+    for _ in range(rounds):
+        for text in texts:
+            t0 = time.perf_counter()
+            encoder.encode([text])
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    vectors = _normalize(encoder.encode(texts))
+    batch_s = time.perf_counter() - t0
+
+    categories, matrix, _, starts = stack_concepts({c: encoder.encode(p) for c, p in concepts.items()})
+    scores = [(float(s), c) for s, c in best_concepts(vectors, matrix, starts, categories)]
+    return {
+        "backend": backend, "vectors": vectors.tolist(), "scores": scores, "load_s": load_s,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000), "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "batch_texts_per_s": len(texts) / batch_s,
+        # Linux reports ru_maxrss in KiB
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _run(args):
+    try:
+        return _measure(*args)
+    except Exception as e:
+        return {"backend": args[0], "error": f"{type(e).__name__}: {e}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--reference", choices=BACKENDS, default="torch")
+    parser.add_argument("--rounds", type=int, default=3, help="single-text latency passes over the corpus")
+    parser.add_argument("--json", help="also write the results here")
+    args = parser.parse_args()
+
+    texts, concepts = _corpus(), _threat_concepts()
+    backends = [args.reference] + [b for b in args.backends if b != args.reference]
+    ctx = mp.get_context("spawn")
+    results = {}
+    for backend in backends:
+        with ctx.Pool(1) as pool:
+            results[backend] = pool.apply(_run, ((backend, texts, concepts, args.rounds),))
+
+    ref = results[args.reference]
+    if "error" in ref:
+        sys.exit(f"reference backend failed: {ref['error']}")
+    ref_vectors = np.asarray(ref["vectors"])
+
+    print(f"{len(texts)} texts, reference = {args.reference}\n")
+    print(f"{'BACKEND':<10} | {'COS MEAN':>8} | {'COS MIN':>7} | {'VERDICTS':>8} | {'FLIPS':>5} | "
+          f"{'P50 (ms)':>8} | {'P99 (ms)':>8} | {'BATCH/s':>8} | {'RSS (MB)':>8}")
+    report = {"texts": len(texts), "reference": args.reference, "threshold": THRESHOLD, "backends": {}}
+    for backend in backends:
+        r = results[backend]
+        if "error" in r:
+            print(f"{backend:<10} | unavailable: {r['error']}")
+            report["backends"][backend] = {"error": r["error"]}
+            continue
+        cos = np.sum(np.asarray(r["vectors"]) * ref_vectors, axis=1)
+        flips = [text for text, (s, c), (rs, rc) in zip(texts, r["scores"], ref["scores"])
+                 if (s > THRESHOLD) != (rs > THRESHOLD) or (s > THRESHOLD and c != rc)]
+        agreement = 1 - len(flips) / len(texts)
+        print(f"{backend:<10} | {cos.mean():>8.4f} | {cos.min():>7.4f} | {agreement:>7.1%} | {len(flips):>5} | "
+              f"{r['p50_ms']:>8.2f} | {r['p99_ms']:>8.2f} | {r['batch_texts_per_s']:>8.0f} | {r['rss_mb']:>8.0f}")
+        report["backends"][backend] = {
+            "cosine_mean": float(cos.mean()), "cosine_min": float(cos.min()), "verdict_agreement": agreement,
+            "flips": flips, **{k: r[k] for k in ("load_s", "p50_ms", "p99_ms", "batch_texts_per_s", "rss_mb")},
+        }
+        for text in flips[:5]:
+            print(f"{'':<10} |   flip: {text[:70]!r}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, font
+import os
+import queue
 import threading
 import time
+from collections import deque
 from playwright.sync_api import sync_playwright
 from src.bodyguard import BrowserBodyguard
+from src.scheduler import ScanScheduler
+from src.metrics import METRICS
+
+# Live feed: scanner threads only enqueue, the Tk thread drains once per frame
+FRAME_MS = 50                   # render cadence
+MAX_EVENTS_PER_FRAME = 5000     # bounds the work one frame can do; the rest waits for the next one
+MAX_ROWS = 2000                 # ring buffer (and table) size, oldest rows are evicted
+LEVELS = ("ALL", "CRITICAL", "WARNING", "SYSTEM")
+
 
 class AegisDashboard:
     def __init__(self, root):
@@ -109,11 +121,39 @@ class AegisDashboard:
                                   width=12, state="disabled", cursor="hand2")
         self.stop_btn.pack(side="left", padx=5)
 
+        # =================================================================
+        # 2b. ENGINE METRICS (opt-in: AEGIS_METRICS=1 turns collection and this panel on)
+        # =================================================================
+        self.metrics_label = None
+        if METRICS.enabled:
+            METRICS.enable(port=os.environ.get("AEGIS_METRICS_PORT"))
+            self.metrics_label = tk.Label(root, text="", font=("Consolas", 10), anchor="w",
+                                          bg=self.colors["bg_panel"], fg=self.colors["neon_cyan"], padx=10, pady=6)
+            self.metrics_label.pack(fill="x", padx=25, pady=(10, 0))
+            self.refresh_metrics()
+
         # =================================================================
         # 3. DATA TABLE
         # =================================================================
-        tk.Label(root, text="LIVE THREAT FEED", font=("Impact", 16), 
-                 bg=self.colors["bg_dark"], fg="#444").pack(anchor="w", padx=25, pady=(30, 5))
+        feed_bar = tk.Frame(root, bg=self.colors["bg_dark"])
+        feed_bar.pack(fill="x", padx=25, pady=(30, 5))
+        tk.Label(feed_bar, text="LIVE THREAT FEED", font=("Impact", 16), 
+                 bg=self.colors["bg_dark"], fg="#444").pack(side="left")
+
+        # Filter: level + free text over threat / target / details; re-renders from the ring buffer
+        self.filter_level = tk.StringVar(value="ALL")
+        self.filter_text = tk.StringVar()
+        self.feed_count_label = tk.Label(feed_bar, text="", font=("Consolas", 10), bg=self.colors["bg_dark"], fg="#666")
+        self.feed_count_label.pack(side="right")
+        filter_entry = tk.Entry(feed_bar, textvariable=self.filter_text, font=("Consolas", 11), bg="#1a1a1a",
+                                fg="white", insertbackground="white", relief="flat", width=24)
+        filter_entry.pack(side="right", padx=10, ipady=4)
+        level_box = ttk.Combobox(feed_bar, textvariable=self.filter_level, values=LEVELS, state="readonly", width=10)
+        level_box.pack(side="right")
+        tk.Label(feed_bar, text="FILTER:", font=("Consolas", 10, "bold"),
+                 bg=self.colors["bg_dark"], fg=self.colors["neon_cyan"]).pack(side="right", padx=(0, 5))
+        self.filter_level.trace_add("write", lambda *_: self.rerender_feed())
+        self.filter_text.trace_add("write", lambda *_: self.rerender_feed())
 
         table_frame = tk.Frame(root, bg=self.colors["bg_dark"])
         table_frame.pack(fill="both", expand=True, padx=25, pady=(0, 25))
@@ -148,42 +188,110 @@ class AegisDashboard:
 
         self.browser_running = False
 
+        # --- EVENT FEED ---
+        self.events = queue.SimpleQueue()     # (kind, payload) from any thread
+        self.rows = deque(maxlen=MAX_ROWS)    # (tag, values), oldest first
+        self.shown = 0                        # rows currently in the Treeview
+        self.total_events = 0
+        self.root.after(FRAME_MS, self.drain_events)
+
     # --- LOGIC ---
     def gui_callback(self, type, data):
+        # Called from scanning threads: parse here, never touch Tk
         if type == "log":
-            try:
-                parts = data.split(":::")
-                if len(parts) == 5:
-                    level, threat, target, action, reason = parts
-                    self.add_table_row(level, threat, target, action, reason)
-            except: pass
+            parts = data.split(":::", 4)
+            if len(parts) == 5:
+                self.add_table_row(*parts)
         elif type == "score":
             self.update_score(data)
 
     def add_table_row(self, level, threat, target, action, reason):
-        def _update():
-            timestamp = time.strftime('%H:%M:%S')
-            tag = "INFO"
-            if "CRITICAL" in level: tag = "CRITICAL"
-            elif "WARNING" in level: tag = "WARNING"
-            elif "INFO" in level: tag = "SYSTEM"
-            
-            self.tree.insert("", 0, values=(timestamp, threat, target, action, reason), tags=(tag,))
-        self.root.after_idle(_update)
+        tag = "INFO"
+        if "CRITICAL" in level: tag = "CRITICAL"
+        elif "WARNING" in level: tag = "WARNING"
+        elif "INFO" in level: tag = "SYSTEM"
+        self.events.put(("row", (tag, (time.strftime('%H:%M:%S'), threat, target, action, reason))))
 
     def update_score(self, score):
-        def _update():
-            color = self.colors["neon_green"]
-            status = "(SECURE)"
-            if score > 30: 
-                color = self.colors["neon_yellow"]
-                status = "(ELEVATED)"
-            if score > 70: 
-                color = self.colors["neon_red"]
-                status = "(CRITICAL)"
-            
-            self.risk_val_label.config(text=f"{score}/100 {status}", fg=color)
-        self.root.after_idle(_update)
+        self.events.put(("score", score))
+
+    def drain_events(self):
+        """One frame: pull what is queued, keep only the latest score, insert the new rows in one pass"""
+        new_rows, score = [], None
+        try:
+            for _ in range(MAX_EVENTS_PER_FRAME):
+                kind, payload = self.events.get_nowait()
+                if kind == "row": new_rows.append(payload)
+                elif kind == "score": score = payload
+                elif kind == "clear":
+                    new_rows.clear()
+                    self.rows.clear()
+                    self.rerender_feed()
+        except queue.Empty: pass
+
+        if new_rows:
+            self.total_events += len(new_rows)
+            self.rows.extend(new_rows)
+            # More than a table's worth in one frame: only the newest MAX_ROWS can be visible anyway
+            for tag, values in new_rows[-MAX_ROWS:]:
+                if self._matches(tag, values): self._insert_row(tag, values)
+            self._evict_rows()
+            self._update_feed_count()
+        if score is not None: self._render_score(score)
+        self.root.after(FRAME_MS, self.drain_events)
+
+    def _matches(self, tag, values):
+        level = self.filter_level.get()
+        if level != "ALL" and tag != level: return False
+        needle = self.filter_text.get().strip().lower()
+        return not needle or any(needle in str(v).lower() for v in values[1:])
+
+    def _insert_row(self, tag, values):
+        self.tree.insert("", 0, values=values, tags=(tag,))
+        self.shown += 1
+
+    def _evict_rows(self):
+        if self.shown <= MAX_ROWS: return
+        children = self.tree.get_children()
+        self.tree.delete(*children[MAX_ROWS:])
+        self.shown = MAX_ROWS
+
+    def rerender_feed(self):
+        """Filter changed (or feed cleared): rebuild the table from the ring buffer"""
+        children = self.tree.get_children()
+        if children: self.tree.delete(*children)
+        self.shown = 0
+        for tag, values in self.rows:
+            if self._matches(tag, values): self._insert_row(tag, values)
+        self._update_feed_count()
+
+    def _update_feed_count(self):
+        self.feed_count_label.config(text=f"{self.shown} shown / {len(self.rows)} kept / {self.total_events} events")
+
+    def _render_score(self, score):
+        color = self.colors["neon_green"]
+        status = "(SECURE)"
+        if score > 30: 
+            color = self.colors["neon_yellow"]
+            status = "(ELEVATED)"
+        if score > 70: 
+            color = self.colors["neon_red"]
+            status = "(CRITICAL)"
+        
+        self.risk_val_label.config(text=f"{score}/100 {status}", fg=color)
+
+    def refresh_metrics(self):
+        summary = METRICS.summary()
+        c, stages = summary["counters"], summary["stages"]
+        scan = stages.get("scan_page", {})
+        decided = c["tier1_decisions"] + c["tier2_decisions"] + c["tier2_fallbacks"]
+        looked_up = c["cache_hits"] + c["cache_misses"]
+        self.metrics_label.config(text=(
+            f"SCAN p50 {scan.get('p50_ms', 0):.1f}ms p99 {scan.get('p99_ms', 0):.1f}ms  |  "
+            f"SCANS {c['scans']}  |  ELEMENTS {c['elements_scanned']}  |  FLAGGED {c['threats_flagged']}  |  "
+            f"TIER 2 {c['tier2_decisions'] / max(decided, 1):.0%}  |  CACHE HIT {c['cache_hits'] / max(looked_up, 1):.0%}  |  "
+            f"ROUND TRIPS {c['playwright_round_trips']}"))
+        self.root.after(1000, self.refresh_metrics)
 
     def start_scan_thread(self):
         url = self.url_entry.get()
@@ -192,9 +300,8 @@ class AegisDashboard:
         self.scan_btn.config(state="disabled", bg="#333", fg="#555")
         self.stop_btn.config(state="normal", bg=self.colors["neon_red"], fg="black")
         
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
+        # Through the queue, so rows still in flight from a previous session are dropped too
+        self.events.put(("clear", None))
         self.add_table_row("INFO", "System", "Agent", "INIT", "Defense Protocols Engaged...")
 
         threading.Thread(target=self.run_browser, args=(url,), daemon=True).start()
@@ -206,13 +313,15 @@ class AegisDashboard:
             page = context.new_page()
 
             guard = BrowserBodyguard(page, self.gui_callback)
+            # Documents / scripts are scanned before they render (AEGIS_INTERCEPT=monitor|annotate|block|off)
+            policy = os.environ.get("AEGIS_INTERCEPT", "annotate")
+            if policy != "off": guard.intercept_responses(policy)
             
             if not url.startswith("http"): url = "https://" + url
             try:
                 page.goto(url)
-                while self.browser_running:
-                    guard.scan_page()
-                    page.wait_for_timeout(2000)
+                # Scan frequency follows mutations / navigations / visibility, interactive threats first
+                ScanScheduler(guard).run(lambda: self.browser_running)
             except: pass
             
             browser.close()
@@ -1,30 +1,65 @@
 import os
+import json
+import hashlib
+import threading
 import joblib
 import numpy as np
 import warnings
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.pipeline import make_pipeline
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from .verdict_cache import VerdictCache
+from .near_duplicate import NearDuplicateIndex
+from .rule_engine import default_engine
+from .fast_tier1 import load_exported, compile_pipeline
+from .encoders import load_encoder, encoder_id, DEFAULT_BACKEND
+from .metrics import METRICS
 
 # Silence warnings for a clean demo output
 warnings.filterwarnings("ignore")
 
+TIER2_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Where derived artefacts (concept embeddings, ...) are cached between runs
+CACHE_DIR = os.environ.get("AEGIS_CACHE_DIR", ".aegis_cache")
+
 class SecurityBrain:
-    def __init__(self):
+    def __init__(self, cache_size=50000, cache_path=None, rules=None, tier2="background", tier2_socket=None, tier2_backend=None, tier1=None, threat_index=None, near_dup_threshold=None):
         print("⚡ INITIALIZING HYBRID SECURITY ENGINE...")
+
+        # Trigger List (Keywords that force a deep scan regardless of ML score) -> ruleset 'tier2_triggers'
+        self.rules = rules or default_engine()
         
         # --- TIER 1: HIGH-SPEED REFLEX (Random Forest) ---
         self.model_path = "security_model.pkl"
+        # "fast": the pkl flattened into NumPy arrays (src/fast_tier1.py), "sklearn": the pipeline itself
+        self.tier1_engine = tier1 or os.environ.get("AEGIS_TIER1", "fast")
         print("   ├─ Loading Tier 1 (Random Forest Reflex)... ", end="")
         self.tier1_model = self._load_or_train_tier1()
         print("DONE.")
 
         # --- TIER 2: DEEP SEMANTIC REASONING (Transformer) ---
         # This is the "Local LLM" that understands intent.
-        print("   ├─ Loading Tier 2 (Semantic Transformer)... ", end="")
-        self.tier2_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Importing + loading it dominates cold start, so it never blocks Tier 1:
+        #   "background" -> warm up in a thread, Tier 1 serves meanwhile
+        #   "lazy"       -> load on the first escalation
+        #   "eager"      -> load right here (old behaviour)
+        # With a shared inference server (src/inference_server.py) the local model is only a
+        # fallback, so it is never loaded unless the server is unreachable.
+        tier2_socket = tier2_socket or os.environ.get("AEGIS_TIER2_SOCKET")
+        self.tier2_client = None
+        if tier2_socket:
+            from .inference_server import InferenceClient
+            self.tier2_client = InferenceClient(tier2_socket)
+            tier2 = "lazy"
+        self.tier2_mode = tier2
+        # Encoder backend (torch / int8 / onnx / onnx-int8, see src/encoders.py)
+        self.tier2_backend = tier2_backend or DEFAULT_BACKEND
+        self.tier2_model = None
+        self._tier2_ready = threading.Event()
+        self._tier2_lock = threading.Lock()
+        # Why a lazy load failed (reported once; Tier 1 answers escalations from then on)
+        self._tier2_error = None
         
         # Knowledge Base of Threat Concepts (Vector Database)
         self.threat_concepts = {
@@ -48,14 +83,121 @@ class SecurityBrain:
             ]
         }
         
-        # Pre-compute vectors for speed (0.00s lookup time)
-        self.concept_vectors = {}
-        for cat, phrases in self.threat_concepts.items():
-            self.concept_vectors[cat] = self.tier2_model.encode(phrases)
-        print("DONE.")
-        
+        if tier2 == "eager":
+            print("   ├─ Loading Tier 2 (Semantic Transformer)... ", end="")
+            self._load_tier2()
+            print("DONE.")
+        elif tier2 == "background":
+            print("   ├─ Tier 2 (Semantic Transformer) warming up in background...")
+            self.warm_tier2()
+        else:
+            print("   ├─ Tier 2 (Semantic Transformer) loads on first escalation.")
+
+        # --- THREAT-EXEMPLAR INDEX: curated attack strings on disk, searched next to the concepts ---
+        threat_index = threat_index or os.environ.get("AEGIS_THREAT_INDEX")
+        self.threat_index = None
+        if threat_index:
+            from .threat_index import ThreatIndex
+            self.threat_index = ThreatIndex(threat_index)
+            if self.threat_index.encoder != self._encoder_id:
+                print(f"⚠️ THREAT INDEX {threat_index} was built with {self.threat_index.encoder}, "
+                      f"not {self._encoder_id} -> ignored")
+                self.threat_index = None
+            else:
+                print(f"   ├─ Threat-exemplar index: {self.threat_index.count} exemplars.")
+
+        # --- VERDICT CACHE: repeated strings (footers, nav, banners) skip inference ---
+        # Persisted to disk when a path is given (or AEGIS_VERDICT_CACHE is set)
+        self.cache = VerdictCache(cache_size, cache_path or os.environ.get("AEGIS_VERDICT_CACHE"))
+        # --- NEAR-DUPLICATE INDEX: templated variants (counters, timestamps, IPs) of an escalated text reuse its Tier 2 verdict ---
+        # Minimum Jaccard similarity of the shingled templates; AEGIS_NEAR_DUP=off turns it off
+        if near_dup_threshold is None: near_dup_threshold = os.environ.get("AEGIS_NEAR_DUP", "0.7")
+        self.near_dups = None
+        if str(near_dup_threshold) != "off":
+            self.near_dups = NearDuplicateIndex(self.rules, threshold=float(near_dup_threshold))
+        self._model_stamp = None
+        self._concepts_stamp = None
+        self._rules_stamp = None
+        self._index_stamp = None
+        self._refresh_if_stale()
+
         print("🚀 AEGIS HYBRID BRAIN READY.")
 
+    def _load_tier2(self):
+        with self._tier2_lock:
+            if self._tier2_ready.is_set(): return
+            self.tier2_model = load_encoder(TIER2_MODEL_NAME, self.tier2_backend)
+            self._build_concept_index()
+            self._tier2_ready.set()
+
+    def _load_tier2_lazily(self):
+        """First escalation in lazy mode. A failed load falls back to Tier 1 like a warm-up, it never raises into a scan"""
+        if self._tier2_error is not None: return
+        try:
+            self._load_tier2()
+        except Exception as e:
+            with self._tier2_lock:
+                if self._tier2_error is not None: return
+                self._tier2_error = e
+            print(f"⚠️ TIER 2 FAILED TO LOAD: {e}")
+
+    def warm_tier2(self):
+        """Loads Tier 2 in a daemon thread; escalations fall back to the Tier 1 heuristic until it is ready"""
+        def _warm():
+            try:
+                self._load_tier2()
+                print("   └─ Tier 2 (Semantic Transformer) READY.")
+            except Exception as e:
+                print(f"⚠️ TIER 2 FAILED TO LOAD: {e}")
+        threading.Thread(target=_warm, name="aegis-tier2-warmup", daemon=True).start()
+
+    @property
+    def tier2_ready(self):
+        return self._tier2_ready.is_set()
+
+    @property
+    def _encoder_id(self):
+        return encoder_id(TIER2_MODEL_NAME, self.tier2_backend)
+
+    def _build_concept_index(self):
+        # Pre-compute vectors for speed (0.00s lookup time), cached on disk per model + phrase set
+        self.concept_vectors = self._load_concept_vectors()
+
+        (self.concept_categories, self.concept_matrix,
+         self.concept_labels, self._category_starts) = stack_concepts(self.concept_vectors)
+
+    def _refresh_if_stale(self):
+        """
+        Cheap per-batch check: if security_model.pkl, threat_concepts, the trigger rules or
+        the threat-exemplar index changed, reload what depends on them and re-key the verdict cache so stale
+        verdicts never hit.
+        """
+        self.rules.maybe_reload()
+        model_stamp = _file_stamp(self.model_path)
+        concepts_stamp = json.dumps(self.threat_concepts, sort_keys=True)
+        rules_stamp = self.rules.version
+        if self.threat_index is not None: self.threat_index.maybe_reload()
+        index_stamp = self.threat_index.version if self.threat_index is not None else ""
+        if ((model_stamp, concepts_stamp, rules_stamp, index_stamp) ==
+                (self._model_stamp, self._concepts_stamp, self._rules_stamp, self._index_stamp)): return
+
+        if self._model_stamp is not None and model_stamp != self._model_stamp:
+            self.tier1_model = self._load_or_train_tier1()
+            model_stamp = _file_stamp(self.model_path)
+        if self._concepts_stamp is not None and concepts_stamp != self._concepts_stamp and self.tier2_ready:
+            with self._tier2_lock: self._build_concept_index()
+
+        self._model_stamp, self._concepts_stamp, self._rules_stamp = model_stamp, concepts_stamp, rules_stamp
+        self._index_stamp = index_stamp
+        version = hashlib.sha1()
+        version.update(_file_digest(self.model_path).encode())
+        version.update(self._encoder_id.encode())
+        version.update(concepts_stamp.encode())
+        version.update(rules_stamp.encode())
+        version.update(index_stamp.encode())
+        self.cache.set_version(version.hexdigest())
+        if self.near_dups is not None: self.near_dups.clear()
+
     def _train_new_tier1(self):
         # DATASET: Safe vs Malicious phrases for Reflex Training
         data = [
@@ -94,9 +236,17 @@ class SecurityBrain:
 
     def _load_or_train_tier1(self):
         if os.path.exists(self.model_path):
-            return joblib.load(self.model_path)
+            if self.tier1_engine == "fast":
+                fast = load_exported(self.model_path)
+                if fast is not None: return fast
+            model = joblib.load(self.model_path)
         else:
-            return self._train_new_tier1()
+            model = self._train_new_tier1()
+
+        # Same verdicts, none of sklearn's per-call overhead
+        if self.tier1_engine == "fast":
+            return compile_pipeline(model, self.model_path) or model
+        return model
 
     def predict_threat(self, text):
         """
@@ -104,44 +254,179 @@ class SecurityBrain:
         1. Fast Check (Tier 1) -> If Safe, return immediately.
         2. Deep Check (Tier 2) -> If Suspicious, analyze intent.
         """
-        if not text or len(text) < 3: return False, 0.0, "Safe"
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts):
+        """
+        Same verdicts as predict_threat, for a whole list of strings at once:
+        Tier 1 runs once over the list, only the escalated subset is encoded
+        (one batched encode) and scored with one matrix multiply.
+        Returns a list of (is_threat, confidence, reason) in input order.
+        """
+        self._refresh_if_stale()
+        results = [(False, 0.0, "Safe")] * len(texts)
+        live = [i for i, t in enumerate(texts) if t and len(t) >= 3]
+        if not live: return results
+
+        # --- STEP 0: VERDICT CACHE ---
+        cached = self.cache.get_many([texts[i] for i in live])
+        for i, verdict in zip(live, cached):
+            if verdict is not None: results[i] = verdict
+        live = [i for i, verdict in zip(live, cached) if verdict is None]
+        METRICS.inc("cache_hits", len(cached) - len(live))
+        METRICS.inc("cache_misses", len(live))
+        if not live: return results
 
         # --- STEP 1: FAST CHECK (0.002s) ---
         # Get probability from Random Forest
-        probs = self.tier1_model.predict_proba([text])[0]
-        malicious_conf = probs[1] * 100
-        
-        # Trigger List (Keywords that force a deep scan regardless of ML score)
-        triggers = ["ignore", "override", "system", "admin", "bypass", "delete", "transfer", "review"]
-        keyword_hit = any(w in text.lower() for w in triggers)
-        
-        # If Tier 1 is confident it's safe AND no keywords found -> Return Fast
-        if malicious_conf < 50 and not keyword_hit:
-             return False, malicious_conf, "Safe Content (Tier 1 Verified)"
+        with METRICS.stage("tier1"):
+            probs = self.tier1_model.predict_proba([texts[i] for i in live])[:, 1]
+
+        escalated = []
+        for i, p in zip(live, probs):
+            malicious_conf = p * 100
+            keyword_hit = bool(self.rules.match("tier2_triggers", texts[i]))
+
+            # If Tier 1 is confident it's safe AND no keywords found -> Return Fast
+            if malicious_conf < 50 and not keyword_hit:
+                results[i] = (False, malicious_conf, "Safe Content (Tier 1 Verified)")
+            else:
+                escalated.append(i)
+        METRICS.inc("tier1_decisions", len(live) - len(escalated))
+
+        # --- STEP 1b: NEAR-DUPLICATES of text Tier 2 already decided (same template, a few words apart) ---
+        if escalated and self.near_dups is not None:
+            near = self.near_dups.get_many([texts[i] for i in escalated])
+            for i, verdict in zip(escalated, near):
+                if verdict is not None: results[i] = verdict
+            unseen = [i for i, verdict in zip(escalated, near) if verdict is None]
+            METRICS.inc("near_dup_hits", len(escalated) - len(unseen))
+            escalated = unseen
 
         # --- STEP 2: DEEP REASONING (0.05s) ---
         # If we are here, Tier 1 is suspicious. We engage Tier 2 to explain WHY.
-        return self._analyze_intent(text)
+        final = live
+        if escalated:
+            escalated_texts = [texts[i] for i in escalated]
+            with METRICS.stage("tier2"):
+                # Shared inference server first (if configured), in-process model otherwise
+                scored = self._score_remote(escalated_texts)
+                if scored is None:
+                    if self.tier2_mode == "lazy": self._load_tier2_lazily()
+                    if self.tier2_ready: scored = self._score_local(escalated_texts)
+
+            if scored is not None:
+                METRICS.inc("tier2_decisions", len(escalated))
+                verdicts = [self._intent_verdict(score, cat) for score, cat in scored]
+            else:
+                METRICS.inc("tier2_fallbacks", len(escalated))
+                # Tier 2 still warming up (or failed to load): answer with the Tier 1 heuristic, but don't cache it
+                verdicts = [TIER1_FALLBACK_VERDICT] * len(escalated)
+                pending = set(escalated)
+                final = [i for i in live if i not in pending]
+            for i, verdict in zip(escalated, verdicts):
+                results[i] = verdict
+            if scored is not None and self.near_dups is not None:
+                self.near_dups.put_many(escalated_texts, verdicts)
+
+        self.cache.put_many([texts[i] for i in final], [results[i] for i in final])
+        return results
 
     def _analyze_intent(self, text):
-        # Convert user text to vector
-        text_vector = self.tier2_model.encode([text])
-        
-        best_cat = "Unknown Threat"
-        max_score = 0.0
-        
-        # Compare against known threat concepts in Vector Space
-        for category, ref_vectors in self.concept_vectors.items():
-            sims = cosine_similarity(text_vector, ref_vectors)
-            score = np.max(sims)
-            if score > max_score:
-                max_score = score
-                best_cat = category
-        
+        return self._analyze_intent_batch([text])[0]
+
+    def _analyze_intent_batch(self, texts):
+        return [self._intent_verdict(score, cat) for score, cat in self._score_local(texts)]
+
+    def _score_local(self, texts):
+        # Convert user text to vectors and compare against ALL known threat concepts at once
+        text_vectors = _normalize(self.tier2_model.encode(texts))
+        scored = best_concepts(text_vectors, self.concept_matrix, self._category_starts, self.concept_categories)
+        if self.threat_index is not None: scored = self.threat_index.merge(text_vectors, scored)
+        return scored
+
+    def _score_remote(self, texts):
+        """
+        (score, category) per text from the shared inference server, or None to fall back in-process.
+        The server applies its own --threat-index, so point both at the same directory.
+        A server running another encoder (--backend) is not used: its scores would be cached
+        under this brain's encoder id.
+        """
+        if self.tier2_client is None: return None
+        return self.tier2_client.score(texts, self.threat_concepts, encoder=self._encoder_id)
+
+    def _intent_verdict(self, max_score, best_cat):
         # Generate "LLM-style" explanation for the GUI
         if max_score > 0.35: # Semantic Threshold
             reason = f"SEMANTIC ANALYSIS: Input aligns ({max_score:.2f} similarity) with '{best_cat}' patterns."
             return True, float(max_score * 100), reason
-            
+
         # Fallback if semantics are weak but Tier 1 flagged it
-        return True, 75.0, f"HEURISTIC: Flagged by Tier 1 Model for suspicious vocabulary."
\ No newline at end of file
+        return TIER1_FALLBACK_VERDICT
+
+    def _load_concept_vectors(self):
+        key = hashlib.sha1((self._encoder_id + json.dumps(self.threat_concepts, sort_keys=True)).encode()).hexdigest()
+        path = os.path.join(CACHE_DIR, f"concepts-{key}.npz")
+        try:
+            with np.load(path) as saved:
+                return {cat: saved[f"v{i}"] for i, cat in enumerate(saved["categories"].tolist())}
+        except (OSError, KeyError, ValueError):
+            pass
+
+        vectors = {cat: self.tier2_model.encode(phrases) for cat, phrases in self.threat_concepts.items()}
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = path + ".tmp.npz"
+            np.savez(tmp, categories=np.array(list(vectors)), **{f"v{i}": v for i, v in enumerate(vectors.values())})
+            os.replace(tmp, path)
+        except OSError: pass
+        return vectors
+
+
+# Verdict for escalated text when semantics are weak (or Tier 2 isn't loaded yet)
+TIER1_FALLBACK_VERDICT = (True, 75.0, "HEURISTIC: Flagged by Tier 1 Model for suspicious vocabulary.")
+
+def _file_stamp(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError: return None
+
+def _file_digest(path):
+    try:
+        with open(path, "rb") as f: return hashlib.sha1(f.read()).hexdigest()
+    except OSError: return ""
+
+def stack_concepts(concept_vectors):
+    """
+    {category: phrase vectors} -> one stacked, L2-normalized concept matrix (rows grouped by
+    category) so a whole batch is scored with ONE matrix multiply.
+    Returns (categories, matrix, labels, category_starts); labels[i] = category index of row i.
+    """
+    categories = list(concept_vectors)
+    matrix = _normalize(np.vstack([concept_vectors[c] for c in categories]))
+    labels = np.concatenate([np.full(len(concept_vectors[c]), i) for i, c in enumerate(categories)])
+    starts = np.flatnonzero(np.r_[True, np.diff(labels) != 0])
+    return categories, matrix, labels, starts
+
+def best_concepts(text_vectors, matrix, category_starts, categories):
+    """(max similarity, category) per normalized text vector, same semantics as the old per-category loop"""
+    sims = text_vectors @ matrix.T
+
+    # Best score per category, then best category (first one wins ties, like the old loop)
+    per_category = np.maximum.reduceat(sims, category_starts, axis=1)
+    best = np.argmax(per_category, axis=1)
+
+    scored = []
+    for row, cat_idx in enumerate(best):
+        max_score = per_category[row, cat_idx]
+        if max_score <= 0.0: scored.append((0.0, "Unknown Threat"))
+        else: scored.append((max_score, categories[cat_idx]))
+    return scored
+
+def _normalize(vectors):
+    """Row-wise L2 normalization (cosine similarity becomes a plain dot product)"""
+    vectors = np.asarray(vectors)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
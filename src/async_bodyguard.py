@@ -0,0 +1,198 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .model_registry import get_brain
+from .rule_engine import default_engine
+from .page_scripts import SNAPSHOT_JS, DEFENSE_JS, HUD_JS, REMEDIATE_JS
+from .scanners import analyze_snapshot, analyze_interactive, is_trusted
+from .threat_ledger import ThreatLedger
+from .metrics import METRICS
+
+
+class AsyncBrowserBodyguard:
+    """
+    asyncio twin of BrowserBodyguard for playwright.async_api pages.
+    Page I/O is awaited; the CPU-bound part (rules + SecurityBrain) runs in an
+    executor so it never stalls the event loop shared with the other tabs.
+
+    Build it with `await AsyncBrowserBodyguard.create(page, ...)`, before page.goto().
+    """
+
+    def __init__(self, page, gui_callback=None, brain=None, executor=None, bus=None, remediate=True):
+        self.page = page
+        # Threat identity, risk score, reporting and budget carry-over (shared with BrowserBodyguard)
+        self.ledger = ThreatLedger(page, gui_callback=gui_callback, bus=bus, remediate=remediate)
+        self.brain = brain or get_brain()
+        self.rules = default_engine()
+        self.executor = executor
+        self._needs_full_scan = True
+        self._last_scan_full = False
+
+        # Only navigations force a full-page rescan; everything else is mutation-driven
+        self.page.on("framenavigated", self._on_navigation)
+
+    @classmethod
+    async def create(cls, page, **kwargs):
+        guard = cls(page, **kwargs)
+        await guard._inject_risk_hud()
+        await guard._inject_persistent_defense()
+        return guard
+
+    @property
+    def risk_score(self):
+        return self.ledger.risk_score
+
+    @property
+    def known_threats(self):
+        return self.ledger.known_threats
+
+    @property
+    def remediate(self):
+        return self.ledger.remediate
+
+    def _on_navigation(self, frame):
+        if frame == self.page.main_frame:
+            self._needs_full_scan = True
+            self.ledger.navigate(frame.url)
+
+    def request_full_scan(self):
+        """Same as BrowserBodyguard.request_full_scan"""
+        self._needs_full_scan = True
+
+    async def _inject_persistent_defense(self):
+        try:
+            await self.page.add_init_script(DEFENSE_JS)
+        except: pass
+
+    async def _inject_risk_hud(self):
+        if not self.remediate: return
+        try:
+            METRICS.inc("playwright_round_trips")
+            await self.page.evaluate(HUD_JS)
+        except: pass
+
+    async def scan_page(self, budget=None):
+        """Same as BrowserBodyguard.scan_page: with a budget, interactive threats are remediated first"""
+        with METRICS.stage("scan_page"):
+            METRICS.inc("scans")
+            report = self.ledger.bus.active
+            t_start = time.perf_counter()
+            await self._inject_risk_hud()
+            self.rules.maybe_reload()
+
+            # Navigations are handled on the loop while this scan awaits the page or the
+            # executor; results for an older document are dropped (ThreatLedger.generation)
+            generation = self.ledger.generation
+            t0 = time.perf_counter()
+            nodes = await self._snapshot_dom(generation)
+            timings = {"snapshot": time.perf_counter() - t0} if report else None
+
+            loop = asyncio.get_running_loop()
+            trusted = is_trusted(self.page.url)
+            if budget is not None:
+                findings = analyze_interactive(nodes, self.rules, trusted, timings)
+                t0 = time.perf_counter()
+                flagged = await self._apply_findings(findings, generation)
+                if trusted:
+                    self.ledger.clear_deferred()
+                else:
+                    passive = await loop.run_in_executor(self.executor, self.ledger.passive, nodes, self.rules,
+                                                         self.brain, t_start + budget, timings, generation)
+                    findings = findings + passive
+                    flagged += await self._apply_findings(passive, generation)
+            else:
+                findings = await loop.run_in_executor(self.executor, analyze_snapshot,
+                                                      nodes, self.rules, self.brain, trusted, timings)
+                t0 = time.perf_counter()
+                flagged = await self._apply_findings(findings, generation)
+            if report: self.ledger.report_scan(self._last_scan_full, nodes, findings, flagged, timings, t0, t_start)
+
+    async def _snapshot_dom(self, generation=None):
+        try:
+            METRICS.inc("playwright_round_trips")
+            with METRICS.stage("snapshot"):
+                snapshot = await self.page.evaluate(SNAPSHOT_JS, not self._needs_full_scan)
+            # A navigation while the snapshot was in flight still gets its full rescan
+            self._needs_full_scan = self.ledger.stale(generation)
+            self._last_scan_full = snapshot["full"]
+            return snapshot["nodes"]
+        except: return []
+
+    async def _apply_findings(self, findings, generation=None):
+        """Same bookkeeping as BrowserBodyguard._apply_findings (ThreatLedger), remediation in one awaited evaluate"""
+        flagged, remediation = self.ledger.findings(findings, generation)
+        if remediation is None: return flagged
+        try:
+            METRICS.inc("playwright_round_trips")
+            with METRICS.stage("remediate"):
+                await self.page.evaluate(REMEDIATE_JS, remediation)
+        except: pass
+        return flagged
+
+
+class AsyncScanEngine:
+    """
+    Guards N pages / browser contexts from ONE event loop. Every page gets its own
+    scan loop task; all of them share one SecurityBrain and one inference executor.
+
+        engine = AsyncScanEngine(gui_callback=...)
+        await engine.guard_context(context)   # existing + future pages
+        ...
+        await engine.stop()
+    """
+
+    def __init__(self, brain=None, gui_callback=None, interval=0.5, max_workers=2, heartbeat=30.0):
+        self.brain = brain or get_brain()
+        self.gui_callback = gui_callback
+        self.interval = interval
+        # Full rescan every `heartbeat` s, like ScanScheduler: a stylesheet change dirties no node
+        self.heartbeat = heartbeat
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aegis-infer")
+        self.guards = {}
+        self._tasks = {}
+        self.running = True
+
+    async def guard_page(self, page):
+        if page in self.guards: return self.guards[page]
+        guard = await AsyncBrowserBodyguard.create(page, gui_callback=self.gui_callback,
+                                                   brain=self.brain, executor=self.executor)
+        self.guards[page] = guard
+        self._tasks[page] = asyncio.create_task(self._watch(page, guard))
+        page.on("close", lambda _: self._forget(page))
+        return guard
+
+    async def guard_context(self, context):
+        """Guards every open page of the context and every page it opens later"""
+        for page in context.pages:
+            await self.guard_page(page)
+        context.on("page", lambda page: asyncio.ensure_future(self.guard_page(page)))
+
+    async def _watch(self, page, guard):
+        last_full = time.monotonic()
+        while self.running and not page.is_closed():
+            if time.monotonic() - last_full >= self.heartbeat:
+                guard.request_full_scan()
+                last_full = time.monotonic()
+            try:
+                await guard.scan_page()
+            except Exception:
+                if page.is_closed(): break
+            await asyncio.sleep(self.interval)
+
+    def _forget(self, page):
+        self.guards.pop(page, None)
+        task = self._tasks.pop(page, None)
+        if task: task.cancel()
+
+    async def scan_all(self):
+        """One scan of every guarded page, concurrently"""
+        await asyncio.gather(*(guard.scan_page() for guard in list(self.guards.values())), return_exceptions=True)
+
+    async def stop(self):
+        self.running = False
+        tasks = list(self._tasks.values())
+        for task in tasks: task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self.executor.shutdown(wait=False)
@@ -1,217 +1,138 @@
-from colorama import Fore, Style, init
-from .ai_brain import SecurityBrain
-import re
-
-init(autoreset=True)
+from .model_registry import get_brain
+from .rule_engine import default_engine
+from .page_scripts import SNAPSHOT_JS, DEFENSE_JS, HUD_JS, REMEDIATE_JS
+from .scanners import analyze_snapshot, analyze_interactive, is_trusted
+from .threat_ledger import ThreatLedger
+from .metrics import METRICS
+import time
 
 class BrowserBodyguard:
-    def __init__(self, page, gui_callback=None):
+    def __init__(self, page, gui_callback=None, brain=None, remediate=True, bus=None):
         self.page = page
-        self.brain = SecurityBrain()
-        self.known_threats = set()
-        self.risk_score = 0
-        self.gui_callback = gui_callback
+        # Threat identity, risk score, reporting and budget carry-over (shared with the async twin)
+        self.ledger = ThreatLedger(page, gui_callback=gui_callback, bus=bus, remediate=remediate)
+        # Shared per process: a second bodyguard (new tab, new session) reuses the loaded models
+        self.brain = brain or get_brain()
+        self.rules = default_engine()
+        self._needs_full_scan = True
+        self._last_scan_full = False
+        self.interceptor = None
         self._inject_risk_hud()
+
+        # Only navigations force a full-page rescan; everything else is mutation-driven
+        self.page.on("framenavigated", self._on_navigation)
         
         # NEW: Inject a persistent observer that fights back against React updates
         self._inject_persistent_defense()
 
-    def _inject_persistent_defense(self):
-        """Injects a script that runs INSIDE the browser to block threats instantly"""
-        try:
-            self.page.add_init_script("""
-                // Create a global list of blocked elements
-                window.aegisBlockedElements = new Set();
-
-                // Override the click method on the window to stop blocked clicks
-                window.addEventListener('click', function(e) {
-                    if (e.target.getAttribute('data-aegis-blocked') === 'true' || 
-                        e.target.closest('[data-aegis-blocked="true"]')) {
-                        e.preventDefault();
-                        e.stopPropagation();
-                        e.stopImmediatePropagation();
-                        alert('⚠️ AEGIS: THIS ACTION WAS BLOCKED FOR YOUR SAFETY.');
-                        return false;
-                    }
-                }, true);
-            """)
-        except: pass
+    @property
+    def risk_score(self):
+        return self.ledger.risk_score
 
-    def _log_threat(self, level, threat_type, target, action, reason):
-        if self.gui_callback:
-            # Format: LEVEL:::THREAT:::TARGET:::ACTION:::REASON
-            msg = f"{level}:::{threat_type}:::{target}:::{action}:::{reason}"
-            self.gui_callback("log", msg)
+    @property
+    def known_threats(self):
+        return self.ledger.known_threats
 
-    def _update_risk_gui(self, score):
-        if self.gui_callback:
-            self.gui_callback("score", score)
+    @property
+    def remediate(self):
+        return self.ledger.remediate
 
-    def _inject_risk_hud(self):
+    def _on_navigation(self, frame):
+        if frame == self.page.main_frame:
+            self._needs_full_scan = True
+            self.ledger.navigate(frame.url)
+
+    def request_full_scan(self):
+        """The next scan_page() snapshots the whole page instead of only the dirty nodes"""
+        self._needs_full_scan = True
+
+    def _inject_persistent_defense(self):
+        """Injects a script that runs INSIDE the browser to block threats instantly and re-apply quarantined ones"""
         try:
-            self.page.evaluate("""() => {
-                if (!document.getElementById('aegis-risk-hud')) {
-                    const hud = document.createElement('div');
-                    hud.id = 'aegis-risk-hud';
-                    hud.style.position = 'fixed'; hud.style.bottom = '20px'; hud.style.right = '20px';
-                    hud.style.background = 'rgba(0, 0, 0, 0.9)'; hud.style.color = '#00ff00';
-                    hud.style.padding = '15px'; hud.style.borderRadius = '8px';
-                    hud.style.border = '2px solid #00ff00'; hud.style.fontFamily = 'monospace';
-                    hud.style.zIndex = '99999999'; hud.style.fontSize = '16px';
-                    hud.style.fontWeight = 'bold';
-                    hud.innerHTML = '🛡️ SYSTEM SAFETY<br>RISK SCORE: 0/100<br>STATUS: SECURE';
-                    document.body.appendChild(hud);
-                }
-            }""")
+            self.page.add_init_script(DEFENSE_JS)
         except: pass
 
-    def _update_risk_display(self, points_added):
-        self.risk_score = min(100, self.risk_score + points_added)
-        
-        status = "SECURE"
-        color = "#00ff00"
-        if self.risk_score > 30: 
-            status = "SUSPICIOUS"
-            color = "#ffff00"
-        if self.risk_score > 70: 
-            status = "CRITICAL THREAT"
-            color = "#ff0000"
-
-        self._update_risk_gui(self.risk_score)
+    def intercept_responses(self, policy="annotate"):
+        """
+        Scans documents and scripts at the network layer before they render (src/interceptor.py).
+        Call before goto(); threats found there are scored and logged here, and the DOM scans
+        only remediate the elements they arrive pre-marked on.
+        """
+        from .interceptor import ResponseInterceptor
+        self.interceptor = ResponseInterceptor(self.rules, self.brain, policy=policy, on_verdict=self._on_verdict)
+        self.interceptor.attach(self.page)
+        return self.interceptor
+
+    def _on_verdict(self, verdict):
+        action = {"monitor": "LOGGED", "annotate": "MARKED", "block": "BLOCKED"}[self.interceptor.policy]
+        self.ledger.verdict(verdict, action)
 
+    def _inject_risk_hud(self):
+        if not self.remediate: return
         try:
-            self.page.evaluate(f"""() => {{
-                const hud = document.getElementById('aegis-risk-hud');
-                if (hud) {{
-                    hud.style.color = '{color}';
-                    hud.style.borderColor = '{color}';
-                    hud.innerHTML = '🛡️ SYSTEM SAFETY<br>RISK SCORE: {self.risk_score}/100<br>STATUS: {status}';
-                }}
-            }}""")
+            METRICS.inc("playwright_round_trips")
+            self.page.evaluate(HUD_JS)
         except: pass
 
-    def scan_page(self):
-        self._inject_risk_hud()
-        
-        current_url = self.page.url
-        trusted_sites = ["google.com", "youtube.com", "facebook.com", "nfsu.ac.in"]
-        
-        if any(site in current_url for site in trusted_sites):
-            self._scan_phishing_only()
-            return
-
-        self._scan_phishing_only()       
-        self._scan_risky_buttons()       
-        self._scan_hidden_css()          
-        self._scan_visible_injection()   
-
-    def _scan_risky_buttons(self):
-        # We look for ANY clickable element that contains risky text
-        buttons = self.page.locator("button, a, div[role='button'], div[class*='btn'], span[class*='btn']").all()
-        risky_keywords = ["authorize", "transfer", "confirm", "claim", "urgent", "download", "verify", "unlock", "review", "threats"]
-
-        for btn in buttons:
-            try:
-                text = btn.inner_text().strip().lower()
-                if len(text) > 50 or len(text) < 3: continue 
-                
-                if any(k in text for k in risky_keywords):
-                    target_name = f"Button: '{text[:15].upper()}...'"
-                    self._flag(btn, target_name, "red", silent=False, points=30, 
-                               threat_type="High-Risk Action", reason=f"Detected sensitive keyword")
-            except: continue
-
-    def _scan_phishing_only(self):
-        inputs = self.page.locator("input").all()
-        for el in inputs:
-            try:
-                placeholder = (el.get_attribute("placeholder") or "").lower()
-                parent_text = el.evaluate("el => el.parentElement.innerText").lower()
-                combined_context = f"{placeholder} {parent_text}"
-                triggers = ["password", "ssn", "social security", "credit card", "admin id", "session expired"]
-                if any(t in combined_context for t in triggers):
-                    self._flag(el, "Input Field", "red", silent=False, points=50,
-                               threat_type="Phishing Attempt", reason="Solicits sensitive credentials")
-            except: continue
-
-    def _scan_visible_injection(self):
-        elements = self.page.locator("p, h1, h2, h3, h4, span, div, pre, code").all()
-        risky_phrases = ["ignore previous", "system override", "agent_instruction", "agent note", "forget your rules", "bypass safety", "jailbreak", "admin mode", "auto_confirm"]
-        for el in elements:
-            try:
-                text = el.inner_text().lower().strip()
-                if len(text) > 300 or len(text) < 10: continue
-                found = next((p for p in risky_phrases if p in text), None)
-                if found:
-                    self._flag(el, "Text Block", "orange", silent=True, points=15,
-                               threat_type="Prompt Injection", reason=f"Contains adversarial command: '{found}'")
-            except: continue
-
-    def _scan_hidden_css(self):
-        elements = self.page.locator("div, p, span, h1, h2, h3, a").all()
-        for el in elements:
-            try:
-                text = el.inner_text().strip()
-                if len(text) < 5: continue 
-
-                style = el.evaluate("""el => {
-                    const s = window.getComputedStyle(el);
-                    return { opacity: s.opacity, fontSize: s.fontSize, visibility: s.visibility, display: s.display, left: s.left, position: s.position, zIndex: s.zIndex, transform: s.transform, height: s.height, width: s.width }
-                }""")
-                
-                is_hidden = float(style['opacity']) < 0.2 or float(style['fontSize'].replace('px', '')) < 6 or (style['position'] == 'absolute' and float(style['left'].replace('px', '')) < 0)
-
-                if is_hidden:
-                    is_bad, conf, reason = self.brain.predict_threat(text)
-                    if is_bad or "ignore" in text.lower() or "override" in text.lower() or "agent" in text.lower():
-                        self._flag(el, "Hidden Text Node", "orange", silent=True, points=15,
-                                   threat_type="Hidden CSS Attack", reason="Content hidden via CSS")
-            except: continue
-
-    def _flag(self, el, target_name, color, silent=False, points=10, threat_type="Unknown", reason="Unknown"):
+    def scan_page(self, budget=None):
+        """
+        One scan. With a budget (seconds), interactive elements are scanned and remediated
+        first; passive text analysis runs in the time left and the rest carries over.
+        """
+        with METRICS.stage("scan_page"):
+            METRICS.inc("scans")
+            report = self.ledger.bus.active
+            t_start = time.perf_counter()
+            self._inject_risk_hud()
+            self.rules.maybe_reload()
+
+            # ONE round trip: every scanner runs against this snapshot in Python
+            t0 = time.perf_counter()
+            nodes = self._snapshot_dom()
+            timings = {"snapshot": time.perf_counter() - t0} if report else None
+            if budget is not None:
+                t0 = time.perf_counter()
+                findings, flagged = self._scan_within(nodes, t_start + budget, timings)
+            else:
+                findings = analyze_snapshot(nodes, self.rules, self.brain, trusted=is_trusted(self.page.url), timings=timings)
+                # ... and ONE more to remediate everything it found
+                t0 = time.perf_counter()
+                flagged = self._apply_findings(findings)
+            if report: self.ledger.report_scan(self._last_scan_full, nodes, findings, flagged, timings, t0, t_start)
+
+    def _scan_within(self, nodes, deadline, timings=None):
+        """Budgeted scan: clickable / typeable threats are blocked before any passive text analysis runs"""
+        trusted = is_trusted(self.page.url)
+        findings = analyze_interactive(nodes, self.rules, trusted, timings)
+        flagged = self._apply_findings(findings)
+        if trusted:
+            self.ledger.clear_deferred()
+            return findings, flagged
+
+        passive = self.ledger.passive(nodes, self.rules, self.brain, deadline, timings)
+        return findings + passive, flagged + self._apply_findings(passive)
+
+    def _snapshot_dom(self):
+        """Collects every candidate node (or only the dirty ones) in a single in-page pass"""
         try:
-            uid = el.evaluate("el => el.outerHTML")[:50]
-        except: uid = str(el)
-
-        if uid in self.known_threats: return
-        self.known_threats.add(uid)
-        
-        # 1. Update Score & GUI Table
-        self._update_risk_display(points)
-        level = "WARNING" if silent else "CRITICAL"
-        action = "LOGGED" if silent else "BLOCKED"
-        self._log_threat(level, threat_type, target_name, action, reason)
-        
+            METRICS.inc("playwright_round_trips")
+            with METRICS.stage("snapshot"):
+                snapshot = self.page.evaluate(SNAPSHOT_JS, not self._needs_full_scan)
+            self._needs_full_scan = False
+            self._last_scan_full = snapshot["full"]
+            return snapshot["nodes"]
+        except: return []
+
+    def _apply_findings(self, findings):
+        """
+        Scores and logs every new finding (ThreatLedger), then applies all highlights, blocks,
+        quarantine rules, the HUD update and the popup in a single evaluate (REMEDIATE_JS).
+        """
+        flagged, remediation = self.ledger.findings(findings)
+        if remediation is None: return flagged
         try:
-            # 2. VISUAL HIGHLIGHT
-            el.evaluate(f"el => el.style.border = '4px solid {color}'")
-            
-            if not silent:
-                # 3. AGGRESSIVE FUNCTIONAL BLOCK
-                # We add a special attribute 'data-aegis-blocked'
-                # The script we injected earlier checks for this attribute on every click
-                el.evaluate("el => el.setAttribute('data-aegis-blocked', 'true')")
-                
-                # Backup CSS Blocking
-                el.evaluate("el => el.style.pointerEvents = 'none'")
-                el.evaluate("el => el.style.cursor = 'not-allowed'")
-                el.evaluate("el => el.style.backgroundColor = '#ff0000'")
-                el.evaluate("el => el.style.color = 'white'")
-                el.evaluate("el => el.style.fontWeight = 'bold'")
-                el.evaluate("el => el.style.zIndex = '9999999'")
-                el.evaluate("el => el.innerText = '🚫 BLOCKED THREAT 🚫'")
-                
-                # Active Threat Popup
-                self.page.evaluate(f"""() => {{
-                    const div = document.createElement('div');
-                    div.style.position = 'fixed'; div.style.top = '20px'; div.style.right = '20px';
-                    div.style.backgroundColor = '#cc0000'; div.style.color = 'white';
-                    div.style.padding = '20px'; div.style.zIndex = '10000000';
-                    div.style.borderRadius = '8px'; div.style.fontFamily = 'monospace';
-                    div.style.fontWeight = 'bold'; div.style.border = '2px solid white';
-                    div.innerHTML = '⚠️ AEGIS ACTIVE DEFENSE<br><br>{threat_type} Detected!';
-                    document.body.appendChild(div);
-                    setTimeout(() => div.remove(), 5000);
-                }}""")
-
+            METRICS.inc("playwright_round_trips")
+            with METRICS.stage("remediate"):
+                self.page.evaluate(REMEDIATE_JS, remediation)
         except: pass
+        return flagged
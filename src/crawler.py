@@ -0,0 +1,176 @@
+"""
+HEADLESS BATCH CRAWL: pre-vet sites before an agent visits them.
+
+URLs / local HTML files are spread over a process pool. Every worker keeps ONE
+headless Chromium for many pages (recycled every --pages-per-browser pages to keep
+memory flat), runs the BrowserBodyguard scanners once per page and the parent
+streams one JSON verdict per page to a JSONL file as results arrive.
+
+    python crawl.py https://example.com ./pages/*.html -o verdicts.jsonl
+    python crawl.py --input-list urls.txt --workers 8 -o verdicts.jsonl
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from pathlib import Path
+
+from .scanners import analyze_snapshot, is_trusted
+
+# --- WORKER STATE (one per process) ---
+_worker = {}
+
+
+def _init_worker(pages_per_browser, nav_timeout_ms, settle_ms, prefilter=False):
+    from .model_registry import get_brain
+    # Tier 2 loaded up front: a crawl must not hand out warm-up fallback verdicts
+    get_brain(tier2="eager")
+    _worker.update(pages_per_browser=pages_per_browser, nav_timeout_ms=nav_timeout_ms,
+                   settle_ms=settle_ms, prefilter=prefilter, playwright=None, browser=None, served=0)
+
+
+def _browser():
+    if _worker["browser"] is not None and _worker["served"] >= _worker["pages_per_browser"]:
+        # Page recycling: a fresh Chromium every N pages keeps worker memory bounded
+        try: _worker["browser"].close()
+        except: pass
+        _worker["browser"] = None
+    if _worker["browser"] is None:
+        if _worker["playwright"] is None:
+            from playwright.sync_api import sync_playwright
+            _worker["playwright"] = sync_playwright().start()
+        _worker["browser"] = _worker["playwright"].chromium.launch(headless=True)
+        _worker["served"] = 0
+    _worker["served"] += 1
+    return _worker["browser"]
+
+
+def _to_url(target):
+    if target.startswith(("http://", "https://", "file://")): return target
+    path = Path(target)
+    if path.exists(): return path.resolve().as_uri()
+    return "https://" + target
+
+
+def _prefilter(target, url):
+    """Static pre-scan; returns a finished record when the browser can be skipped (script-free documents), else None"""
+    from .static_scanner import scan_target
+    t0 = time.perf_counter()
+    try:
+        result = scan_target(url)
+    except Exception:
+        return None
+    if result["needs_browser"]: return None
+    return {"target": target, "url": url, "ok": True, "error": None, "source": "static",
+            "threats": result["threats"], "score": result["score"], "nodes": result["elements"],
+            "timings_ms": {"static": round((time.perf_counter() - t0) * 1000, 2)}, "worker": os.getpid()}
+
+
+def _scan_one(target):
+    from .bodyguard import BrowserBodyguard
+    from .model_registry import get_brain
+
+    url = _to_url(target)
+    if _worker["prefilter"]:
+        record = _prefilter(target, url)
+        if record is not None: return record
+
+    record = {"target": target, "url": url, "ok": False, "error": None, "source": "browser", "threats": [],
+              "score": 0, "nodes": 0, "timings_ms": {}, "worker": os.getpid()}
+    threats = record["threats"]
+
+    def collect(kind, data):
+        if kind == "log":
+            level, threat, target_name, action, reason = data.split(":::", 4)
+            threats.append({"level": level, "threat_type": threat, "target": target_name,
+                            "action": action, "reason": reason})
+
+    timings = {}
+    t_start = time.perf_counter()
+    context = None
+    try:
+        context = _browser().new_context()
+        page = context.new_page()
+        guard = BrowserBodyguard(page, gui_callback=collect, brain=get_brain(), remediate=False)
+
+        t0 = time.perf_counter()
+        page.goto(url, timeout=_worker["nav_timeout_ms"], wait_until="load")
+        if _worker["settle_ms"]: page.wait_for_timeout(_worker["settle_ms"])
+        timings["navigate"] = time.perf_counter() - t0
+
+        # One snapshot per page: always the whole page, whatever the observer saw while it settled
+        guard.request_full_scan()
+        t0 = time.perf_counter()
+        nodes = guard._snapshot_dom()
+        timings["snapshot"] = time.perf_counter() - t0
+
+        findings = analyze_snapshot(nodes, guard.rules, guard.brain, trusted=is_trusted(page.url), timings=timings)
+
+        t0 = time.perf_counter()
+        guard._apply_findings(findings)
+        timings["apply"] = time.perf_counter() - t0
+
+        record.update(ok=True, score=guard.risk_score, nodes=len(nodes), url=page.url)
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if context is not None:
+            try: context.close()
+            except: pass
+
+    timings["total"] = time.perf_counter() - t_start
+    record["timings_ms"] = {k: round(v * 1000, 2) for k, v in timings.items()}
+    return record
+
+
+def _read_targets(args):
+    targets = list(args.targets)
+    if args.input_list:
+        with open(args.input_list, encoding="utf-8") as f:
+            targets += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return targets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", help="URLs or local HTML files")
+    parser.add_argument("--input-list", help="file with one URL / path per line")
+    parser.add_argument("-o", "--output", default="aegis_verdicts.jsonl", help="JSONL output ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--pages-per-browser", type=int, default=100, help="recycle Chromium after this many pages")
+    parser.add_argument("--timeout", type=int, default=30000, help="navigation timeout (ms)")
+    parser.add_argument("--settle", type=int, default=0, help="extra wait after load for delayed injections (ms)")
+    parser.add_argument("--prefilter", action="store_true",
+                        help="static pre-scan first; skip Chromium for pages it fully vets (see src/static_scanner.py)")
+    args = parser.parse_args(argv)
+
+    targets = _read_targets(args)
+    if not targets:
+        parser.error("no targets given")
+
+    out = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    started = time.perf_counter()
+    done = flagged = 0
+    try:
+        # spawn: Playwright's driver does not survive fork()
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(args.workers, initializer=_init_worker,
+                      initargs=(args.pages_per_browser, args.timeout, args.settle, args.prefilter)) as pool:
+            for record in pool.imap_unordered(_scan_one, targets, chunksize=1):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                done += 1
+                flagged += bool(record["threats"])
+                if out is not sys.stdout:
+                    print(f"\r🛡️  {done}/{len(targets)} pages | {flagged} flagged", end="", file=sys.stderr)
+    finally:
+        if out is not sys.stdout: out.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ {done} pages in {elapsed:.1f}s ({done / elapsed * 3600:.0f} pages/hour)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Tier 2 sentence encoders. SecurityBrain only needs `encode(texts) -> float32 [n, dim]`,
+so the backend is picked from config:
+
+    "torch"      full-precision SentenceTransformer (default, the reference)
+    "int8"       same model with torch dynamic int8 quantization of every Linear layer
+    "onnx"       exported ONNX graph run by onnxruntime (sentence-transformers >= 3.2)
+    "onnx-int8"  the hub's int8-quantized ONNX export
+
+    SecurityBrain(tier2_backend="int8")   or   AEGIS_TIER2_BACKEND=int8
+
+Compare backends before switching: python benchmarks/bench_tier2_backends.py
+"""
+import os
+
+import numpy as np
+
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+DEFAULT_BACKEND = os.environ.get("AEGIS_TIER2_BACKEND", "torch")
+
+# Quantized ONNX file shipped in the sentence-transformers hub repos
+ONNX_INT8_FILE = os.environ.get("AEGIS_ONNX_INT8_FILE", "onnx/model_qint8_avx2.onnx")
+
+
+def encoder_id(model_name, backend):
+    """Goes into the concept-vector and verdict cache keys: other backend, other embeddings"""
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+class SentenceEncoder:
+    """Thin wrapper so every backend returns float32 numpy rows"""
+
+    def __init__(self, model, model_name, backend):
+        self.model = model
+        self.model_name = model_name
+        self.backend = backend
+
+    @property
+    def id(self):
+        return encoder_id(self.model_name, self.backend)
+
+    def encode(self, texts):
+        return np.asarray(self.model.encode(texts), dtype=np.float32)
+
+
+def load_encoder(model_name, backend=None):
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown Tier 2 backend {backend!r} (choose from {', '.join(BACKENDS)})")
+
+    from sentence_transformers import SentenceTransformer
+    if backend == "torch":
+        model = SentenceTransformer(model_name)
+    elif backend == "int8":
+        import torch  # dynamic quantization is CPU-only
+        model = SentenceTransformer(model_name, device="cpu")
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif backend == "onnx":
+        model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+    else:
+        model = SentenceTransformer(model_name, device="cpu", backend="onnx",
+                                    model_kwargs={"file_name": ONNX_INT8_FILE})
+    return SentenceEncoder(model, model_name, backend)
@@ -0,0 +1,313 @@
+"""
+THREAT-EVENT BUS: typed detections published in-process and streamed out by sinks.
+
+The bodyguards publish three event types:
+
+    ThreatEvent         one per new threat (level, type, target, action, reason, points)
+    ScoreEvent          the page risk score after a scan changed it
+    ScanCompleteEvent   one per scan: node / finding counts and per-stage timings (ms)
+
+publish() never waits on I/O. Every sink owns a bounded queue and a worker thread that
+writes in batches. When a queue is full the sink either drops the event (counted in
+stats()) or, with policy="block", makes the publisher wait up to block_timeout seconds.
+
+    bus = get_bus()                                   # process-wide, sinks from AEGIS_EVENTS
+    bus.subscribe(JsonlSink("events.jsonl", max_bytes=50_000_000))
+    bus.subscribe(lambda event: print(event.to_dict()))   # plain callables run inline
+
+AEGIS_EVENTS takes a comma-separated list of sink specs (see sink_from_spec):
+    jsonl:events.jsonl   stdout   unix:/tmp/aegis-events.sock   tcp:127.0.0.1:9000   http://127.0.0.1:8080/hook
+"""
+import atexit
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+import urllib.request
+
+
+# --- EVENT MODEL ---
+class Event:
+    __slots__ = ("ts", "page_url")
+    type = "event"
+
+    def to_dict(self):
+        out = {"type": self.type}
+        for cls in reversed(type(self).__mro__):
+            for name in getattr(cls, "__slots__", ()):
+                out[name] = getattr(self, name)
+        return out
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class ThreatEvent(Event):
+    __slots__ = ("level", "threat_type", "target", "action", "reason", "points")
+    type = "threat"
+
+    def __init__(self, page_url, level, threat_type, target, action, reason, points=0):
+        self.ts, self.page_url = time.time(), page_url
+        self.level = level
+        self.threat_type = threat_type
+        self.target = target
+        self.action = action
+        self.reason = reason
+        self.points = points
+
+
+class ScoreEvent(Event):
+    __slots__ = ("score", "status")
+    type = "score"
+
+    def __init__(self, page_url, score, status):
+        self.ts, self.page_url = time.time(), page_url
+        self.score = score
+        self.status = status
+
+
+class ScanCompleteEvent(Event):
+    __slots__ = ("full", "nodes", "findings", "flagged", "timings_ms")
+    type = "scan_complete"
+
+    def __init__(self, page_url, full, nodes, findings, flagged, timings_ms):
+        self.ts, self.page_url = time.time(), page_url
+        self.full = full
+        self.nodes = nodes
+        self.findings = findings
+        self.flagged = flagged
+        self.timings_ms = timings_ms
+
+
+# --- BUS ---
+class EventBus:
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        """False while nobody listens: publishers can skip building events altogether"""
+        return bool(self._subscribers)
+
+    def subscribe(self, subscriber):
+        """A Sink (queued, batched) or any callable taking an Event (runs inline, keep it cheap)"""
+        with self._lock:
+            self._subscribers = self._subscribers + [subscriber]
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscriber]
+
+    def publish(self, event):
+        for subscriber in self._subscribers:
+            try:
+                if isinstance(subscriber, Sink): subscriber.offer(event)
+                else: subscriber(event)
+            except Exception: pass
+
+    def close(self):
+        """Flushes and stops every sink"""
+        for subscriber in self._subscribers:
+            if isinstance(subscriber, Sink): subscriber.close()
+
+    def stats(self):
+        return {s.name: s.stats() for s in self._subscribers if isinstance(s, Sink)}
+
+
+# --- SINKS ---
+_STOP = object()
+
+
+class Sink:
+    """
+    Bounded queue + one writer thread. Subclasses implement write_batch(list of dicts).
+    A batch is written once `batch_size` events are queued or `flush_interval` seconds
+    after its first event, whichever comes first.
+    """
+    name = "sink"
+
+    def __init__(self, max_queue=10000, policy="drop", block_timeout=1.0, batch_size=256, flush_interval=0.5):
+        if policy not in ("drop", "block"): raise ValueError(f"unknown backpressure policy {policy!r}")
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(max_queue)
+        self.delivered = self.dropped = self.failed = 0
+        self._thread = threading.Thread(target=self._run, name=f"aegis-events-{self.name}", daemon=True)
+        self._thread.start()
+
+    def offer(self, event):
+        try:
+            if self.policy == "block": self._queue.put(event, timeout=self.block_timeout)
+            else: self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP: return
+            batch, deadline, stop = [item.to_dict()], time.monotonic() + self.flush_interval, False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty: break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item.to_dict())
+            try:
+                self.write_batch(batch)
+                self.delivered += len(batch)
+            except Exception:
+                self.failed += len(batch)
+            if stop: return
+
+    def write_batch(self, batch):
+        raise NotImplementedError
+
+    def close(self, timeout=5.0):
+        if not self._thread.is_alive(): return
+        try: self._queue.put(_STOP, timeout=timeout)
+        except queue.Full: return
+        self._thread.join(timeout)
+        self._close()
+
+    def _close(self): pass
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "delivered": self.delivered,
+                "dropped": self.dropped, "failed": self.failed, "policy": self.policy}
+
+
+def _encode(batch):
+    return "".join(json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in batch)
+
+
+class JsonlSink(Sink):
+    """One JSON object per line; rotates to path.1 .. path.<backups> once the file passes max_bytes"""
+    name = "jsonl"
+
+    def __init__(self, path, max_bytes=50_000_000, backups=5, **kwargs):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = open(path, "a", encoding="utf-8")
+        super().__init__(**kwargs)
+
+    def write_batch(self, batch):
+        self._file.write(_encode(batch))
+        self._file.flush()
+        if self.max_bytes and self._file.tell() >= self.max_bytes: self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"): os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups: os.replace(self.path, f"{self.path}.1")
+        else: os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _close(self):
+        self._file.close()
+
+
+class StdoutSink(Sink):
+    name = "stdout"
+
+    def write_batch(self, batch):
+        sys.stdout.write(_encode(batch))
+        sys.stdout.flush()
+
+
+class SocketSink(Sink):
+    """
+    Newline-delimited JSON to a Unix socket path or a (host, port) TCP address.
+    While the peer is unreachable, batches are counted as failed and the connection
+    is retried after `retry_after` seconds.
+    """
+    name = "socket"
+
+    def __init__(self, address, timeout=2.0, retry_after=5.0, **kwargs):
+        self.address = address
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._sock = None
+        self._down_until = 0.0
+        super().__init__(**kwargs)
+
+    def _connect(self):
+        family = socket.AF_UNIX if isinstance(self.address, str) else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.address)
+        return sock
+
+    def write_batch(self, batch):
+        if time.monotonic() < self._down_until: raise ConnectionError("peer down")
+        try:
+            if self._sock is None: self._sock = self._connect()
+            self._sock.sendall(_encode(batch).encode("utf-8"))
+        except OSError:
+            self._close()
+            self._down_until = time.monotonic() + self.retry_after
+            raise
+
+    def _close(self):
+        if self._sock is not None:
+            try: self._sock.close()
+            except OSError: pass
+        self._sock = None
+
+
+class WebhookSink(Sink):
+    """POSTs each batch as one JSON array (stand-in for the log pipeline's HTTP intake)"""
+    name = "webhook"
+
+    def __init__(self, url, timeout=2.0, **kwargs):
+        self.url = url
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def write_batch(self, batch):
+        request = urllib.request.Request(self.url, data=json.dumps(batch, default=str).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def sink_from_spec(spec, **kwargs):
+    """'jsonl:PATH' | 'stdout' | 'unix:PATH' | 'tcp:HOST:PORT' | 'http(s)://...' -> Sink"""
+    if spec == "stdout": return StdoutSink(**kwargs)
+    if spec.startswith("jsonl:"): return JsonlSink(spec[len("jsonl:"):], **kwargs)
+    if spec.startswith("unix:"): return SocketSink(spec[len("unix:"):], **kwargs)
+    if spec.startswith("tcp:"):
+        host, port = spec[len("tcp:"):].rsplit(":", 1)
+        return SocketSink((host, int(port)), **kwargs)
+    if spec.startswith(("http://", "https://")): return WebhookSink(spec, **kwargs)
+    raise ValueError(f"unknown event sink {spec!r}")
+
+
+# One bus per process, shared by every bodyguard (like the brain in model_registry)
+_bus = None
+_lock = threading.Lock()
+
+
+def get_bus():
+    """Returns the process-wide bus, creating it (with the AEGIS_EVENTS sinks) on first use"""
+    global _bus
+    if _bus is None:
+        with _lock:
+            if _bus is None:
+                bus = EventBus()
+                for spec in filter(None, (s.strip() for s in os.environ.get("AEGIS_EVENTS", "").split(","))):
+                    bus.subscribe(sink_from_spec(spec))
+                atexit.register(bus.close)
+                _bus = bus
+    return _bus
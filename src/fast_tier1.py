@@ -0,0 +1,284 @@
+"""
+TIER 1 FAST PATH: the security_model.pkl pipeline (TfidfVectorizer + RandomForest)
+flattened into plain NumPy arrays.
+
+sklearn's predict_proba pays input validation, a sparse matrix build and 100 separate
+tree traversals on every call. FastTier1 does the tokenizing with one compiled regex and
+a dict, fills one dense float32 matrix (only the features the forest actually splits on)
+and walks ALL trees for ALL texts at once, one depth level per NumPy step, into buffers
+allocated once per batch.
+Probabilities are summed tree by tree in sklearn's order, so they are bit-identical.
+
+    python -m src.fast_tier1 export                      # security_model.pkl -> security_model.fast.npz
+    python -m src.fast_tier1 verify                      # verdict regression check vs. the sklearn pipeline
+"""
+import argparse
+import hashlib
+import json
+import math
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+FAST_SUFFIX = ".fast.npz"
+FORMAT_VERSION = 1
+
+
+class FastTier1:
+    """Drop-in for the pipeline's predict_proba(texts) -> [n, n_classes] (classes in the forest's order)"""
+
+    def __init__(self, vocabulary, idf, used, token_pattern, lowercase, norm, binary, sublinear_tf,
+                 feature, threshold, left, right, leaf_proba, roots, depth, source_digest=""):
+        self.vocabulary = vocabulary            # token -> column
+        self.idf = idf                          # float64 [n_columns] (None: no idf weighting)
+        self.used = used                        # int32 [n_columns]: position in X, -1 if no tree splits on it
+        self.token_pattern = token_pattern
+        self._token_re = re.compile(token_pattern)
+        self.lowercase = lowercase
+        self.norm = norm
+        self.binary = binary
+        self.sublinear_tf = sublinear_tf
+        # Every tree's nodes concatenated; leaves point at themselves so extra steps are no-ops.
+        # children[2 * node + went_left] is the next node (right first, then left).
+        self.feature = feature.astype(np.intp)
+        self.threshold = threshold
+        self.children = np.stack([right, left], axis=1).ravel().astype(np.intp)
+        self.leaf_proba = leaf_proba
+        self.roots = roots.astype(np.intp)
+        self.depth = depth
+        self.n_used = int(used.max()) + 1 if len(used) and used.max() >= 0 else 0
+        self.source_digest = source_digest
+
+    # --- EXPORT ---
+    @classmethod
+    def from_pipeline(cls, pipeline, source_digest=""):
+        """ValueError if the pipeline is not a plain TfidfVectorizer + RandomForestClassifier"""
+        steps = getattr(pipeline, "steps", None)
+        if not steps or len(steps) != 2:
+            raise ValueError("expected a 2-step pipeline (TfidfVectorizer, RandomForestClassifier)")
+        vec, forest = steps[0][1], steps[1][1]
+        if type(vec).__name__ != "TfidfVectorizer" or type(forest).__name__ != "RandomForestClassifier":
+            raise ValueError(f"unsupported pipeline: {type(vec).__name__} + {type(forest).__name__}")
+        if (vec.analyzer != "word" or tuple(vec.ngram_range) != (1, 1) or vec.tokenizer is not None
+                or vec.preprocessor is not None or vec.strip_accents is not None or vec.stop_words is not None
+                or vec.norm not in ("l2", "l1", None)):
+            raise ValueError("unsupported TfidfVectorizer settings (only word unigrams with the default analyzer)")
+        vocabulary = {token: int(col) for token, col in vec.vocabulary_.items()}
+        idf = np.asarray(vec.idf_, dtype=np.float64) if vec.use_idf else None
+
+        used_columns = sorted({int(f) for est in forest.estimators_ for f in est.tree_.feature if f >= 0})
+        used = np.full(len(vocabulary), -1, dtype=np.int32)
+        used[used_columns] = np.arange(len(used_columns), dtype=np.int32)
+
+        feature, threshold, left, right, leaf_proba, roots = [], [], [], [], [], []
+        offset, depth = 0, 0
+        for est in forest.estimators_:
+            tree = est.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            idx = np.arange(offset, offset + n)
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, used[np.maximum(tree.feature, 0)]))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, idx, tree.children_left + offset))
+            right.append(np.where(is_leaf, idx, tree.children_right + offset))
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :]
+            totals = value.sum(axis=1)
+            totals[totals == 0.0] = 1.0
+            leaf_proba.append(value / totals[:, None])
+            offset += n
+            depth = max(depth, tree.max_depth)
+
+        return cls(vocabulary, idf, used, vec.token_pattern, vec.lowercase, vec.norm, vec.binary, vec.sublinear_tf,
+                   np.concatenate(feature).astype(np.int32), np.concatenate(threshold).astype(np.float64),
+                   np.concatenate(left).astype(np.int32), np.concatenate(right).astype(np.int32),
+                   np.concatenate(leaf_proba).astype(np.float64), np.asarray(roots, dtype=np.int32),
+                   depth, source_digest)
+
+    def save(self, path):
+        tokens = [None] * len(self.vocabulary)
+        for token, col in self.vocabulary.items(): tokens[col] = token
+        meta = {"format": FORMAT_VERSION, "token_pattern": self.token_pattern, "lowercase": self.lowercase,
+                "norm": self.norm, "binary": self.binary, "sublinear_tf": self.sublinear_tf,
+                "depth": int(self.depth), "source_digest": self.source_digest, "tokens": tokens}
+        tmp = str(path) + ".tmp.npz"
+        np.savez(tmp, meta=np.array(json.dumps(meta)),
+                 idf=self.idf if self.idf is not None else np.zeros(0), used=self.used,
+                 feature=self.feature, threshold=self.threshold,
+                 left=self.children[1::2], right=self.children[0::2],
+                 leaf_proba=self.leaf_proba, roots=self.roots)
+        Path(tmp).replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            meta = json.loads(str(saved["meta"]))
+            if meta.get("format") != FORMAT_VERSION: raise ValueError(f"{path}: unknown format {meta.get('format')}")
+            idf = saved["idf"] if meta["tokens"] and len(saved["idf"]) else None
+            return cls({token: col for col, token in enumerate(meta["tokens"])}, idf, saved["used"],
+                       meta["token_pattern"], meta["lowercase"], meta["norm"], meta["binary"], meta["sublinear_tf"],
+                       saved["feature"], saved["threshold"], saved["left"], saved["right"],
+                       saved["leaf_proba"], saved["roots"], meta["depth"], meta["source_digest"])
+
+    # --- INFERENCE ---
+    def _features(self, texts):
+        """Dense float32 TF-IDF rows restricted to the split features (same values sklearn feeds its trees)"""
+        X = np.zeros((len(texts), self.n_used), dtype=np.float32)
+        vocabulary, used, idf = self.vocabulary, self.used, self.idf
+        for row, text in enumerate(texts):
+            if self.lowercase: text = text.lower()
+            counts = {}
+            for token in self._token_re.findall(text):
+                col = vocabulary.get(token)
+                if col is not None: counts[col] = counts.get(col, 0) + 1
+            if not counts: continue
+
+            # Column order + scalar double math mirror sklearn's CSR row normalisation
+            cols = sorted(counts)
+            values = []
+            for col in cols:
+                v = 1.0 if self.binary else float(counts[col])
+                if self.sublinear_tf: v = math.log(v) + 1.0
+                if idf is not None: v *= float(idf[col])
+                values.append(v)
+            if self.norm == "l2":
+                total = 0.0
+                for v in values: total += v * v
+                total = math.sqrt(total)
+            elif self.norm == "l1":
+                total = 0.0
+                for v in values: total += abs(v)
+            else:
+                total = 0.0
+            for col, v in zip(cols, values):
+                pos = used[col]
+                if pos >= 0: X[row, pos] = v / total if total != 0.0 else v
+        return X
+
+    def predict_proba(self, texts):
+        texts = list(texts)
+        n, n_trees = len(texts), len(self.roots)
+        proba = np.zeros((n, self.leaf_proba.shape[1]), dtype=np.float64)
+        if n == 0: return proba
+
+        X = self._features(texts)
+        flat = X.ravel()
+        row_base = (np.arange(n, dtype=np.intp) * self.n_used)[:, None]
+
+        node = np.broadcast_to(self.roots, (n, n_trees)).copy()
+        nxt = np.empty_like(node)
+        idx = np.empty_like(node)
+        values = np.empty((n, n_trees), dtype=np.float32)
+        thresholds = np.empty((n, n_trees), dtype=np.float64)
+        went_left = np.empty((n, n_trees), dtype=bool)
+        for _ in range(self.depth):
+            np.take(self.feature, node, out=idx)
+            idx += row_base
+            np.take(flat, idx, out=values)
+            np.take(self.threshold, node, out=thresholds)
+            # float32 feature vs float64 threshold, exactly like sklearn's tree
+            np.less_equal(values, thresholds, out=went_left)
+            node *= 2
+            node += went_left
+            np.take(self.children, node, out=nxt)
+            node, nxt = nxt, node
+
+        # Tree by tree, like RandomForestClassifier's accumulation, then averaged
+        # (a plain sum() would reorder the additions and drift by an ulp)
+        leaves = self.leaf_proba[node.T]
+        for t in range(n_trees): proba += leaves[t]
+        proba /= n_trees
+        return proba
+
+
+def fast_path_for(model_path):
+    return str(Path(model_path).with_suffix(FAST_SUFFIX))
+
+
+def file_digest(path):
+    with open(path, "rb") as f: return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_exported(model_path):
+    """The exported .fast.npz, if it was made from this exact pkl (skips joblib + sklearn entirely)"""
+    try:
+        fast = FastTier1.load(fast_path_for(model_path))
+        if fast.source_digest == file_digest(model_path): return fast
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def compile_pipeline(pipeline, model_path):
+    """FastTier1 built in memory from a loaded pipeline, or None when it can't be flattened"""
+    try:
+        return FastTier1.from_pipeline(pipeline, file_digest(model_path))
+    except (ValueError, AttributeError) as e:
+        print(f"⚠️ TIER 1 FAST PATH UNAVAILABLE: {e} -> sklearn pipeline")
+        return None
+
+
+# --- VERIFY ---
+def _corpus(pipeline):
+    """Training-style phrases, every rule phrase, the demo page text, and token soup from the vocabulary"""
+    root = Path(__file__).resolve().parent.parent
+    texts = []
+    rules = json.loads((root / "rules" / "default.json").read_text(encoding="utf-8"))
+    for spec in rules["rulesets"].values():
+        for entry in spec.get("rules", []):
+            phrase = entry if isinstance(entry, str) else entry.get("phrase")
+            if phrase: texts += [phrase, phrase.upper(), f"Please {phrase} now, {phrase}!"]
+    demo = root / "T4skforce client" / "index.html"
+    if demo.exists():
+        texts += [line.strip() for line in re.sub(r"<[^>]+>", "\n", demo.read_text(encoding="utf-8")).splitlines()
+                  if line.strip()]
+    vocab = sorted(pipeline.steps[0][1].vocabulary_)
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        words = rng.choice(vocab + ["the", "a", "bank", "x"], size=rng.integers(1, 12))
+        texts.append(" ".join(words))
+    return texts + ["", "a", "!!", "ÉMOJI 🛡️ unicode système override"]
+
+
+def verify(model_path, texts=None):
+    """Compares FastTier1 with the sklearn pipeline: same probabilities and same Tier 1 decision"""
+    import joblib
+    pipeline = joblib.load(model_path)
+    fast = FastTier1.from_pipeline(pipeline, file_digest(model_path))
+    texts = texts or _corpus(pipeline)
+    ref_all, got_all = pipeline.predict_proba(texts), fast.predict_proba(texts)
+    ref, got = ref_all[:, 1], got_all[:, 1]
+    mismatched = [t for t, a, b in zip(texts, ref_all, got_all) if (a != b).any()]
+    flipped = [t for t, a, b in zip(texts, ref, got) if (a * 100 < 50) != (b * 100 < 50)]
+    return {"texts": len(texts), "exact": len(texts) - len(mismatched), "max_abs_diff": float(np.max(np.abs(ref_all - got_all))),
+            "verdict_flips": flipped, "mismatched": mismatched}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--model", default="security_model.pkl")
+    parser.add_argument("-o", "--output", help="export target (default: <model>.fast.npz)")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        import joblib
+        fast = FastTier1.from_pipeline(joblib.load(args.model), file_digest(args.model))
+        out = args.output or fast_path_for(args.model)
+        fast.save(out)
+        print(f"✅ {args.model} -> {out} ({len(fast.roots)} trees, {len(fast.threshold)} nodes, "
+              f"{fast.n_used}/{len(fast.vocabulary)} features used)")
+        return
+
+    report = verify(args.model)
+    print(f"{report['exact']}/{report['texts']} probabilities bit-identical, "
+          f"max |diff| {report['max_abs_diff']:.3g}, {len(report['verdict_flips'])} verdict flips")
+    for text in report["verdict_flips"][:10]: print(f"   flip: {text[:80]!r}")
+    sys.exit(1 if report["verdict_flips"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+SHARED TIER 2 INFERENCE SERVER: one MiniLM for every bodyguard on the machine.
+
+Each GUI / crawler / async engine process would otherwise load its own copy of the
+transformer. This server loads it once, listens on a Unix socket and micro-batches
+concurrent escalations into one encode (flushed at --max-batch texts or after
+--max-wait-ms, whichever comes first). Scoring is the same as the in-process
+SecurityBrain._score_local, so verdicts are identical.
+
+    python -m src.inference_server --socket /tmp/aegis-tier2.sock
+    AEGIS_TIER2_SOCKET=/tmp/aegis-tier2.sock python main.py
+
+Protocol: one JSON object per line in each direction.
+    {"op": "register", "concepts": {category: [phrases]}}  -> {"ok": true, "key": ..., "encoder": encoder_id}
+    {"op": "score", "key": ..., "texts": [...]}            -> {"ok": true, "scores": [[score, category], ...]}
+    {"op": "stats"}                                        -> {"ok": true, "stats": {...}}
+"""
+import argparse
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+from .ai_brain import TIER2_MODEL_NAME, stack_concepts, best_concepts, _normalize
+from .encoders import load_encoder, encoder_id, BACKENDS, DEFAULT_BACKEND
+from .threat_index import ThreatIndex
+
+
+def concepts_key(concepts):
+    return hashlib.sha1(json.dumps(concepts, sort_keys=True).encode()).hexdigest()
+
+
+class _Request:
+    __slots__ = ("key", "texts", "done", "scores", "error", "queued_at")
+
+    def __init__(self, key, texts):
+        self.key = key
+        self.texts = texts
+        self.done = threading.Event()
+        self.scores = None
+        self.error = None
+        self.queued_at = time.perf_counter()
+
+
+class InferenceServer:
+    """
+    Owns the transformer and the concept indexes (one per registered concept set) and
+    runs the batcher thread. serve_forever() blocks; close() stops it.
+    """
+
+    def __init__(self, socket_path, max_batch=64, max_wait_ms=5.0, model_name=TIER2_MODEL_NAME, backend=None, threat_index=None):
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.model_name = model_name
+        self.backend = backend or DEFAULT_BACKEND
+        # Clients compare it with their own: scores of another encoder must not land in their caches
+        self.encoder_id = encoder_id(model_name, self.backend)
+        self.threat_index = threat_index
+        self.model = None
+        self._indexes = {}
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._server = None
+
+        # --- STATS --- (written by the connection threads and the batcher, read by stats())
+        self._stats_lock = threading.Lock()
+        self.latencies = deque(maxlen=10000)
+        self.batch_sizes = Counter()
+        self.requests = 0
+        self.texts = 0
+
+    # --- MODEL ---
+    def load(self):
+        self.model = load_encoder(self.model_name, self.backend)
+
+    def register(self, concepts):
+        key = concepts_key(concepts)
+        if key not in self._indexes:
+            vectors = {cat: self.model.encode(phrases) for cat, phrases in concepts.items()}
+            categories, matrix, _, starts = stack_concepts(vectors)
+            self._indexes[key] = (categories, matrix, starts)
+        return key
+
+    # --- BATCHER ---
+    def submit(self, key, texts):
+        """Blocks until the batcher has scored `texts`; returns [(score, category), ...]"""
+        if key not in self._indexes: raise KeyError("unknown_concepts")
+        request = _Request(key, texts)
+        with self._cond:
+            self._queue.append(request)
+            self._cond.notify()
+        request.done.wait()
+        if request.error: raise RuntimeError(request.error)
+        with self._stats_lock: self.latencies.append(time.perf_counter() - request.queued_at)
+        return request.scores
+
+    def _take_batch(self):
+        with self._cond:
+            while self._running and not self._queue:
+                self._cond.wait(0.5)
+            if not self._queue: return []
+            # First request opens the window; wait for company until it is full or max_wait passed
+            deadline = self._queue[0].queued_at + self.max_wait
+            while sum(len(r.texts) for r in self._queue) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0: break
+                self._cond.wait(remaining)
+
+            batch, size = [], 0
+            while self._queue and (not batch or size + len(self._queue[0].texts) <= self.max_batch):
+                request = self._queue.popleft()
+                batch.append(request)
+                size += len(request.texts)
+            return batch
+
+    def _run_batches(self):
+        while self._running:
+            batch = self._take_batch()
+            if not batch: continue
+            if self.threat_index is not None: self.threat_index.maybe_reload()
+            texts = [t for r in batch for t in r.texts]
+            with self._stats_lock:
+                self.batch_sizes[len(texts)] += 1
+                self.requests += len(batch)
+                self.texts += len(texts)
+            try:
+                # ONE encode for the whole micro-batch, scored per concept set
+                vectors = _normalize(self.model.encode(texts))
+                offset = 0
+                for request in batch:
+                    rows = vectors[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+                    categories, matrix, starts = self._indexes[request.key]
+                    scores = best_concepts(rows, matrix, starts, categories)
+                    if self.threat_index is not None: scores = self.threat_index.merge(rows, scores)
+                    request.scores = scores
+            except Exception as e:
+                for request in batch: request.error = f"{type(e).__name__}: {e}"
+            for request in batch: request.done.set()
+
+    def stats(self):
+        # Copy first: sorting a deque another thread appends to raises "mutated during iteration"
+        with self._stats_lock:
+            latencies = list(self.latencies)
+            batch_sizes = dict(self.batch_sizes)
+            requests, texts = self.requests, self.texts
+        latencies.sort()
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3) if latencies else 0.0
+        return {
+            "requests": requests, "texts": texts, "concept_sets": len(self._indexes),
+            "latency_ms": {"p50": pct(0.50), "p90": pct(0.90), "p99": pct(0.99)},
+            "batch_sizes": {str(k): v for k, v in sorted(batch_sizes.items())},
+            "backend": self.backend, "encoder": self.encoder_id, "max_batch": self.max_batch, "max_wait_ms": self.max_wait * 1000,
+        }
+
+    # --- SOCKET ---
+    def _handle(self, message):
+        op = message.get("op")
+        if op == "score":
+            try:
+                scores = self.submit(message["key"], message["texts"])
+            except KeyError:
+                return {"ok": False, "error": "unknown_concepts"}
+            return {"ok": True, "scores": [[float(s), c] for s, c in scores]}
+        if op == "register":
+            return {"ok": True, "key": self.register(message["concepts"]), "encoder": self.encoder_id}
+        if op == "stats":
+            return {"ok": True, "stats": self.stats()}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    def serve_forever(self):
+        if self.model is None: self.load()
+        if os.path.exists(self.socket_path): os.unlink(self.socket_path)
+
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        reply = server._handle(json.loads(line))
+                    except Exception as e:
+                        reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                    self.wfile.write((json.dumps(reply) + "\n").encode())
+                    self.wfile.flush()
+
+        self._running = True
+        threading.Thread(target=self._run_batches, name="aegis-tier2-batcher", daemon=True).start()
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self._server.daemon_threads = True
+        try:
+            self._server.serve_forever()
+        finally:
+            self._running = False
+            with self._cond: self._cond.notify_all()
+            self._server.server_close()
+            try: os.unlink(self.socket_path)
+            except OSError: pass
+
+    def close(self):
+        """Stops serve_forever() running in another thread"""
+        if self._server is not None: self._server.shutdown()
+
+
+class InferenceClient:
+    """
+    SecurityBrain's side of the socket. score() returns None whenever the server can't
+    answer (not running, timeout, error) or runs another encoder than `encoder` (the
+    brain's verdict cache is keyed on its own encoder id), so the brain falls back to
+    in-process Tier 2; after a failure the server is not retried for `retry_after` seconds.
+    One connection per thread, so concurrent scans in one process land in one micro-batch.
+    """
+
+    def __init__(self, socket_path, timeout=5.0, retry_after=5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._down_until = 0.0
+        self._local = threading.local()
+
+    def _call(self, message):
+        conn = self._local
+        if getattr(conn, "sock", None) is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            conn.sock, conn.reader, conn.registered = sock, sock.makefile("rb"), set()
+        conn.sock.sendall((json.dumps(message) + "\n").encode())
+        line = conn.reader.readline()
+        if not line: raise ConnectionError("inference server closed the connection")
+        return json.loads(line)
+
+    def _disconnect(self):
+        conn = self._local
+        try:
+            if getattr(conn, "sock", None) is not None: conn.sock.close()
+        except OSError: pass
+        conn.sock = conn.reader = None
+
+    def score(self, texts, concepts, encoder=None):
+        if time.monotonic() < self._down_until: return None
+        try:
+            key = concepts_key(concepts)
+            for _ in range(2):
+                if getattr(self._local, "sock", None) is None or key not in self._local.registered:
+                    reply = self._call({"op": "register", "concepts": concepts})
+                    if not reply.get("ok"): raise RuntimeError(reply.get("error"))
+                    if encoder is not None and reply.get("encoder") != encoder:
+                        raise RuntimeError(f"server runs encoder {reply.get('encoder')}, not {encoder}")
+                    self._local.registered.add(key)
+                reply = self._call({"op": "score", "key": key, "texts": texts})
+                if reply.get("ok"):
+                    # float32 round-trips exactly through JSON, so thresholds match the local path
+                    return [(np.float32(s) if s > 0.0 else 0.0, c) for s, c in reply["scores"]]
+                if reply.get("error") != "unknown_concepts": raise RuntimeError(reply.get("error"))
+                self._local.registered.discard(key)  # server restarted: register again
+            raise RuntimeError("concepts not accepted")
+        except Exception as e:
+            self._disconnect()
+            self._down_until = time.monotonic() + self.retry_after
+            print(f"⚠️ TIER 2 SERVER UNAVAILABLE ({self.socket_path}): {e} -> in-process fallback")
+            return None
+
+    def stats(self):
+        try:
+            return self._call({"op": "stats"})["stats"]
+        except Exception:
+            self._disconnect()
+            return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=os.environ.get("AEGIS_TIER2_SOCKET", "/tmp/aegis-tier2.sock"))
+    parser.add_argument("--max-batch", type=int, default=64, help="flush a micro-batch at this many texts")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="max time the first request waits for company")
+    parser.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND, help="Tier 2 encoder (see src/encoders.py)")
+    parser.add_argument("--threat-index", help="threat-exemplar index directory (see src/threat_index.py)")
+    parser.add_argument("--stats", action="store_true", help="print a running server's stats and exit")
+    args = parser.parse_args(argv)
+
+    if args.stats:
+        print(json.dumps(InferenceClient(args.socket).stats(), indent=2))
+        return
+
+    server = InferenceServer(args.socket, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms,
+                             backend=args.backend, threat_index=ThreatIndex(args.threat_index) if args.threat_index else None)
+    print(f"⚡ Loading Tier 2 ({server.model_name}, {server.backend})...")
+    server.load()
+    print(f"🚀 TIER 2 SERVER on {args.socket} (max batch {args.max_batch}, max wait {args.max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n" + json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+NETWORK-LAYER INTERCEPTION: scan documents and scripts before the page renders them.
+
+A Playwright route handler fetches every document / script response itself, runs the
+body through the streaming static scanner (src/static_scanner.py: same phrase rules,
+same SecurityBrain) and only then hands it to the page:
+
+    document  the flagged elements get data-aegis-prescan (and, with policy="block",
+              data-aegis-blocked for the critical ones) written into their start tags,
+              plus a <style> that outlines / disables them, so they are marked before
+              first paint. The DOM scans skip elements that already carry the marker
+              and can concentrate on what scripts generate later.
+    script    string / template literals (where attacks.js keeps its injected markup)
+              are scanned as an HTML fragment; with policy="block" a script carrying
+              critical threats is replaced by a stub.
+
+Verdicts are cached per (URL, sha1 of the body), so repeated assets are scanned once.
+Playwright only hands over a response body once it has fully arrived. The scan then
+streams over that buffer in chunks and never builds a DOM.
+
+    interceptor = ResponseInterceptor(rules, brain, policy="annotate", on_verdict=...)
+    interceptor.attach(page)        # or a BrowserContext, before goto()
+"""
+import hashlib
+import html
+import re
+from collections import OrderedDict
+
+from .metrics import METRICS
+from .static_scanner import StaticScanner, CHUNK_SIZE
+
+POLICIES = ("monitor", "annotate", "block")
+SCANNED_TYPES = ("document", "script")
+MAX_BODY = 5 * 1024 * 1024          # bigger responses pass through unscanned
+MAX_SCRIPT_LITERALS = 5000
+
+# String, single-quoted and template literals of at least 10 characters
+_JS_LITERAL = re.compile(r'"((?:[^"\\\n]|\\.){10,})"|\'((?:[^\'\\\n]|\\.){10,})\'|`((?:[^`\\]|\\.){10,})`', re.S)
+_JS_ESCAPES = {"\\n": "\n", "\\t": " ", "\\'": "'", '\\"': '"', "\\`": "`", "\\\\": "\\"}
+_JS_ESCAPE = re.compile(r"\\[nt'\"`\\]")
+
+PRESCAN_STYLE = ('<style id="aegis-prescan">[data-aegis-prescan]{outline:4px solid orange !important}'
+                 '[data-aegis-blocked="true"]{pointer-events:none !important;cursor:not-allowed !important;'
+                 'outline:4px solid red !important}</style>')
+
+
+def script_fragment(source):
+    """The literals of a script as one HTML fragment: markup stays markup, plain strings become <p>s"""
+    parts = []
+    for m in _JS_LITERAL.finditer(source):
+        literal = _JS_ESCAPE.sub(lambda e: _JS_ESCAPES[e.group(0)], m.group(1) or m.group(2) or m.group(3))
+        parts.append(literal if "<" in literal and ">" in literal else f"<p>{html.escape(literal)}</p>")
+        if len(parts) >= MAX_SCRIPT_LITERALS: break
+    return "\n".join(parts)
+
+
+def annotate_document(text, threats, block=False):
+    """Writes the prescan markers into the start tags the static scanner reported"""
+    line_starts = [0]
+    for m in re.finditer("\n", text):
+        line_starts.append(m.end())
+    inserts = {}
+    for threat in threats:
+        line, col = threat["pos"]
+        if line > len(line_starts): continue
+        at = line_starts[line - 1] + col
+        tag = "<" + threat["tag"]
+        if text[at:at + len(tag)].lower() != tag: continue
+        attrs = f' data-aegis-prescan="{html.escape(threat["threat_type"])}"'
+        if block and threat["level"] == "CRITICAL": attrs += ' data-aegis-blocked="true"'
+        inserts[at + len(tag)] = attrs
+    if not inserts: return text
+
+    out, last = [], 0
+    for at in sorted(inserts):
+        out += [text[last:at], inserts[at]]
+        last = at
+    out.append(text[last:])
+    text = "".join(out)
+    # Outline / disable before first paint: right after <head> (or at the very top)
+    head = re.search(r"<head(?:\s[^>]*)?>", text, re.I)
+    cut = head.end() if head else 0
+    return text[:cut] + PRESCAN_STYLE + text[cut:]
+
+
+class ResponseInterceptor:
+    def __init__(self, rules, brain, policy="annotate", on_verdict=None, cache_size=2048):
+        if policy not in POLICIES: raise ValueError(f"unknown interception policy {policy!r}")
+        self.rules = rules
+        self.brain = brain
+        self.policy = policy
+        self.on_verdict = on_verdict
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.hits = self.misses = 0
+
+    def attach(self, target):
+        """target: a Page or BrowserContext (sync API)"""
+        target.route("**/*", self._handle)
+
+    def _handle(self, route):
+        request = route.request
+        if request.resource_type not in SCANNED_TYPES:
+            return route.fallback()
+        try:
+            # Redirects are not followed here: the browser follows them itself (updating the
+            # URL and origin) and the target comes back through this route as its own request
+            response = route.fetch(max_redirects=0)
+        except Exception:
+            return route.fallback()
+        if 300 <= response.status < 400:
+            return route.fulfill(response=response)
+        try:
+            body = response.body()
+        except Exception:
+            return route.fallback()
+        if response.status >= 400 or len(body) > MAX_BODY:
+            return route.fulfill(response=response, body=body)
+
+        with METRICS.stage("intercept"):
+            verdict = self.verdict(request.url, request.resource_type, body)
+            new_body = self._rewrite(request.resource_type, body, verdict)
+        headers = dict(response.headers)
+        headers["x-aegis-prescan"] = f"threats={verdict['threat_count']}; score={verdict['score']}"
+        if new_body is not body: headers.pop("content-length", None)
+        route.fulfill(response=response, body=new_body, headers=headers)
+
+    def verdict(self, url, kind, body):
+        """Scan result for one response body, from the (URL, content hash) cache when possible"""
+        key = (url, hashlib.sha1(body).hexdigest())
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            METRICS.inc("intercept_cache_hits")
+            return cached
+
+        self.misses += 1
+        METRICS.inc("intercepted_responses")
+        scanner = StaticScanner(self.rules, self.brain, url=url)
+        if kind == "script":
+            fragment = script_fragment(body.decode("utf-8", errors="replace")).encode("utf-8")
+            result = scanner.scan_chunks([fragment], source=url)
+        else:
+            result = scanner.scan_chunks((body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)), source=url)
+        verdict = {"url": url, "kind": kind, "threats": result["threats"],
+                   "threat_count": result["threat_count"], "score": result["score"]}
+
+        self._cache[key] = verdict
+        if len(self._cache) > self.cache_size: self._cache.popitem(last=False)
+        if verdict["threat_count"] and self.on_verdict: self.on_verdict(verdict)
+        return verdict
+
+    def _rewrite(self, kind, body, verdict):
+        if not verdict["threat_count"] or self.policy == "monitor": return body
+        block = self.policy == "block"
+        if kind == "script":
+            if not block or not any(t["level"] == "CRITICAL" for t in verdict["threats"]): return body
+            return (f"console.warn({verdict['url']!r} + ' blocked by AEGIS: "
+                    f"{verdict['threat_count']} threat(s) in script');").encode("utf-8")
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            return body  # positions are only meaningful for the text the scanner decoded
+        return annotate_document(text, verdict["threats"], block=block).encode("utf-8")
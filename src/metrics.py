@@ -0,0 +1,183 @@
+"""
+HOT-PATH INSTRUMENTATION: per-stage latency histograms and counters for the
+bodyguards and SecurityBrain, with an optional localhost Prometheus-style endpoint.
+
+Off by default. While disabled every call returns after one attribute check, so the
+instrumented code paths cost next to nothing:
+
+    from src.metrics import METRICS
+    with METRICS.stage("snapshot"): ...
+    METRICS.inc("elements_scanned", len(nodes))
+
+Turn it on with AEGIS_METRICS=1, or METRICS.enable(port=9464) to also serve
+http://127.0.0.1:9464/metrics (with AEGIS_METRICS=1, AEGIS_METRICS_PORT does the same for the dashboard).
+"""
+import bisect
+import contextlib
+import http.server
+import os
+import threading
+import time
+
+# Upper bounds (seconds) of the latency buckets, Prometheus-style "le"
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+# Counter name -> HELP line
+COUNTERS = {
+    "scans": "scan_page calls",
+    "elements_scanned": "Snapshot nodes handed to the scanners",
+    "threats_flagged": "New threats flagged (after de-duplication)",
+    "tier1_decisions": "Texts decided by Tier 1 alone",
+    "tier2_decisions": "Texts escalated to and decided by Tier 2",
+    "tier2_fallbacks": "Escalations answered by the Tier 1 heuristic while Tier 2 was warming up",
+    "cache_hits": "Verdict cache hits",
+    "cache_misses": "Verdict cache misses",
+    "near_dup_hits": "Escalations answered by a near-duplicate's Tier 2 verdict",
+    "playwright_round_trips": "Playwright calls that crossed into the browser",
+    "intercepted_responses": "Documents / scripts scanned at the network layer",
+    "intercept_cache_hits": "Intercepted responses answered from the URL + body-hash verdict cache",
+    "budget_overruns": "Budgeted scans that deferred passive analysis",
+    "passive_deferred": "Nodes whose passive analysis was deferred to a later scan",
+    "sched_scans_navigation": "Scheduler: scans triggered by a navigation",
+    "sched_scans_load": "Scheduler: scans triggered by a load event",
+    "sched_scans_full": "Scheduler: scans of a page that needed a full snapshot",
+    "sched_scans_mutation": "Scheduler: scans triggered by DOM mutations",
+    "sched_scans_heartbeat": "Scheduler: periodic full rescans",
+    "sched_idle_ticks": "Scheduler: probes that found nothing to scan",
+}
+
+_NULL = contextlib.nullcontext()
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (0 if empty)"""
+        if not self.count: return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank: return bound if bound != float("inf") else BUCKETS[-2]
+        return BUCKETS[-2]
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "t0")
+
+    def __init__(self, metrics, name):
+        self.metrics, self.name = metrics, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class Metrics:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def enable(self, port=None, host="127.0.0.1"):
+        """Starts collecting; with a port, also serves /metrics (once per process)"""
+        self.enabled = True
+        if port and self._server is None:
+            self._server = serve(self, int(port), host)
+        return self
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.counters = dict.fromkeys(COUNTERS, 0)
+            self.stages = {}
+
+    # --- HOT PATH (one attribute check when disabled) ---
+    def inc(self, name, n=1):
+        if not self.enabled: return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, seconds):
+        if not self.enabled: return
+        with self._lock:
+            hist = self.stages.get(name)
+            if hist is None: hist = self.stages[name] = _Histogram()
+            hist.observe(seconds)
+
+    def stage(self, name):
+        """Context manager timing one stage into its histogram"""
+        if not self.enabled: return _NULL
+        return _Stage(self, name)
+
+    # --- READERS ---
+    def summary(self):
+        """Compact numbers for the dashboard panel: counters + p50/p99/count per stage"""
+        with self._lock:
+            stages = {name: {"count": h.count, "p50_ms": h.quantile(0.5) * 1000, "p99_ms": h.quantile(0.99) * 1000,
+                             "mean_ms": h.total / h.count * 1000 if h.count else 0.0}
+                      for name, h in self.stages.items()}
+            return {"counters": dict(self.counters), "stages": stages}
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, value in self.counters.items():
+                metric = f"aegis_{name}_total"
+                lines += [f"# HELP {metric} {COUNTERS.get(name, name)}", f"# TYPE {metric} counter",
+                          f"{metric} {value}"]
+            lines += ["# HELP aegis_stage_seconds Wall time per hot-path stage",
+                      "# TYPE aegis_stage_seconds histogram"]
+            for name, hist in sorted(self.stages.items()):
+                seen = 0
+                for bound, n in zip(BUCKETS, hist.counts):
+                    seen += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'aegis_stage_seconds_bucket{{stage="{name}",le="{le}"}} {seen}')
+                lines.append(f'aegis_stage_seconds_sum{{stage="{name}"}} {hist.total}')
+                lines.append(f'aegis_stage_seconds_count{{stage="{name}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+
+def serve(metrics, port, host="127.0.0.1"):
+    """GET /metrics on host:port from a daemon thread; returns the server"""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args): pass
+
+    server = http.server.ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="aegis-metrics", daemon=True).start()
+    return server
+
+
+# One per process, shared by every bodyguard and brain
+METRICS = Metrics(enabled=os.environ.get("AEGIS_METRICS", "") not in ("", "0"))
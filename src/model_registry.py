@@ -0,0 +1,33 @@
+import threading
+
+from .ai_brain import SecurityBrain
+
+# One SecurityBrain per process: every BrowserBodyguard (and every tab / thread) shares it,
+# so security_model.pkl, the transformer and the concept embeddings are loaded once.
+_brain = None
+_lock = threading.Lock()
+
+
+def get_brain(**kwargs):
+    """
+    Returns the process-wide SecurityBrain, creating it on first use.
+    kwargs (cache_size, cache_path, rules, tier2, tier2_socket) only apply to that first call.
+    """
+    global _brain
+    if _brain is None:
+        with _lock:
+            if _brain is None:
+                _brain = SecurityBrain(**kwargs)
+    return _brain
+
+
+def set_brain(brain):
+    """Installs an already-built brain as the shared instance (e.g. one with custom settings)"""
+    global _brain
+    with _lock:
+        _brain = brain
+
+
+def reset_brain():
+    """Drops the shared instance; the next get_brain() builds a fresh one"""
+    set_brain(None)
@@ -0,0 +1,144 @@
+import hashlib
+import re
+import struct
+import threading
+from collections import OrderedDict
+
+from .verdict_cache import normalize_text
+
+# Variable parts of templated text: IPs, hex digests, numbers (times, counters, amounts)
+_VARIABLE = re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}\b|\b(?=[0-9a-f]*\d)[0-9a-f]{6,}\b|\d+(?:[.,:]\d+)*")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+# MinHash: one 64-byte blake2b digest per shingle = 16 independent 32-bit hashes
+SLOTS = 16
+_SLOTS = struct.Struct(f"<{SLOTS}I")
+# Exact similarity checks per lookup: hot buckets (shingles every template shares) cannot make a lookup O(n)
+MAX_CANDIDATES = 64
+
+
+def template_of(text):
+    """Normalized text with every variable part masked: 'Node 12 heartbeat OK' -> 'node # heartbeat ok'"""
+    return _VARIABLE.sub("#", normalize_text(text))
+
+
+def shingles(template):
+    """Unigrams + bigrams of a template"""
+    tokens = _TOKEN.findall(template)
+    return frozenset(tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])])
+
+
+def minhash(features):
+    """SLOTS minimum hashes: two sets agree on a slot with probability = their Jaccard similarity"""
+    if not features: return (0,) * SLOTS
+    rows = [_SLOTS.unpack(hashlib.blake2b(f.encode("utf-8"), digest_size=64).digest()) for f in features]
+    return tuple(map(min, zip(*rows)))
+
+
+def jaccard(a, b):
+    if not a and not b: return 1.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """
+    Maps near-duplicate strings to the verdict of a representative already classified.
+
+    Texts are reduced to a template (numbers, IPs, hashes masked) and shingled into
+    unigrams + bigrams. Candidates come from MinHash LSH (SLOTS hashes in `bands`
+    bands: any shared band puts two texts in the same bucket, O(1) per band) and are
+    then checked against the exact Jaccard similarity of the shingle sets, so nothing
+    below `threshold` is ever merged, however the buckets collide.
+
+    A representative's verdict is only reused when both texts fire the same
+    tier2_triggers rules, so a benign line never lends its verdict to a variant that
+    gained an attack keyword.
+
+    Bounded LRU of `max_entries` representatives. clear() whenever the models change
+    (the brain does it together with the verdict cache's set_version).
+    """
+
+    def __init__(self, rules, threshold=0.7, bands=8, max_entries=20000):
+        if SLOTS % bands: raise ValueError(f"bands must divide {SLOTS}")
+        self.rules = rules
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = SLOTS // bands
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # template -> (verdict, shingles, triggers, band keys)
+        self._buckets = {}              # band key -> set of templates
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def _triggers(self, text):
+        return frozenset(rule.id for _, rule in self.rules.match("tier2_triggers", text))
+
+    def _band_keys(self, features):
+        signature = minhash(features)
+        return [(band,) + signature[band * self.rows:(band + 1) * self.rows] for band in range(self.bands)]
+
+    def get_many(self, texts):
+        """Representative verdict per text (None where nothing similar enough is known), in input order"""
+        found = [None] * len(texts)
+        with self._lock:
+            for i, text in enumerate(texts):
+                template, triggers = template_of(text), self._triggers(text)
+                if template not in self._entries:
+                    template = self._nearest(shingles(template), triggers)
+                entry = self._entries.get(template)
+                if entry is not None and entry[2] == triggers:
+                    self._entries.move_to_end(template)
+                    found[i] = entry[0]
+            hit_count = sum(1 for v in found if v is not None)
+            self.hits += hit_count
+            self.misses += len(texts) - hit_count
+        return found
+
+    def _nearest(self, features, triggers):
+        best, best_similarity = None, self.threshold
+        seen = set()
+        for band_key in self._band_keys(features):
+            for candidate in self._buckets.get(band_key, ()):
+                if candidate in seen: continue
+                if len(seen) >= MAX_CANDIDATES: return best
+                seen.add(candidate)
+                _, candidate_features, candidate_triggers, _ = self._entries[candidate]
+                if candidate_triggers != triggers: continue
+                similarity = jaccard(features, candidate_features)
+                if similarity >= best_similarity: best, best_similarity = candidate, similarity
+        return best
+
+    def put_many(self, texts, verdicts):
+        with self._lock:
+            for text, verdict in zip(texts, verdicts):
+                template = template_of(text)
+                entry = self._entries.get(template)
+                if entry is None:
+                    features = shingles(template)
+                    band_keys = self._band_keys(features)
+                    for band_key in band_keys:
+                        self._buckets.setdefault(band_key, set()).add(template)
+                else:
+                    features, band_keys = entry[1], entry[3]
+                self._entries[template] = (verdict, features, self._triggers(text), band_keys)
+                self._entries.move_to_end(template)
+                while len(self._entries) > self.max_entries:
+                    self._evict()
+
+    def _evict(self):
+        template, entry = self._entries.popitem(last=False)
+        for band_key in entry[3]:
+            bucket = self._buckets.get(band_key)
+            if bucket is None: continue
+            bucket.discard(template)
+            if not bucket: del self._buckets[band_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"entries": len(self._entries), "buckets": len(self._buckets), "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
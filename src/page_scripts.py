@@ -0,0 +1,473 @@
+"""
+JavaScript that Aegis runs inside the page, shared by the sync and async bodyguards.
+"""
+
+# Which scanner(s) a snapshot node is a candidate for (bitmask in node["kinds"])
+KIND_BUTTON = 1   # scan_risky_buttons
+KIND_INPUT = 2    # scan_phishing_only
+KIND_TEXT = 4     # scan_visible_injection
+KIND_CSS = 8      # scan_hidden_css
+KIND_OVERLAY = 16 # scan_overlays (set by the hit-test pass, node["overlay"] describes the layer)
+
+# Texts longer than this are cut in-page. Every length gate in the scanners is far below it,
+# and it keeps the payload small when big containers repeat the whole page's innerText.
+MAX_SNAPSHOT_TEXT = 2000
+# ... except on CSS-hidden elements, where an instruction can sit behind any amount of filler.
+# scan_hidden_css reads their whole text (the brain gets it in MAX_SNAPSHOT_TEXT windows).
+MAX_HIDDEN_TEXT = 50000
+
+# DIRTY TRACKING: a MutationObserver remembers which elements changed since the last scan.
+# __aegisDirty maps element -> deep: added nodes (and attribute changes, which can restyle
+# descendants) get their subtree walked; the parent a child was added to / removed from, and
+# the element whose text changed, only have themselves and their ancestors re-read, so an
+# append to <body> costs the appended subtree, not a walk of the whole page.
+# Aegis' own HUD and popup are never tracked, nor are its remediation writes: QUARANTINE_JS
+# hands the records queued before a write to __aegisTrack and drops the ones the write caused.
+# Idempotent, so it can run from the init script (every new document) AND lazily from the
+# snapshot when the guard was attached to an already-loaded page.
+OBSERVER_JS = """
+    if (!window.__aegisObserver) {
+        window.__aegisDirty = new Map();
+        window.__aegisNeedsFull = true;
+        const OWN_UI = '#aegis-risk-hud, #aegis-popup';
+        const isOwnUi = (node) => node.nodeType === 1 && node.matches(OWN_UI);
+        const markDirty = (node, deep) => {
+            const el = node.nodeType === 1 ? node : node.parentElement;
+            if (!el || window.__aegisNeedsFull) return;
+            if (el.closest && el.closest(OWN_UI)) return;
+            if (!window.__aegisDirty.get(el)) window.__aegisDirty.set(el, deep);
+            // Wake the scheduler (binding exposed by src/scheduler.py), at most every 50ms
+            if (window.__aegisNotify && !window.__aegisNotifyPending) {
+                window.__aegisNotifyPending = true;
+                setTimeout(() => { window.__aegisNotifyPending = false; window.__aegisNotify(); }, 50);
+            }
+        };
+        window.__aegisMutations = 0;
+        window.__aegisTrack = (records) => {
+            window.__aegisMutations += records.length;
+            for (const r of records) {
+                if (r.type === 'childList') {
+                    if ([...r.addedNodes, ...r.removedNodes].every(isOwnUi)) continue;
+                    r.addedNodes.forEach((n) => markDirty(n, true));
+                    markDirty(r.target, false);
+                }
+                else if (r.type === 'attributes') { if (!r.attributeName.startsWith('data-aegis')) markDirty(r.target, true); }
+                else markDirty(r.target, false);
+            }
+        };
+        window.__aegisObserver = new MutationObserver(window.__aegisTrack);
+        window.__aegisObserver.observe(document, { subtree: true, childList: true, characterData: true, attributes: true });
+    }
+"""
+
+# SCHEDULER PROBE: is there anything to scan? One tiny round trip, no DOM walk.
+# dirty = -1 means the observer is not installed yet (guard attached to a loaded page).
+PROBE_JS = """() => ({
+    dirty: window.__aegisDirty ? window.__aegisDirty.size : -1,
+    full: window.__aegisNeedsFull !== false,
+    mutations: window.__aegisMutations || 0,
+    hidden: document.hidden
+})"""
+
+# CLICKJACKING / OVERLAY HIT-TEST: samples the viewport on a grid with elementFromPoint and
+# compares the topmost hit with the control the user actually sees underneath. A layer is
+# reported when it is (nearly) transparent, or clickable with nothing visible in it, while an
+# interactive element sits under it. Cost follows the grid, not the element count:
+#   coarse pass   one point per HIT_STEP px cell (only cells that overlap changed elements
+#                 on incremental scans, every cell after a full scan / scroll / resize)
+#   refinement    a 3x3 sub-grid in cells whose center hit something suspicious, then in
+#                 cells whose center hit differs from a neighbour's (an edge runs through them)
+#   at most HIT_MAX_POINTS elementFromPoint calls per scan
+# Runs inside SNAPSHOT_JS (same round trip, same ids): (dirty elements | null) -> overlays.
+HIT_STEP = 40
+HIT_MAX_POINTS = 1500
+
+HITTEST_JS = """(dirty) => {
+    const W = window.innerWidth, H = window.innerHeight;
+    const view = [window.scrollX, window.scrollY, W, H].join(',');
+    let rects = null;
+    if (dirty && window.__aegisHitView === view && dirty.length <= 300) {
+        rects = [];
+        for (const el of dirty) {
+            if (!el.isConnected) continue;
+            const r = el.getBoundingClientRect();
+            if (r.width && r.height && r.bottom > 0 && r.right > 0 && r.top < H && r.left < W) rects.push(r);
+        }
+        if (!rects.length) return [];
+    }
+    window.__aegisHitView = view;
+
+    const INTERACTIVE = "a[href], button, input:not([type='hidden']), select, textarea, summary, label[for], [role='button'], [role='link'], [onclick]";
+    const opacities = new Map();
+    const opacityOf = (el) => {
+        if (!el || el.nodeType !== 1) return 1;
+        let o = opacities.get(el);
+        if (o === undefined) {
+            o = parseFloat(window.getComputedStyle(el).opacity) * opacityOf(el.parentElement);
+            opacities.set(el, o);
+        }
+        return o;
+    };
+    const isEmpty = (el) => {
+        if ((el.innerText || '').trim() || el.querySelector('img, svg, video, canvas')) return false;
+        const s = window.getComputedStyle(el);
+        return s.backgroundImage === 'none' && (s.backgroundColor === 'transparent' || s.backgroundColor === 'rgba(0, 0, 0, 0)');
+    };
+    const verdicts = new Map();   // layer -> null (harmless) | {kind, opacity}
+    const suspicious = (top) => {
+        if (!top || top === document.documentElement || top === document.body) return false;
+        let v = verdicts.get(top);
+        if (v === undefined) {
+            v = null;
+            if (!top.closest('#aegis-risk-hud') && top.getAttribute('data-aegis-blocked') !== 'true') {
+                const opacity = opacityOf(top);
+                const link = top.matches(INTERACTIVE) && !top.matches('input, select, textarea');
+                if (opacity < 0.1) v = { kind: link || window.getComputedStyle(top).cursor === 'pointer' ? 'transparent-link' : 'transparent-layer', opacity: opacity };
+                else if (link && isEmpty(top)) v = { kind: 'empty-link', opacity: opacity };
+            }
+            verdicts.set(top, v);
+        }
+        return v !== null;
+    };
+
+    const found = new Map();      // layer -> report
+    const checks = new Map();     // layer -> elementsFromPoint calls spent on it
+    let points = 0;
+    const probe = (x, y) => {
+        points++;
+        const top = document.elementFromPoint(x, y);
+        if (!suspicious(top)) return top;
+        const report = found.get(top);
+        if (report) { report.points++; return top; }
+        const spent = checks.get(top) || 0;
+        if (spent >= 16) return top;
+        checks.set(top, spent + 1);
+        // The control the user sees here: first visible interactive element under the layer
+        for (const el of document.elementsFromPoint(x, y)) {
+            if (el === top || el.contains(top) || top.contains(el)) continue;
+            const control = el.closest(INTERACTIVE);
+            if (!control || control.contains(top) || opacityOf(control) < 0.1) continue;
+            const v = verdicts.get(top);
+            found.set(top, { layer: top, control: control, kind: v.kind, opacity: v.opacity, points: 1 });
+            break;
+        }
+        return top;
+    };
+
+    const cols = Math.ceil(W / __STEP__), rows = Math.ceil(H / __STEP__);
+    const wanted = (c, r) => {
+        if (!rects) return true;
+        const x0 = c * __STEP__, y0 = r * __STEP__;
+        return rects.some(b => b.left < x0 + __STEP__ && b.right > x0 && b.top < y0 + __STEP__ && b.bottom > y0);
+    };
+    const tops = new Array(cols * rows);
+    for (let r = 0; r < rows; r++) for (let c = 0; c < cols; c++) {
+        if (points >= __MAX__) break;
+        if (wanted(c, r)) tops[r * cols + c] = probe(Math.min(c * __STEP__ + __STEP__ / 2, W - 1), Math.min(r * __STEP__ + __STEP__ / 2, H - 1)) || null;
+    }
+    const first = [], second = [];
+    for (let i = 0; i < tops.length; i++) {
+        const t = tops[i];
+        if (t === undefined) continue;
+        if (t && verdicts.get(t)) first.push(i);
+        else if ((i % cols && tops[i - 1] !== undefined && tops[i - 1] !== t) ||
+                 (i >= cols && tops[i - cols] !== undefined && tops[i - cols] !== t)) second.push(i);
+    }
+    const fine = __STEP__ / 3;
+    for (const i of first.concat(second)) {
+        const x0 = (i % cols) * __STEP__, y0 = Math.floor(i / cols) * __STEP__;
+        for (let a = 0; a < 3; a++) for (let b = 0; b < 3; b++) {
+            if (a === 1 && b === 1) continue;  // the center was the coarse sample
+            const x = x0 + fine * (a + 0.5), y = y0 + fine * (b + 0.5);
+            if (x < W && y < H && points < __MAX__) probe(x, y);
+        }
+        if (points >= __MAX__) break;
+    }
+
+    window.__aegisHitPoints = points;
+    const label = (el) => cut(el.innerText || el.value || el.getAttribute('aria-label') || el.getAttribute('title') || '').slice(0, 80);
+    return [...found.values()].map(f => ({
+        id: idOf(f.layer), tag: f.layer.tagName.toLowerCase(), kind: f.kind, opacity: Math.round(f.opacity * 1000) / 1000,
+        points: f.points, controlTag: f.control.tagName.toLowerCase(), controlText: label(f.control)
+    }));
+}""".replace("__STEP__", str(HIT_STEP)).replace("__MAX__", str(HIT_MAX_POINTS))
+
+# DOM SNAPSHOT: walks every candidate node ONCE inside the page and returns a compact list.
+# Nodes get a stable id through a WeakMap (no DOM attributes written), so Python can
+# come back for the handful of elements that actually get flagged.
+# incremental=true only walks what the observer marked dirty: the added / restyled subtrees,
+# the changed elements and their ancestors (whose innerText changed with them), and inputs
+# sitting directly under those.
+SNAPSHOT_JS = """(incremental) => {
+    const SELECTORS = [
+        [1, "button, a, div[role='button'], div[class*='btn'], span[class*='btn']"],
+        [2, "input"],
+        [4, "p, h1, h2, h3, h4, span, div, pre, code"],
+        [8, "div, p, span, h1, h2, h3, a"]
+    ];
+    const ALL = SELECTORS.map(s => s[1]).join(', ');
+    if (!window.__aegisIds) {
+        window.__aegisIds = new WeakMap();
+        window.__aegisNodes = new Map();
+        window.__aegisNextId = 1;
+    }
+    const idOf = (el) => {
+        let id = window.__aegisIds.get(el);
+        if (!id) {
+            id = window.__aegisNextId++;
+            window.__aegisIds.set(el, id);
+        }
+        if (!window.__aegisNodes.has(id)) window.__aegisNodes.set(id, new WeakRef(el));
+        return id;
+    };
+    const cut = (t, max = __MAX_TEXT__) => (t || '').trim().slice(0, max);
+    // Same test as scanners.is_hidden_style
+    const looksHidden = (s) => parseFloat(s.opacity) < 0.2 || parseFloat(s.fontSize) < 6 ||
+        (s.position === 'absolute' && parseFloat(s.left) < 0);
+
+    __OBSERVER__
+    const full = !incremental || window.__aegisNeedsFull;
+    let candidates;
+    if (full) {
+        candidates = document.querySelectorAll(ALL);
+    } else {
+        candidates = new Set();
+        // Ancestor chains are shared: stop climbing at the first element already re-read
+        const reread = new Set();
+        for (const [el, deep] of window.__aegisDirty) {
+            if (!el.isConnected) continue;
+            if (deep) el.querySelectorAll(ALL).forEach(n => candidates.add(n));
+            for (let a = el; a && !reread.has(a); a = a.parentElement) {
+                reread.add(a);
+                if (a.matches(ALL)) candidates.add(a);
+                // Inputs read their parent's text
+                for (const c of a.children) if (c.tagName === 'INPUT') candidates.add(c);
+            }
+        }
+    }
+    // Hit-test before the dirty set is gone: incremental scans only re-sample where elements were
+    // added or restyled (a parent that merely gained a child would cover the whole viewport)
+    const overlays = (__HITTEST__)(full ? null : [...window.__aegisDirty].filter(([, deep]) => deep).map(([el]) => el));
+    window.__aegisDirty.clear();
+    window.__aegisNeedsFull = false;
+
+    const out = [];
+    for (const el of candidates) {
+        let kinds = 0;
+        for (const [bit, sel] of SELECTORS) if (el.matches(sel)) kinds |= bit;
+        const node = {
+            id: idOf(el), tag: el.tagName.toLowerCase(), role: el.getAttribute('role'), kinds: kinds,
+            text: cut(el.innerText), placeholder: null, parentText: null, style: null,
+            prescanned: el.hasAttribute('data-aegis-prescan')
+        };
+        if (kinds & 2) {
+            node.placeholder = el.getAttribute('placeholder');
+            node.parentText = el.parentElement ? cut(el.parentElement.innerText) : '';
+        }
+        if ((kinds & 8) && node.text.length >= 5) {
+            const s = window.getComputedStyle(el);
+            node.style = { opacity: s.opacity, fontSize: s.fontSize, visibility: s.visibility, display: s.display, left: s.left, position: s.position, zIndex: s.zIndex, transform: s.transform, height: s.height, width: s.width };
+            if (node.text.length === __MAX_TEXT__ && looksHidden(s)) node.text = cut(el.innerText, __MAX_HIDDEN_TEXT__);
+        }
+        out.push(node);
+    }
+    if (overlays.length) {
+        const byId = new Map(out.map(n => [n.id, n]));
+        for (const o of overlays) {
+            let node = byId.get(o.id);
+            if (!node) {
+                node = { id: o.id, tag: o.tag, role: null, kinds: 0, text: '', placeholder: null, parentText: null,
+                         style: null, prescanned: false };
+                out.push(node);
+            }
+            node.kinds |= __KIND_OVERLAY__;
+            node.overlay = o;
+        }
+    }
+    // Forget ids of nodes that left the DOM so the registry stays bounded (amortized: only when it doubled)
+    if (full || window.__aegisNodes.size > (window.__aegisPurgeAt || 0)) {
+        for (const [id, ref] of window.__aegisNodes) {
+            const el = ref.deref();
+            if (!el || !el.isConnected) window.__aegisNodes.delete(id);
+        }
+        window.__aegisPurgeAt = Math.max(5000, 2 * window.__aegisNodes.size);
+    }
+    return { full: full, nodes: out };
+}""".replace("__MAX_TEXT__", str(MAX_SNAPSHOT_TEXT)).replace("__MAX_HIDDEN_TEXT__", str(MAX_HIDDEN_TEXT)).replace(
+    "__OBSERVER__", OBSERVER_JS).replace(
+    "__HITTEST__", HITTEST_JS).replace("__KIND_OVERLAY__", str(KIND_OVERLAY))
+
+# QUARANTINE: the remediation rules live in the page, so blocked elements stay blocked when a
+# framework re-renders them (new node, reset style, restored text) without a Python round trip.
+# A rule is keyed on the element's tag + original text (placeholder + label for inputs) and kept in
+# sessionStorage so a reload of the same origin re-applies it while the DOM is being parsed.
+# Idempotent, like OBSERVER_JS: installed by the init script and lazily by REMEDIATE_JS.
+QUARANTINE_JS = """
+    if (!window.__aegisQuarantine) {
+        const STORE = 'aegis-quarantine';
+        const q = window.__aegisQuarantine = { rules: new Map(), tags: new Set(), ruleOf: new WeakMap() };
+        // Inputs have no text of their own: the placeholder plus its label (or the text around it)
+        q.content = (el) => el.tagName !== 'INPUT' ? (el.textContent || '').trim().slice(0, 200)
+            : [el.getAttribute('placeholder') || '',
+               (el.labels && el.labels.length ? [...el.labels].map((l) => l.textContent).join(' ')
+                   : (el.parentElement && el.parentElement.textContent) || '').trim().slice(0, 200)]
+              .join('|').replace(/^\\|$/, '');
+        q.signature = (el) => el.tagName + '|' + q.content(el);
+        q.remember = (rule) => { q.rules.set(rule.sig, rule); q.tags.add(rule.sig.split('|')[0]); };
+        q.persist = () => { try { sessionStorage.setItem(STORE, JSON.stringify([...q.rules.values()])); } catch (e) {} };
+        try { JSON.parse(sessionStorage.getItem(STORE) || '[]').forEach(q.remember); } catch (e) {}
+
+        // Aegis' own style writes must not dirty the element they remediate (OBSERVER_JS)
+        const untracked = (write) => {
+            const observer = window.__aegisObserver;
+            if (observer) window.__aegisTrack(observer.takeRecords());
+            write();
+            if (observer) observer.takeRecords();
+        };
+        q.block = (el, rule) => untracked(() => {
+            q.ruleOf.set(el, rule);
+            if (rule.defuse) {
+                // Click-intercepting overlay: let clicks fall through to what is underneath
+                el.setAttribute('data-aegis-blocked', 'true');
+                el.style.pointerEvents = 'none';
+                el.style.outline = '4px dashed ' + rule.color;
+                return;
+            }
+            el.style.border = '4px solid ' + rule.color;
+            if (rule.silent) return;
+            el.setAttribute('data-aegis-blocked', 'true');
+            el.style.pointerEvents = 'none';
+            el.style.cursor = 'not-allowed';
+            el.style.backgroundColor = '#ff0000';
+            el.style.color = 'white';
+            el.style.fontWeight = 'bold';
+            el.style.zIndex = '9999999';
+            el.innerText = '🚫 BLOCKED THREAT 🚫';
+        });
+        const intact = (el, rule) => rule.silent ? el.style.border.includes(rule.color)
+            : rule.defuse ? el.style.pointerEvents === 'none'
+            : el.getAttribute('data-aegis-blocked') === 'true' && el.style.pointerEvents === 'none';
+        const check = (el) => {
+            const known = q.ruleOf.get(el);
+            if (known) { if (!intact(el, known)) q.block(el, known); return; }
+            const rule = q.rules.get(q.signature(el));
+            if (rule) q.block(el, rule);
+        };
+        const sweep = (el) => {
+            if (!el || el.nodeType !== 1 || !q.rules.size) return;
+            if (q.tags.has(el.tagName)) check(el);
+            el.querySelectorAll([...q.tags].join(',')).forEach(check);
+        };
+        new MutationObserver((records) => {
+            if (!q.rules.size) return;
+            for (const r of records) {
+                if (r.type === 'attributes') { if (q.ruleOf.has(r.target)) check(r.target); }
+                else if (r.type === 'characterData') { if (r.target.parentElement) check(r.target.parentElement); }
+                else { r.addedNodes.forEach(sweep); if (q.ruleOf.has(r.target) || q.tags.has(r.target.tagName)) check(r.target); }
+            }
+        }).observe(document, { subtree: true, childList: true, characterData: true, attributes: true,
+                               attributeFilter: ['style', 'data-aegis-blocked'] });
+    }
+"""
+
+# Init script: dirty tracking + quarantine + the click interceptor that enforces data-aegis-blocked
+DEFENSE_JS = OBSERVER_JS + QUARANTINE_JS + """
+    // Create a global list of blocked elements
+    window.aegisBlockedElements = new Set();
+
+    // Override the click method on the window to stop blocked clicks
+    window.addEventListener('click', function(e) {
+        if (e.target.getAttribute('data-aegis-blocked') === 'true' || 
+            e.target.closest('[data-aegis-blocked="true"]')) {
+            e.preventDefault();
+            e.stopPropagation();
+            e.stopImmediatePropagation();
+            alert('⚠️ AEGIS: THIS ACTION WAS BLOCKED FOR YOUR SAFETY.');
+            return false;
+        }
+    }, true);
+"""
+
+HUD_JS = """() => {
+    if (!document.getElementById('aegis-risk-hud')) {
+        const hud = document.createElement('div');
+        hud.id = 'aegis-risk-hud';
+        hud.style.position = 'fixed'; hud.style.bottom = '20px'; hud.style.right = '20px';
+        hud.style.background = 'rgba(0, 0, 0, 0.9)'; hud.style.color = '#00ff00';
+        hud.style.padding = '15px'; hud.style.borderRadius = '8px';
+        hud.style.border = '2px solid #00ff00'; hud.style.fontFamily = 'monospace';
+        hud.style.zIndex = '99999999'; hud.style.fontSize = '16px';
+        hud.style.fontWeight = 'bold';
+        hud.innerHTML = '🛡️ SYSTEM SAFETY<br>RISK SCORE: 0/100<br>STATUS: SECURE';
+        document.body.appendChild(hud);
+    }
+}"""
+
+# Arg: {color, score, status}
+HUD_UPDATE_JS = """(s) => {
+    const hud = document.getElementById('aegis-risk-hud');
+    if (hud) {
+        hud.style.color = s.color;
+        hud.style.borderColor = s.color;
+        hud.innerHTML = '🛡️ SYSTEM SAFETY<br>RISK SCORE: ' + s.score + '/100<br>STATUS: ' + s.status;
+    }
+}"""
+
+# BATCHED REMEDIATION: every verdict of one scan in ONE round trip.
+# Arg: {flags: [{id, color, silent, threatType, defuse}], hud: {color, score, status} | null}
+# Resolves snapshot ids, highlights / blocks each element, registers the quarantine rules,
+# updates the HUD and shows one popup for everything that got blocked. Returns how many applied.
+REMEDIATE_JS = """(arg) => {
+    __QUARANTINE__
+    const q = window.__aegisQuarantine;
+    const blocked = [];
+    let applied = 0;
+    for (const f of arg.flags) {
+        const ref = window.__aegisNodes && window.__aegisNodes.get(f.id);
+        const el = ref && ref.deref();
+        if (!el || !el.isConnected) continue;
+        if (f.defuse) {
+            // Overlays usually have no text: no signature rule, the element itself stays defused
+            q.block(el, { color: f.color, defuse: true });
+        } else {
+            const rule = { sig: q.signature(el), color: f.color, silent: f.silent };
+            // An empty signature would match every element of the tag: block this element only
+            if (q.content(el)) q.remember(rule);
+            q.block(el, rule);
+        }
+        applied++;
+        if (!f.silent && !blocked.includes(f.threatType)) blocked.push(f.threatType);
+    }
+    q.persist();
+    if (arg.hud) (__HUD_UPDATE__)(arg.hud);
+
+    if (blocked.length) {
+        const previous = document.getElementById('aegis-popup');
+        if (previous) previous.remove();
+        const div = document.createElement('div');
+        div.id = 'aegis-popup';
+        div.style.position = 'fixed'; div.style.top = '20px'; div.style.right = '20px';
+        div.style.backgroundColor = '#cc0000'; div.style.color = 'white';
+        div.style.padding = '20px'; div.style.zIndex = '10000000';
+        div.style.borderRadius = '8px'; div.style.fontFamily = 'monospace';
+        div.style.fontWeight = 'bold'; div.style.border = '2px solid white';
+        div.innerHTML = '⚠️ AEGIS ACTIVE DEFENSE<br><br>';
+        div.appendChild(document.createTextNode(blocked.join(', ') + ' Detected!'));
+        document.body.appendChild(div);
+        setTimeout(() => div.remove(), 5000);
+    }
+    return applied;
+}""".replace("__QUARANTINE__", QUARANTINE_JS).replace("__HUD_UPDATE__", HUD_UPDATE_JS)
+
+
+def risk_status(score):
+    """(status, color) shown on the in-page HUD for a 0-100 risk score"""
+    status = "SECURE"
+    color = "#00ff00"
+    if score > 30: 
+        status = "SUSPICIOUS"
+        color = "#ffff00"
+    if score > 70: 
+        status = "CRITICAL THREAT"
+        color = "#ff0000"
+    return status, color
@@ -0,0 +1,189 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rules", "default.json")
+
+
+class Rule:
+    __slots__ = ("id", "ruleset", "pattern", "is_regex", "score", "threat_type", "reason")
+
+    def __init__(self, id, ruleset, pattern, is_regex=False, score=0, threat_type="Unknown", reason=None):
+        self.id = id
+        self.ruleset = ruleset
+        self.pattern = pattern
+        self.is_regex = is_regex
+        self.score = score
+        self.threat_type = threat_type
+        self.reason = reason or f"Matched rule '{id}'"
+
+    def describe(self):
+        """Reason text for the GUI ('{pattern}' in the ruleset reason is filled in)"""
+        return self.reason.replace("{pattern}", self.pattern)
+
+    def __repr__(self):
+        return f"Rule({self.id!r})"
+
+
+class _CompiledRuleset:
+    """
+    Every literal phrase of one ruleset folded into ONE regex:  (?=(?P<r0>...)|(?P<r1>...)|...)
+    The lookahead makes finditer report a hit at every position (overlaps included).
+    Literals go longest first, so the group that fires at a position is the longest
+    literal there; shorter literals that are prefixes of it are added from a precomputed
+    table. Result: every (position, literal) occurrence in one pass.
+
+    Regex rules cannot share that alternation (at a position only the first alternative
+    that matches is reported), so each one gets its own lookahead pass, case-insensitive
+    like the literals. Rulesets hold a handful of them at most.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.literals = sorted((r for r in rules if not r.is_regex), key=lambda r: -len(r.pattern))
+        self.prefixes = {}
+        for i, rule in enumerate(self.literals):
+            self.prefixes[i] = [other for other in self.literals
+                                if other is not rule and rule.pattern.startswith(other.pattern)]
+
+        if self.literals:
+            parts = [f"(?P<r{i}>{re.escape(r.pattern)})" for i, r in enumerate(self.literals)]
+            self.regex = re.compile("(?=" + "|".join(parts) + ")")
+        else:
+            self.regex = None
+        self.regexes = [(re.compile(f"(?=(?:{r.pattern}))", re.I), r) for r in rules if r.is_regex]
+
+    def finditer(self, lowered):
+        if self.regex is not None:
+            for m in self.regex.finditer(lowered):
+                idx = int(m.lastgroup[1:])
+                yield m.start(), self.literals[idx]
+                for rule in self.prefixes[idx]:
+                    yield m.start(), rule
+        for regex, rule in self.regexes:
+            for m in regex.finditer(lowered):
+                yield m.start(), rule
+
+
+class RuleEngine:
+    """
+    Loads phrase/regex rulesets from a JSON (or YAML) file once and compiles each
+    ruleset into a single multi-pattern matcher. Matching is case-insensitive.
+
+    Hot reload: maybe_reload() re-reads the file when its mtime changed (checked at most
+    every reload_interval seconds), so edits apply without restarting the bodyguard.
+    """
+
+    def __init__(self, path=DEFAULT_RULES_PATH, reload_interval=2.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.hit_counts = Counter()
+        self.version = ""
+        self._rulesets = {}
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        # Scans on several threads (async executor, crawler) share one engine: Counter.update is not atomic
+        self._hits_lock = threading.Lock()
+        self.reload(force=True)
+
+    # --- LOADING ---
+    def _read(self):
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        if self.path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required for YAML rulesets (pip install pyyaml)")
+            return raw, yaml.safe_load(raw)
+        return raw, json.loads(raw)
+
+    def reload(self, force=False):
+        """Re-reads and recompiles the rules file. Returns True when something changed."""
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                return False
+            if not force and mtime == self._mtime: return False
+
+            raw, config = self._read()
+            rulesets = {}
+            for name, spec in config.get("rulesets", {}).items():
+                rules = []
+                for entry in spec.get("rules", []):
+                    if isinstance(entry, str): entry = {"phrase": entry}
+                    is_regex = "regex" in entry
+                    pattern = entry["regex"] if is_regex else entry["phrase"].lower()
+                    rules.append(Rule(
+                        id=entry.get("id", f"{name}:{pattern}"), ruleset=name, pattern=pattern, is_regex=is_regex,
+                        score=entry.get("score", spec.get("score", 0)),
+                        threat_type=entry.get("threat_type", spec.get("threat_type", "Unknown")),
+                        reason=entry.get("reason", spec.get("reason")),
+                    ))
+                rulesets[name] = _CompiledRuleset(rules)
+
+            # Swap in one assignment so concurrent matchers never see a half-built state
+            self._rulesets = rulesets
+            self._mtime = mtime
+            self.version = hashlib.sha1(raw).hexdigest()
+            return True
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval: return False
+        self._last_check = now
+        try:
+            return self.reload()
+        except Exception as e:
+            # A half-saved file must not take the bodyguard down: keep the previous rules
+            print(f"⚠️ RULES RELOAD FAILED ({self.path}): {e}")
+            return False
+
+    # --- MATCHING ---
+    def match(self, ruleset, text):
+        """Every hit of `ruleset` in `text` as (position, Rule), in position order"""
+        compiled = self._rulesets.get(ruleset)
+        if compiled is None or not text: return []
+        hits = sorted(compiled.finditer(text.lower()), key=lambda hit: hit[0])
+        if hits:
+            fired = {rule.id for _, rule in hits}
+            with self._hits_lock:
+                self.hit_counts.update(fired)
+        return hits
+
+    def best(self, ruleset, text):
+        """Highest-scoring rule that fires (earliest position breaks ties), or None"""
+        hits = self.match(ruleset, text)
+        if not hits: return None
+        return min(hits, key=lambda h: (-h[1].score, h[0]))[1]
+
+    def rules(self, ruleset):
+        compiled = self._rulesets.get(ruleset)
+        return list(compiled.rules) if compiled else []
+
+    def stats(self):
+        with self._hits_lock:
+            hits = dict(self.hit_counts)
+        return {
+            "version": self.version,
+            "rulesets": {name: len(c.rules) for name, c in self._rulesets.items()},
+            "hits": hits,
+        }
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+def default_engine():
+    """Process-wide engine on rules/default.json (or $AEGIS_RULES)"""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = RuleEngine(os.environ.get("AEGIS_RULES", DEFAULT_RULES_PATH))
+        return _default_engine
@@ -0,0 +1,202 @@
+"""
+The four BrowserBodyguard scanners as pure functions over a DOM snapshot.
+
+No Playwright calls happen here: each scanner turns snapshot nodes into findings
+(dicts describing what to flag), and the sync or async bodyguard applies them.
+"""
+import time
+
+from .page_scripts import KIND_BUTTON, KIND_INPUT, KIND_TEXT, KIND_CSS, KIND_OVERLAY, MAX_SNAPSHOT_TEXT
+from .metrics import METRICS
+
+# Nodes per passive-analysis step under a scan budget (one predict_batch each)
+PASSIVE_CHUNK = 500
+
+# Long hidden texts reach the brain in windows this far apart (overlapping, so no phrase is split)
+WINDOW_OVERLAP = 200
+
+# A layer that swallows clicks meant for a control is as bad as the riskiest button
+OVERLAY_POINTS = 40
+OVERLAY_KINDS = {
+    "transparent-link": "Invisible clickable layer",
+    "transparent-layer": "Invisible layer",
+    "empty-link": "Empty clickable layer",
+}
+
+TRUSTED_SITES = ["google.com", "youtube.com", "facebook.com", "nfsu.ac.in"]
+
+
+def is_trusted(url):
+    return any(site in url for site in TRUSTED_SITES)
+
+
+def _finding(node, target, color, silent, points, threat_type, reason):
+    return {"node": node, "target": target, "color": color, "silent": silent,
+            "points": points, "threat_type": threat_type, "reason": reason}
+
+
+def scan_risky_buttons(nodes, rules):
+    # We look for ANY clickable element that contains risky text (ruleset: risky_buttons)
+    findings = []
+    for node in nodes:
+        if not node["kinds"] & KIND_BUTTON: continue
+        text = node["text"].strip().lower()
+        if len(text) > 50 or len(text) < 3: continue 
+        
+        hit = rules.best("risky_buttons", text)
+        if hit:
+            target_name = f"Button: '{text[:15].upper()}...'"
+            findings.append(_finding(node, target_name, "red", False, hit.score, hit.threat_type, hit.describe()))
+    return findings
+
+
+def scan_phishing_only(nodes, rules):
+    findings = []
+    for node in nodes:
+        if not node["kinds"] & KIND_INPUT: continue
+        placeholder = (node["placeholder"] or "").lower()
+        parent_text = (node["parentText"] or "").lower()
+        combined_context = f"{placeholder} {parent_text}"
+        hit = rules.best("phishing", combined_context)
+        if hit:
+            findings.append(_finding(node, "Input Field", "red", False, hit.score, hit.threat_type, hit.describe()))
+    return findings
+
+
+def scan_visible_injection(nodes, rules):
+    findings = []
+    for node in nodes:
+        if not node["kinds"] & KIND_TEXT: continue
+        text = node["text"].lower().strip()
+        if len(text) > 300 or len(text) < 10: continue
+        hit = rules.best("prompt_injection", text)
+        if hit:
+            findings.append(_finding(node, "Text Block", "orange", True, hit.score, hit.threat_type, hit.describe()))
+    return findings
+
+
+def scan_overlays(nodes, rules):
+    """Layers the in-page hit-test (page_scripts.HITTEST_JS) found on top of an interactive control"""
+    findings = []
+    for node in nodes:
+        if not node["kinds"] & KIND_OVERLAY: continue
+        overlay = node["overlay"]
+        control = overlay["controlText"] or overlay["controlTag"]
+        # Worse when the control it hijacks is itself a sensitive action
+        hit = rules.best("risky_buttons", overlay["controlText"].lower())
+        reason = (f"{OVERLAY_KINDS[overlay['kind']]} (opacity {overlay['opacity']}) over "
+                  f"<{overlay['controlTag']}> '{control[:40]}' intercepts clicks at {overlay['points']} sample point(s)")
+        finding = _finding(node, f"Overlay: <{node['tag']}> over '{control[:15].upper()}'", "red", False,
+                           OVERLAY_POINTS + (hit.score if hit else 0), "Clickjacking", reason)
+        finding["defuse"] = True
+        findings.append(finding)
+    return findings
+
+
+def is_hidden_style(style):
+    """The hidden-CSS test on a snapshot style dict (raises on unparsable values, like 'auto')"""
+    return float(style['opacity']) < 0.2 or float(style['fontSize'].replace('px', '')) < 6 or (style['position'] == 'absolute' and float(style['left'].replace('px', '')) < 0)
+
+
+def _windows(text, size=MAX_SNAPSHOT_TEXT):
+    """A few hundred words of filler must not dilute (or push past the encoder's limit) what follows"""
+    if len(text) <= size: return [text]
+    return [text[i:i + size] for i in range(0, len(text) - WINDOW_OVERLAP, size - WINDOW_OVERLAP)]
+
+
+def scan_hidden_css(nodes, rules, brain):
+    hidden = []
+    for node in nodes:
+        if not node["kinds"] & KIND_CSS or not node["style"]: continue
+        text = node["text"].strip()
+        if len(text) < 5: continue 
+
+        try:
+            if is_hidden_style(node["style"]): hidden.append((node, text))
+        except: continue
+
+    # Every hidden text on the page goes through the brain in ONE batch
+    windows, owners = [], []
+    for i, (_, text) in enumerate(hidden):
+        for window in _windows(text):
+            windows.append(window)
+            owners.append(i)
+    flagged = [False] * len(hidden)
+    for i, (is_bad, conf, reason) in zip(owners, brain.predict_batch(windows)):
+        flagged[i] = flagged[i] or is_bad
+
+    findings = []
+    for (node, text), is_bad in zip(hidden, flagged):
+        hit = rules.best("hidden_css", text)
+        if is_bad or hit:
+            findings.append(_finding(node, "Hidden Text Node", "orange", True,
+                                     hit.score if hit else 15,
+                                     hit.threat_type if hit else "Hidden CSS Attack",
+                                     hit.describe() if hit else "Content hidden via CSS"))
+    return findings
+
+
+def analyze_snapshot(nodes, rules, brain, trusted=False, timings=None):
+    """
+    All scanners over one snapshot, in the bodyguard's usual order. CPU only.
+    Pass a dict as `timings` to get per-scanner wall time (seconds) filled in.
+    """
+    METRICS.inc("elements_scanned", len(nodes))
+    if timings is None and METRICS.enabled: timings = {}
+    if timings is None:
+        findings = scan_phishing_only(nodes, rules)
+        if trusted: return findings
+
+        findings += scan_risky_buttons(nodes, rules)
+        findings += scan_overlays(nodes, rules)
+        findings += scan_hidden_css(nodes, rules, brain)
+        findings += scan_visible_injection(nodes, rules)
+        return findings
+
+    findings = _timed(timings, "phishing_only", scan_phishing_only, nodes, rules)
+    if trusted: return findings
+
+    findings += _timed(timings, "risky_buttons", scan_risky_buttons, nodes, rules)
+    findings += _timed(timings, "overlays", scan_overlays, nodes, rules)
+    findings += _timed(timings, "hidden_css", scan_hidden_css, nodes, rules, brain)
+    findings += _timed(timings, "visible_injection", scan_visible_injection, nodes, rules)
+    return findings
+
+
+def analyze_interactive(nodes, rules, trusted=False, timings=None):
+    """
+    The scanners guarding what an agent can click or type into (phishing inputs, risky
+    buttons, click-intercepting overlays). Rules only, no brain: cheap enough to run over
+    every node on every scan.
+    """
+    timings = {} if timings is None else timings
+    findings = _timed(timings, "phishing_only", scan_phishing_only, nodes, rules)
+    if trusted: return findings
+    findings += _timed(timings, "risky_buttons", scan_risky_buttons, nodes, rules)
+    return findings + _timed(timings, "overlays", scan_overlays, nodes, rules)
+
+
+def analyze_passive(nodes, rules, brain, deadline=None, chunk=PASSIVE_CHUNK, timings=None):
+    """
+    Passive text analysis (hidden CSS, visible injection) in chunks of `chunk` nodes until
+    time.perf_counter() passes `deadline`. Returns (findings, deferred nodes); at least one
+    chunk always runs, so deferred work keeps moving forward.
+    """
+    timings = {} if timings is None else timings
+    findings = []
+    for start in range(0, len(nodes), chunk):
+        if start and deadline is not None and time.perf_counter() >= deadline:
+            return findings, nodes[start:]
+        part = nodes[start:start + chunk]
+        findings += _timed(timings, "hidden_css", scan_hidden_css, part, rules, brain)
+        findings += _timed(timings, "visible_injection", scan_visible_injection, part, rules)
+    return findings, []
+
+
+def _timed(timings, name, scanner, *args):
+    t0 = time.perf_counter()
+    result = scanner(*args)
+    elapsed = time.perf_counter() - t0
+    timings[name] = timings.get(name, 0.0) + elapsed
+    METRICS.observe(f"scan_{name}", elapsed)
+    return result
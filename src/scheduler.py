@@ -0,0 +1,122 @@
+"""
+ADAPTIVE SCAN SCHEDULER for a sync BrowserBodyguard.
+
+Instead of scanning on a fixed tick, every tick is one tiny probe (PROBE_JS: dirty
+node count, mutation counter, visibility) and a scan only runs when there is
+something to scan:
+
+    navigation / load    -> scan right away (full)
+    dirty nodes          -> scan now; the page's MutationObserver also wakes the loop
+                            through an exposed binding, so a quiet page is not left
+                            waiting out a backed-off interval; a busy page is probed at min_interval
+    mutating page        -> probe interval follows the mutation rate (EWMA)
+    quiet page           -> probe interval doubles up to max_interval
+    hidden tab           -> probe every hidden_interval
+    every heartbeat s    -> full rescan (catches style changes no mutation reports)
+
+Scans run with a time budget (interactive scanners first, see BrowserBodyguard.scan_page),
+and the scheduler never spends more than max_duty of the wall clock scanning.
+Decisions are counted in src/metrics.py (sched_* counters, "sched_delay" histogram).
+
+    ScanScheduler(guard).run(lambda: running)
+"""
+import time
+
+from .metrics import METRICS
+from .page_scripts import PROBE_JS
+
+
+class ScanScheduler:
+    def __init__(self, guard, min_interval=0.1, max_interval=2.0, hidden_interval=5.0, heartbeat=30.0,
+                 budget=0.05, max_duty=0.5):
+        self.guard = guard
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hidden_interval = hidden_interval
+        self.heartbeat = heartbeat
+        self.budget = budget
+        self.max_duty = max_duty
+
+        self.delay = min_interval
+        self.mutation_rate = 0.0      # mutation records / s, EWMA
+        self._mutations = None
+        self._last_probe = None
+        self._last_full = time.monotonic()
+        self._urgent = "navigation"   # first tick always scans
+
+        page = guard.page
+        page.on("framenavigated", lambda frame: self._wake("navigation") if frame == page.main_frame else None)
+        page.on("domcontentloaded", lambda _: self._wake("load"))
+        page.on("load", lambda _: self._wake("load"))
+        try:
+            page.expose_binding("__aegisNotify", lambda source: self._wake("mutation"))
+        except Exception: pass  # already exposed on this page: the earlier scheduler's binding stays
+
+    def _wake(self, reason):
+        self._urgent = self._urgent or reason
+
+    def _probe(self):
+        try:
+            METRICS.inc("playwright_round_trips")
+            return self.guard.page.evaluate(PROBE_JS)
+        except Exception:
+            return None
+
+    def _update_rate(self, probe, now):
+        if self._mutations is not None and now > self._last_probe:
+            # Counter restarts with every document
+            delta = probe["mutations"] - self._mutations
+            if delta < 0: delta = probe["mutations"]
+            self.mutation_rate = 0.7 * self.mutation_rate + 0.3 * delta / (now - self._last_probe)
+        self._mutations, self._last_probe = probe["mutations"], now
+
+    def _reason(self, probe, now):
+        if self._urgent: return self._urgent
+        if probe is None: return None
+        if probe["full"] or probe["dirty"] < 0: return "full"
+        if now - self._last_full >= self.heartbeat: return "heartbeat"
+        if probe["dirty"]: return "mutation"
+        return None
+
+    def tick(self):
+        """Probes, scans if needed, returns how many seconds to wait before the next tick"""
+        now = time.monotonic()
+        probe = self._probe()
+        if probe is not None: self._update_rate(probe, now)
+
+        reason = self._reason(probe, now)
+        cost = 0.0
+        if reason:
+            self._urgent = None
+            if reason in ("heartbeat", "navigation"): self.guard.request_full_scan()
+            if reason != "mutation": self._last_full = now
+            METRICS.inc(f"sched_scans_{reason}")
+            t0 = time.perf_counter()
+            self.guard.scan_page(budget=self.budget)
+            cost = time.perf_counter() - t0
+        else:
+            METRICS.inc("sched_idle_ticks")
+
+        if probe is not None and probe["hidden"]:
+            self.delay = self.hidden_interval
+        elif reason:
+            self.delay = self.min_interval
+        elif self.mutation_rate > 0.5:
+            # Busy page: about one probe per mutation burst
+            self.delay = max(self.min_interval, min(self.max_interval, 1.0 / self.mutation_rate))
+        else:
+            self.delay = min(self.max_interval, self.delay * 2)
+
+        # CPU ceiling: scanning takes at most max_duty of the wall clock
+        if cost: self.delay = max(self.delay, cost * (1 / self.max_duty - 1))
+        METRICS.observe("sched_delay", self.delay)
+        return self.delay
+
+    def run(self, keep_running):
+        """Drives the guard until keep_running() is False. Waits in min_interval slices so wake-ups land quickly."""
+        while keep_running():
+            deadline = time.monotonic() + self.tick()
+            while keep_running() and not self._urgent:
+                left = deadline - time.monotonic()
+                if left <= 0: break
+                self.guard.page.wait_for_timeout(min(left, self.min_interval) * 1000)
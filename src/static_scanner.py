@@ -0,0 +1,332 @@
+"""
+BROWSER-FREE PRE-SCANNER: runs the bodyguard scanners over raw HTML bytes.
+
+The document is streamed through a SAX-style parser in chunks. Every element becomes
+a snapshot-style node (same shape as SNAPSHOT_JS output) the moment it closes, and
+nodes are pushed through src/scanners.py in small batches. Memory stays constant:
+only the open-element stack (each text buffer capped at MAX_SNAPSHOT_TEXT, or
+MAX_HIDDEN_TEXT for CSS-hidden elements, like SNAPSHOT_JS) and one batch of nodes
+are alive at a time, whatever the document size.
+
+What it cannot see: text that scripts inject later (attacks.js style). A document
+with no <script> is fully vetted, threats or not; one with scripts still
+needs_browser, even when threats were already found in its markup.
+
+    python -m src.static_scanner page.html https://example.com -o static.jsonl
+"""
+import argparse
+import codecs
+import json
+import re
+import sys
+import urllib.request
+from html.parser import HTMLParser
+from pathlib import Path
+
+from .page_scripts import KIND_BUTTON, KIND_INPUT, KIND_TEXT, KIND_CSS, MAX_SNAPSHOT_TEXT, MAX_HIDDEN_TEXT
+from .threat_identity import content_hash
+from .scanners import (scan_phishing_only, scan_risky_buttons, scan_hidden_css,
+                       scan_visible_injection, is_trusted, is_hidden_style)
+
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 256
+MAX_REPORTED_THREATS = 500
+MAX_DEPTH = 512
+MAX_STYLESHEET = 1024 * 1024
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+SKIP_TEXT_TAGS = {"script", "style", "template", "noscript"}
+TEXT_TAGS = {"p", "h1", "h2", "h3", "h4", "span", "div", "pre", "code"}
+CSS_TAGS = {"div", "p", "span", "h1", "h2", "h3", "a"}
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_RULE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_CSS_DECL = re.compile(r"([\w-]+)\s*:\s*([^;]+)")
+_SIMPLE_CLASS = re.compile(r"^\.([\w-]+)$")
+
+
+def parse_declarations(text):
+    return {k.strip().lower(): v.strip().lower().replace("!important", "").strip() for k, v in _CSS_DECL.findall(text or "")}
+
+
+def parse_class_rules(css):
+    """Single-class selectors only (.ghost-text { ... }): enough for the usual hiding tricks"""
+    rules = {}
+    for selectors, body in _CSS_RULE.findall(_CSS_COMMENT.sub("", css)):
+        decls = parse_declarations(body)
+        for selector in selectors.split(","):
+            m = _SIMPLE_CLASS.match(selector.strip())
+            if m: rules.setdefault(m.group(1), {}).update(decls)
+    return rules
+
+
+def _font_px(value, parent_px):
+    try:
+        if value.endswith("px"): return float(value[:-2])
+        if value.endswith("rem"): return float(value[:-3]) * 16
+        if value.endswith("em"): return float(value[:-2]) * parent_px
+        if value.endswith("pt"): return float(value[:-2]) * 4 / 3
+        if value.endswith("%"): return float(value[:-1]) * parent_px / 100
+        if value == "0": return 0.0
+    except ValueError: pass
+    return parent_px
+
+
+def _hidden(node):
+    try: return bool(node["kinds"] & KIND_CSS) and is_hidden_style(node["style"])
+    except (ValueError, KeyError): return False
+
+
+class _Frame:
+    __slots__ = ("tag", "node", "text", "size", "cap", "font_px", "skip_text", "pending_inputs")
+
+    def __init__(self, tag, node, font_px, skip_text, cap=MAX_SNAPSHOT_TEXT):
+        self.tag = tag
+        self.node = node
+        self.text = []
+        self.size = 0
+        self.cap = cap
+        self.font_px = font_px
+        self.skip_text = skip_text
+        self.pending_inputs = []
+
+
+class _StreamingParser(HTMLParser):
+    def __init__(self, scanner, base_path=None):
+        super().__init__(convert_charrefs=True)
+        self.scanner = scanner
+        self.base_path = base_path
+        self.class_rules = {}
+        self.stack = [_Frame("#document", None, 16.0, False)]
+        self.next_id = 1
+        self.elements = 0
+        self.has_scripts = False
+        self._style_buf = None
+        self._style_size = 0
+
+    # --- STYLE RESOLUTION ---
+    def _computed(self, attrs, parent_font):
+        decls = {}
+        for cls in (attrs.get("class") or "").split():
+            decls.update(self.class_rules.get(cls, {}))
+        decls.update(parse_declarations(attrs.get("style")))
+        font_px = _font_px(decls["font-size"], parent_font) if "font-size" in decls else parent_font
+        style = {
+            "opacity": decls.get("opacity", "1"), "fontSize": f"{font_px:g}px",
+            "position": decls.get("position", "static"), "left": decls.get("left", "auto"),
+            "display": decls.get("display", ""), "visibility": decls.get("visibility", ""),
+        }
+        return style, font_px
+
+    def _load_stylesheet(self, href):
+        if not self.base_path or "://" in href or href.startswith("//"): return
+        try:
+            path = (self.base_path.parent / href.split("?")[0]).resolve()
+            with open(path, encoding="utf-8", errors="replace") as f:
+                self.class_rules.update(parse_class_rules(f.read(MAX_STYLESHEET)))
+        except OSError: pass
+
+    # --- PARSER CALLBACKS ---
+    def handle_starttag(self, tag, attr_list):
+        attrs = {k: (v or "") for k, v in attr_list}
+        parent = self.stack[-1]
+        self.elements += 1
+
+        if tag == "script": self.has_scripts = True
+        if tag == "style": self._style_buf, self._style_size = [], 0
+        if tag == "link" and "stylesheet" in attrs.get("rel", "").lower() and attrs.get("href"):
+            self._load_stylesheet(attrs["href"])
+
+        classes = attrs.get("class", "")
+        kinds = 0
+        if tag in ("button", "a") or (tag == "div" and attrs.get("role") == "button") or (tag in ("div", "span") and "btn" in classes):
+            kinds |= KIND_BUTTON
+        if tag == "input": kinds |= KIND_INPUT
+        if tag in TEXT_TAGS: kinds |= KIND_TEXT
+        if tag in CSS_TAGS: kinds |= KIND_CSS
+
+        style, font_px = self._computed(attrs, parent.font_px)
+        node = None
+        if kinds:
+            node = {"id": self.next_id, "tag": tag, "role": attrs.get("role") or None, "kinds": kinds,
+                    "text": "", "placeholder": attrs.get("placeholder") if tag == "input" else None,
+                    "parentText": None, "style": style if kinds & KIND_CSS else None,
+                    # (line, column) of the start tag, for rewriting the document (src/interceptor.py)
+                    "pos": self.getpos()}
+            self.next_id += 1
+
+        if tag in VOID_TAGS:
+            if node is not None:
+                if kinds & KIND_INPUT: parent.pending_inputs.append(node)
+                else: self.scanner._collect(node)
+            return
+
+        if len(self.stack) >= MAX_DEPTH: return
+        self.stack.append(_Frame(tag, node, font_px, parent.skip_text or tag in SKIP_TEXT_TAGS,
+                                 MAX_HIDDEN_TEXT if node is not None and _hidden(node) else MAX_SNAPSHOT_TEXT))
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS: self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # Tolerate sloppy HTML: close everything up to the matching open tag, ignore strays
+        if not any(f.tag == tag for f in self.stack[1:]): return
+        while len(self.stack) > 1:
+            frame = self.stack.pop()
+            self._close(frame)
+            if frame.tag == tag: break
+
+    def handle_data(self, data):
+        frame = self.stack[-1]
+        if self._style_buf is not None and frame.tag == "style":
+            if self._style_size < MAX_STYLESHEET:
+                self._style_buf.append(data)
+                self._style_size += len(data)
+            return
+        if frame.skip_text: return
+        self._append(frame, data)
+
+    def _append(self, frame, data):
+        if frame.size < frame.cap:
+            data = data[:frame.cap - frame.size]
+            frame.text.append(data)
+            frame.size += len(data)
+
+    def _close(self, frame):
+        if frame.tag == "style" and self._style_buf is not None:
+            self.class_rules.update(parse_class_rules("".join(self._style_buf)))
+            self._style_buf = None
+
+        text = " ".join("".join(frame.text).split())
+        if frame.node is not None:
+            frame.node["text"] = text[:frame.cap]
+            self.scanner._collect(frame.node)
+        for node in frame.pending_inputs:
+            node["parentText"] = text
+            self.scanner._collect(node)
+        if text and not frame.skip_text:
+            self._append(self.stack[-1], " " + text)
+
+    def finish(self):
+        self.close()
+        while len(self.stack) > 1:
+            self._close(self.stack.pop())
+        root = self.stack[0]
+        for node in root.pending_inputs:
+            node["parentText"] = ""
+            self.scanner._collect(node)
+        root.pending_inputs = []
+
+
+class StaticScanner:
+    """
+    One instance per document:  StaticScanner(rules, brain).scan_file(path) -> result dict
+    Findings use the same scanners (and therefore the same rules + SecurityBrain) as
+    the live bodyguard.
+    """
+
+    def __init__(self, rules=None, brain=None, url=""):
+        if rules is None:
+            from .rule_engine import default_engine
+            rules = default_engine()
+        if brain is None:
+            from .model_registry import get_brain
+            brain = get_brain()
+        self.rules = rules
+        self.brain = brain
+        self.trusted = is_trusted(url)
+        self.findings = []
+        self.threat_count = 0
+        self.score = 0
+        self._batch = []
+
+    def _collect(self, node):
+        self._batch.append(node)
+        if len(self._batch) >= BATCH_SIZE: self._flush()
+
+    def _flush(self):
+        nodes, self._batch = self._batch, []
+        if not nodes: return
+        found = scan_phishing_only(nodes, self.rules)
+        if not self.trusted:
+            found += scan_risky_buttons(nodes, self.rules)
+            found += scan_hidden_css(nodes, self.rules, self.brain)
+            found += scan_visible_injection(nodes, self.rules)
+        # One finding per element, like BrowserBodyguard._apply_findings (nodes never span two batches)
+        flagged = set()
+        for finding in found:
+            node = finding["node"]
+            if node["id"] in flagged: continue
+            flagged.add(node["id"])
+            self.score = min(100, self.score + finding["points"])
+            self.threat_count += 1
+            if len(self.findings) >= MAX_REPORTED_THREATS: continue
+            self.findings.append({
+                "level": "WARNING" if finding["silent"] else "CRITICAL",
+                "threat_type": finding["threat_type"], "target": finding["target"],
+                "reason": finding["reason"], "tag": node["tag"], "text": node["text"][:120],
+                "points": finding["points"], "pos": node["pos"],
+                # Same digest the live bodyguard computes for this element (ThreatIdentityIndex)
+                "content": content_hash(node).hex(),
+            })
+
+    def scan_chunks(self, chunks, base_path=None, source=""):
+        """Scans an iterable of bytes chunks in a single pass"""
+        parser = _StreamingParser(self, base_path=base_path)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            parser.feed(decoder.decode(chunk))
+        parser.feed(decoder.decode(b"", final=True))
+        parser.finish()
+        self._flush()
+        return {
+            "source": source, "bytes": size, "elements": parser.elements,
+            "threats": self.findings, "threat_count": self.threat_count, "score": self.score,
+            "has_scripts": parser.has_scripts,
+            # Scripts can inject content the parser never sees: only script-free pages are fully vetted
+            "needs_browser": parser.has_scripts,
+        }
+
+    def scan_file(self, path, chunk_size=CHUNK_SIZE):
+        path = Path(path)
+        with open(path, "rb") as f:
+            return self.scan_chunks(iter(lambda: f.read(chunk_size), b""), base_path=path.resolve(), source=str(path))
+
+    def scan_url(self, url, chunk_size=CHUNK_SIZE, timeout=30):
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            return self.scan_chunks(iter(lambda: resp.read(chunk_size), b""), source=url)
+
+
+def scan_target(target, rules=None, brain=None):
+    """File path, file:// or http(s) URL -> static result dict"""
+    if target.startswith(("http://", "https://")):
+        return StaticScanner(rules, brain, url=target).scan_url(target)
+    if target.startswith("file://"):
+        target = urllib.request.url2pathname(target[len("file://"):])
+    return StaticScanner(rules, brain, url=target).scan_file(target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="+", help="HTML files or URLs")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "a", encoding="utf-8")
+    try:
+        for target in args.targets:
+            try:
+                record = scan_target(target)
+            except Exception as e:
+                record = {"source": target, "error": f"{type(e).__name__}: {e}"}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout: out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import hashlib
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+
+def content_hash(node):
+    """
+    64-bit digest of what the node shows (tag + text + placeholder, or the control an overlay covers).
+    Whitespace runs are collapsed, so a live snapshot (innerText) and the static scanner (parsed
+    markup) agree on the same element.
+    """
+    overlay = node.get("overlay")
+    covers = f"{overlay['controlTag']}\0{overlay['controlText']}" if overlay else ""
+    text = " ".join(node["text"].split())
+    payload = f"{node['tag']}\0{text}\0{node['placeholder'] or ''}\0{covers}".encode("utf-8", "replace")
+    return hashlib.blake2b(payload, digest_size=8).digest()
+
+
+def origin_of(url):
+    parts = urlsplit(url or "")
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class ThreatIdentityIndex:
+    """
+    Which threats were already flagged, so a rescan never counts one twice, while every
+    element carrying one still gets remediated.
+
+    A threat is known by two fingerprints, both O(1) to look up and neither needing
+    the element's subtree serialized:
+      * its snapshot id (the WeakMap id SNAPSHOT_JS assigns): the same element whose
+        content changed (e.g. after we blocked it) stays the same threat
+      * its content hash: a framework re-render that swaps in a new node with the same
+        content does not count as a new threat either
+
+    Both maps are bounded LRUs. Snapshot ids only mean something within one document,
+    so they are dropped on every navigation; content hashes survive navigations that
+    stay on the same origin.
+    """
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.origin = None
+        self._ids = OrderedDict()
+        self._contents = OrderedDict()
+        # (origin, content hash) scored before their document was committed (network layer)
+        self._incoming = OrderedDict()
+
+    def add(self, node):
+        """
+        Records the node; returns (new_element, new_threat).
+        new_element: its snapshot id was not seen yet, so it still has to be remediated.
+        new_threat: neither id nor content was known, so it is scored and logged.
+        A second element with the same content (two "Confirm Transfer" buttons) is a
+        new element but not a new threat.
+        """
+        node_id, digest = node["id"], content_hash(node)
+        new_element = node_id not in self._ids
+        new_threat = new_element and digest not in self._contents
+        self._remember(self._ids, node_id)
+        self._remember(self._contents, digest)
+        return new_element, new_threat
+
+    def _remember(self, entries, key):
+        entries[key] = True
+        entries.move_to_end(key)
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def add_content(self, digest, origin):
+        """
+        Records a threat already scored elsewhere (src/interceptor.py), so elements showing
+        it are remediated but not scored again. `origin` is the document it belongs to,
+        which may not be committed yet: it applies once navigate() reaches that origin.
+        """
+        if origin == self.origin: self._remember(self._contents, digest)
+        else: self._remember(self._incoming, (origin, digest))
+
+    def navigate(self, url):
+        """Call on every main-frame navigation"""
+        self._ids.clear()
+        origin = origin_of(url)
+        if origin != self.origin:
+            self._contents.clear()
+            self.origin = origin
+            for key in [key for key in self._incoming if key[0] == origin]:
+                del self._incoming[key]
+                self._remember(self._contents, key[1])
+
+    def clear(self):
+        self._ids.clear()
+        self._contents.clear()
+        self._incoming.clear()
+
+    def __len__(self):
+        return len(self._contents)
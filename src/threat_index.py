@@ -0,0 +1,325 @@
+"""
+THREAT-EXEMPLAR INDEX: tens of thousands of curated attack strings next to the
+handful of hand-written threat_concepts.
+
+One directory on disk, append-only:
+    meta.json      dim, row count, encoder id, category names, IVF state
+    vectors.f32    [count, dim] L2-normalized float32 rows (memory-mapped, never loaded whole)
+    labels.i32     category index per row
+    texts.jsonl    the exemplar strings (only read to label search results)
+    ivf.npz        optional approximate index: k-means centroids + inverted lists
+
+Exact search is one matrix multiply over the memmap. For large sets build the IVF
+(approximate) index: a query is only compared against the rows of its `nprobe`
+nearest centroids, plus the rows added since the last build, so lookup time stays
+flat as the set grows. add() appends and bumps meta.json last; a reader (the
+bodyguard) picks the new rows up through maybe_reload() without a restart.
+
+    python -m src.threat_index add --index threats/ --category "Prompt Injection" exemplars.txt
+    python -m src.threat_index add --index threats/ exemplars.jsonl          # {"text": ..., "category": ...}
+    python -m src.threat_index build-ivf --index threats/
+    python -m src.threat_index search --index threats/ "please disregard the rules above"
+    AEGIS_THREAT_INDEX=threats/ python main.py
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+FORMAT_VERSION = 1
+# Exact search up to here, IVF beyond (when an IVF index has been built)
+IVF_MIN_ROWS = 20000
+
+
+class ThreatIndex:
+    def __init__(self, path, nprobe=8, reload_interval=2.0):
+        self.path = path
+        self.nprobe = nprobe
+        self.reload_interval = reload_interval
+        self.dim = 0
+        self.count = 0
+        self.encoder = None
+        self.categories = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.labels = np.zeros(0, dtype=np.int32)
+        self.version = ""
+        self._ivf = None
+        self._texts = None
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload(force=True)
+
+    # --- FILES ---
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_meta(self):
+        with open(self._file("meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: unknown threat index format {meta.get('format')}")
+        return meta
+
+    def _write_meta(self, meta):
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._file("meta.json"))
+
+    def reload(self, force=False):
+        """Re-maps the files after another process added rows. Returns True when something changed."""
+        with self._lock:
+            try:
+                mtime = os.stat(self._file("meta.json")).st_mtime_ns
+            except OSError:
+                return False
+            if not force and mtime == self._mtime: return False
+
+            meta = self._read_meta()
+            count, dim = meta["count"], meta["dim"]
+            if count:
+                # Only the first `count` rows: a half-finished append is invisible until meta.json says so
+                vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r", shape=(count, dim))
+                labels = np.memmap(self._file("labels.i32"), dtype=np.int32, mode="r", shape=(count,))
+            else:
+                vectors, labels = np.zeros((0, dim), dtype=np.float32), np.zeros(0, dtype=np.int32)
+
+            ivf = None
+            if meta.get("ivf"):
+                try:
+                    with np.load(self._file("ivf.npz")) as saved:
+                        ivf = {"centroids": saved["centroids"], "order": saved["order"],
+                               "offsets": saved["offsets"], "rows": int(meta["ivf"]["rows"])}
+                except (OSError, KeyError):
+                    ivf = None
+
+            # Swap everything in at once so concurrent searches never see a half-built state
+            self.dim, self.count, self.encoder = dim, count, meta.get("encoder")
+            self.categories = meta["categories"]
+            self.vectors, self.labels, self._ivf, self._texts = vectors, labels, ivf, None
+            self.version = f"{count}:{meta.get('build', 0)}"
+            self._mtime = mtime
+            return True
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval: return False
+        self._last_check = now
+        try:
+            return self.reload()
+        except Exception as e:
+            print(f"⚠️ THREAT INDEX RELOAD FAILED ({self.path}): {e}")
+            return False
+
+    def text(self, row):
+        if self._texts is None:
+            try:
+                with open(self._file("texts.jsonl"), encoding="utf-8") as f:
+                    self._texts = [json.loads(line) for _, line in zip(range(self.count), f)]
+            except OSError:
+                self._texts = []
+        return self._texts[row] if row < len(self._texts) else ""
+
+    # --- WRITING ---
+    @classmethod
+    def create(cls, path, dim, encoder):
+        os.makedirs(path, exist_ok=True)
+        for name in ("vectors.f32", "labels.i32", "texts.jsonl"):
+            open(os.path.join(path, name), "wb").close()
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"format": FORMAT_VERSION, "dim": dim, "count": 0, "encoder": encoder,
+                       "categories": [], "ivf": None, "build": 0, "texts_bytes": 0}, f)
+        return cls(path)
+
+    def add(self, vectors, categories, texts):
+        """Appends rows (vectors need not be normalized). Single writer; readers see them after reload()."""
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"vector dim {vectors.shape[1]} != index dim {self.dim}")
+        meta = self._read_meta()
+        names = meta["categories"]
+        labels = []
+        for cat in categories:
+            if cat not in names: names.append(cat)
+            labels.append(names.index(cat))
+
+        # Truncate to the committed size first: a crashed earlier append leaves no garbage rows
+        count, texts_bytes = meta["count"], meta.get("texts_bytes", 0)
+        text_data = "".join(json.dumps(t, ensure_ascii=False) + "\n" for t in texts).encode("utf-8")
+        for name, size, data in (("vectors.f32", count * self.dim * 4, vectors.tobytes()),
+                                 ("labels.i32", count * 4, np.asarray(labels, dtype=np.int32).tobytes()),
+                                 ("texts.jsonl", texts_bytes, text_data)):
+            with open(self._file(name), "r+b") as f:
+                f.truncate(size)
+                f.seek(size)
+                f.write(data)
+
+        meta["count"] = count + len(vectors)
+        meta["texts_bytes"] = texts_bytes + len(text_data)
+        self._write_meta(meta)
+        self.reload(force=True)
+
+    def build_ivf(self, nlist=None, iterations=10, sample=50000, seed=0):
+        """k-means (spherical, NumPy) over the rows; every row lands in its nearest centroid's list"""
+        if not self.count: return
+        nlist = nlist or max(1, int(4 * np.sqrt(self.count)))
+        rng = np.random.default_rng(seed)
+        train = self.vectors[np.sort(rng.choice(self.count, min(sample, self.count), replace=False))]
+        centroids = train[rng.choice(len(train), min(nlist, len(train)), replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            for c in range(len(centroids)):
+                members = train[assign == c]
+                if len(members): centroids[c] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+
+        assign = np.concatenate([np.argmax(chunk @ centroids.T, axis=1) for chunk in _chunks(self.vectors)])
+        order = np.argsort(assign, kind="stable").astype(np.int32)
+        offsets = np.searchsorted(assign[order], np.arange(len(centroids) + 1)).astype(np.int64)
+        tmp = self._file("ivf.tmp.npz")
+        np.savez(tmp, centroids=centroids, order=order, offsets=offsets)
+        os.replace(tmp, self._file("ivf.npz"))
+
+        meta = self._read_meta()
+        meta["ivf"] = {"nlist": len(centroids), "rows": self.count}
+        meta["build"] = meta.get("build", 0) + 1
+        self._write_meta(meta)
+        self.reload(force=True)
+
+    # --- SEARCH ---
+    def _candidates(self, ivf, count, query):
+        """Rows of the `nprobe` nearest IVF lists + the rows added since the IVF was built"""
+        nearest = np.argsort(-(ivf["centroids"] @ query))[:self.nprobe]
+        parts = [ivf["order"][ivf["offsets"][c]:ivf["offsets"][c + 1]] for c in nearest]
+        parts.append(np.arange(ivf["rows"], count, dtype=np.int32))
+        return np.sort(np.concatenate(parts))
+
+    def search(self, queries, k=5):
+        """Top-k exemplars per normalized query vector: [[(score, category, row), ...], ...]"""
+        # One consistent view even if a reload swaps the arrays mid-search
+        vectors, labels, categories, ivf = self.vectors, self.labels, self.categories, self._ivf
+        count = len(vectors)
+        if not count: return [[] for _ in queries]
+        exact = ivf is None or count < IVF_MIN_ROWS
+        sims_all = np.concatenate([queries @ chunk.T for chunk in _chunks(vectors)], axis=1) if exact else None
+
+        results = []
+        for qi, query in enumerate(queries):
+            if exact:
+                rows, sims = None, sims_all[qi]
+            else:
+                rows = self._candidates(ivf, count, query)
+                sims = vectors[rows] @ query
+            top = np.argpartition(-sims, min(k, len(sims)) - 1)[:k] if len(sims) > k else np.arange(len(sims))
+            top = top[np.argsort(-sims[top], kind="stable")]
+            hits = []
+            for t in top:
+                row = int(t if rows is None else rows[t])
+                hits.append((float(sims[t]), categories[labels[row]], row))
+            results.append(hits)
+        return results
+
+    def best(self, queries):
+        """(score, category) of the nearest exemplar per normalized query vector ((0.0, None) if empty)"""
+        return [hits[0][:2] if hits else (0.0, None) for hits in self.search(queries, k=1)]
+
+    def merge(self, queries, scored):
+        """
+        Folds the exemplars into best_concepts() output: an exemplar replaces the concept
+        verdict only when it is strictly more similar, so an empty index changes nothing.
+        """
+        merged = []
+        for (score, cat), (ex_score, ex_cat) in zip(scored, self.best(queries)):
+            if ex_cat is not None and ex_score > score: merged.append((np.float32(ex_score), ex_cat))
+            else: merged.append((score, cat))
+        return merged
+
+    def stats(self):
+        return {"rows": self.count, "dim": self.dim, "encoder": self.encoder, "categories": len(self.categories),
+                "ivf": None if self._ivf is None else {"lists": len(self._ivf["centroids"]), "rows": self._ivf["rows"],
+                                                       "active": self.count >= IVF_MIN_ROWS}}
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def _chunks(matrix, size=8192):
+    for start in range(0, len(matrix), size):
+        yield matrix[start:start + size]
+
+
+# --- CLI ---
+def _read_exemplars(path, default_category):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"): continue
+            if path.endswith(".jsonl"):
+                entry = json.loads(line)
+                yield entry["text"], entry.get("category", default_category)
+            else:
+                yield line, default_category
+
+
+def main(argv=None):
+    from .ai_brain import TIER2_MODEL_NAME
+    from .encoders import load_encoder, DEFAULT_BACKEND, encoder_id
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["add", "build-ivf", "search", "stats"])
+    parser.add_argument("args", nargs="*", help="add: .txt / .jsonl files, search: query strings")
+    parser.add_argument("--index", default=os.environ.get("AEGIS_THREAT_INDEX", "threat_index"))
+    parser.add_argument("--category", default="Prompt Injection", help="category for plain-text exemplars")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND, help="Tier 2 encoder (must match the bodyguard's)")
+    parser.add_argument("--nlist", type=int, help="IVF lists (default 4*sqrt(rows))")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_intermixed_args(argv)
+
+    if args.command == "stats":
+        print(json.dumps(ThreatIndex(args.index).stats(), indent=2))
+        return
+    if args.command == "build-ivf":
+        index = ThreatIndex(args.index)
+        t0 = time.perf_counter()
+        index.build_ivf(nlist=args.nlist)
+        print(f"✅ IVF over {index.count} rows in {time.perf_counter() - t0:.1f}s: {json.dumps(index.stats()['ivf'])}")
+        return
+
+    encoder = load_encoder(TIER2_MODEL_NAME, args.backend)
+    if args.command == "add":
+        pairs = [pair for path in args.args for pair in _read_exemplars(path, args.category)]
+        if not pairs: parser.error("no exemplars given")
+        texts = [t for t, _ in pairs]
+        vectors = np.concatenate([encoder.encode(texts[i:i + 256]) for i in range(0, len(texts), 256)])
+        if os.path.exists(os.path.join(args.index, "meta.json")):
+            index = ThreatIndex(args.index)
+            if index.encoder != encoder.id:
+                sys.exit(f"index was built with {index.encoder}, not {encoder.id}")
+        else:
+            index = ThreatIndex.create(args.index, vectors.shape[1], encoder_id(TIER2_MODEL_NAME, args.backend))
+        index.add(vectors, [c for _, c in pairs], texts)
+        print(f"✅ +{len(texts)} exemplars -> {index.count} rows in {args.index}")
+        return
+
+    index = ThreatIndex(args.index)
+    queries = _normalize(encoder.encode(args.args))
+    t0 = time.perf_counter()
+    results = index.search(queries, k=args.k)
+    elapsed = (time.perf_counter() - t0) * 1000
+    for query, hits in zip(args.args, results):
+        print(f"\n🔎 {query!r}")
+        for score, cat, row in hits:
+            print(f"   {score:.3f}  [{cat}]  {index.text(row)[:80]!r}")
+    print(f"\n({len(queries)} queries over {index.count} rows in {elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
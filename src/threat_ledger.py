@@ -0,0 +1,144 @@
+import threading
+import time
+
+from .page_scripts import risk_status
+from .scanners import analyze_passive
+from .threat_identity import ThreatIdentityIndex, origin_of
+from .metrics import METRICS
+from .events import get_bus, ThreatEvent, ScoreEvent, ScanCompleteEvent
+
+
+class ThreatLedger:
+    """
+    Per-page bookkeeping shared by BrowserBodyguard and AsyncBrowserBodyguard: which
+    threats are already known, the risk score, threat / score / scan reporting (event bus
+    + GUI callback) and the passive work a budgeted scan carries over to the next one.
+
+    It never touches the page: findings() returns the REMEDIATE_JS argument and each
+    bodyguard evaluates it with its own (sync or async) Playwright API. Everything here
+    is plain CPU work, so the async bodyguard can run passive() in its executor.
+
+    Snapshot ids only mean something in the document they came from. Every navigation
+    bumps `generation`; a bodyguard reads it before taking a snapshot and passes it along,
+    and results for an older generation are dropped instead of remediated or carried over.
+    """
+
+    def __init__(self, page, gui_callback=None, bus=None, remediate=True):
+        self.page = page
+        # Typed events (threats, score, scan timings) for whatever sinks are subscribed
+        self.bus = bus or get_bus()
+        self.gui_callback = gui_callback
+        # remediate=False: detect + score + log only, never touch the page (headless crawling)
+        self.remediate = remediate
+        # Bounded, per-origin: O(1) dedup on snapshot id + content hash
+        self.known_threats = ThreatIdentityIndex()
+        self.risk_score = 0
+        # Passive-analysis work a budgeted scan ran out of time for (snapshot nodes, by id)
+        self.deferred = {}
+        self.generation = 0
+        # navigate() runs on the event loop while passive() may be running in an executor
+        self._lock = threading.Lock()
+
+    def navigate(self, url):
+        """Call on every main-frame navigation"""
+        with self._lock:
+            self.generation += 1
+            self.known_threats.navigate(url)
+            self.deferred = {}
+
+    def stale(self, generation):
+        """True when a navigation happened since `generation` was read"""
+        return generation is not None and generation != self.generation
+
+    # --- REPORTING ---
+    def log_threat(self, level, threat_type, target, action, reason, points=0):
+        if self.bus.active:
+            self.bus.publish(ThreatEvent(self.page.url, level, threat_type, target, action, reason, points))
+        if self.gui_callback:
+            # Format: LEVEL:::THREAT:::TARGET:::ACTION:::REASON
+            msg = f"{level}:::{threat_type}:::{target}:::{action}:::{reason}"
+            self.gui_callback("log", msg)
+
+    def update_risk_gui(self, score):
+        if self.bus.active:
+            self.bus.publish(ScoreEvent(self.page.url, score, risk_status(score)[0]))
+        if self.gui_callback:
+            self.gui_callback("score", score)
+
+    def report_scan(self, full, nodes, findings, flagged, timings, t_apply, t_start):
+        now = time.perf_counter()
+        timings["apply"], timings["total"] = now - t_apply, now - t_start
+        self.bus.publish(ScanCompleteEvent(self.page.url, full, len(nodes), len(findings), flagged,
+                                           {k: round(v * 1000, 2) for k, v in timings.items()}))
+
+    # --- SCORING ---
+    def findings(self, findings, generation=None):
+        """
+        Scores and logs every new threat. Returns (flagged, remediation): how many elements
+        still have to be remediated, and the REMEDIATE_JS argument for them (None when there
+        is nothing to apply or remediation is off, or the findings belong to an older document).
+        """
+        if self.stale(generation): return 0, None
+        flags, scored = [], False
+        for finding in findings:
+            new_element, new_threat = self.known_threats.add(finding["node"])
+            if not new_element: continue
+
+            # Same content as a threat already counted (or scored when its response was
+            # intercepted): remediate this element too, but score and log only once
+            if new_threat and not finding["node"].get("prescanned"):
+                METRICS.inc("threats_flagged")
+                scored = True
+                self.risk_score = min(100, self.risk_score + finding["points"])
+                level = "WARNING" if finding["silent"] else "CRITICAL"
+                action = "LOGGED" if finding["silent"] else "BLOCKED"
+                self.log_threat(level, finding["threat_type"], finding["target"], action, finding["reason"], finding["points"])
+            flags.append({"id": finding["node"]["id"], "color": finding["color"], "silent": finding["silent"],
+                          "threatType": finding["threat_type"], "defuse": finding.get("defuse", False)})
+        if not flags: return 0, None
+
+        if scored: self.update_risk_gui(self.risk_score)
+        if not self.remediate: return len(flags), None
+        status, color = risk_status(self.risk_score)
+        return len(flags), {"flags": flags, "hud": {"color": color, "score": self.risk_score, "status": status}}
+
+    def verdict(self, verdict, action):
+        """
+        Scores and logs the threats the network layer found (src/interceptor.py) in a response.
+        Their content is recorded too: when a script injects one of them later, the DOM scan
+        remediates the element without scoring it a second time.
+        """
+        # A document is fetched before it is committed; a script belongs to the current page
+        origin = origin_of(verdict["url"]) if verdict["kind"] == "document" else self.known_threats.origin
+        for threat in verdict["threats"]:
+            if threat.get("content"): self.known_threats.add_content(bytes.fromhex(threat["content"]), origin)
+            self.risk_score = min(100, self.risk_score + threat["points"])
+            self.log_threat(threat["level"], threat["threat_type"], threat["target"],
+                            "LOGGED" if threat["level"] == "WARNING" else action,
+                            f"{verdict['kind']} {verdict['url']}: {threat['reason']}", threat["points"])
+        self.update_risk_gui(self.risk_score)
+
+    # --- BUDGET ---
+    def passive(self, nodes, rules, brain, deadline, timings=None, generation=None):
+        """
+        Passive analysis of this snapshot plus whatever earlier scans deferred, until the
+        deadline; the rest carries over to the next call. Nothing is returned or carried
+        over when a navigation happened meanwhile.
+        """
+        with self._lock:
+            if self.stale(generation): return []
+            pending = dict(self.deferred)
+            generation = self.generation
+        pending.update((node["id"], node) for node in nodes)
+        findings, deferred = analyze_passive(list(pending.values()), rules, brain, deadline, timings=timings)
+        with self._lock:
+            if self.stale(generation): return []
+            self.deferred = {node["id"]: node for node in deferred}
+        if deferred:
+            METRICS.inc("budget_overruns")
+            METRICS.inc("passive_deferred", len(deferred))
+        return findings
+
+    def clear_deferred(self):
+        with self._lock:
+            self.deferred = {}
@@ -0,0 +1,112 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Case/whitespace-insensitive form: Tier 1 (TF-IDF), the trigger list and MiniLM all ignore both"""
+    return " ".join(text.lower().split())
+
+
+class VerdictCache:
+    """
+    Bounded LRU of (is_threat, confidence, reason) verdicts keyed on
+    sha1(version + normalized text). Optionally backed by a SQLite file so
+    warm restarts skip inference entirely.
+
+    The version string identifies the model/concept set that produced the
+    verdicts: calling set_version() with a new value drops every entry
+    (memory and disk) made under the old one.
+    """
+
+    def __init__(self, max_entries=50000, persist_path=None):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.version = ""
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+        self._db = None
+        if persist_path:
+            self._db = sqlite3.connect(persist_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, is_threat INTEGER, conf REAL, reason TEXT)")
+            self._db.commit()
+
+    def set_version(self, version):
+        with self._lock:
+            if version == self.version: return
+            self.version = version
+            self._entries.clear()
+            if self._db:
+                row = self._db.execute("SELECT v FROM meta WHERE k = 'version'").fetchone()
+                if not row or row[0] != version:
+                    self._db.execute("DELETE FROM verdicts")
+                    self._db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (version,))
+                    self._db.commit()
+
+    def _key(self, text):
+        return hashlib.sha1(f"{self.version}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts):
+        """Returns a list of verdicts (None for misses), in input order"""
+        keys = [self._key(t) for t in texts]
+        found = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                verdict = self._entries.get(key)
+                if verdict is not None:
+                    self._entries.move_to_end(key)
+                    found[i] = verdict
+
+            missing = [i for i, v in enumerate(found) if v is None]
+            if self._db and missing:
+                for i in missing:
+                    row = self._db.execute("SELECT is_threat, conf, reason FROM verdicts WHERE key = ?", (keys[i],)).fetchone()
+                    if row:
+                        found[i] = (bool(row[0]), row[1], row[2])
+                        self._store(keys[i], found[i])
+                        self.disk_hits += 1
+
+            hit_count = sum(1 for v in found if v is not None)
+            self.hits += hit_count
+            self.misses += len(texts) - hit_count
+        return found
+
+    def put_many(self, texts, verdicts):
+        rows = []
+        with self._lock:
+            for text, verdict in zip(texts, verdicts):
+                key = self._key(text)
+                self._store(key, verdict)
+                rows.append((key, int(verdict[0]), float(verdict[1]), verdict[2]))
+            if self._db and rows:
+                self._db.executemany("INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?)", rows)
+                self._db.commit()
+
+    def _store(self, key, verdict):
+        self._entries[key] = verdict
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db:
+                self._db.execute("DELETE FROM verdicts")
+                self._db.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+            "evictions": self.evictions, "disk_hits": self.disk_hits,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
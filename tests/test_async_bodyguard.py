@@ -0,0 +1,126 @@
+import asyncio
+
+from src.async_bodyguard import AsyncBrowserBodyguard, AsyncScanEngine
+from src.events import EventBus
+from src.page_scripts import SNAPSHOT_JS, REMEDIATE_JS, KIND_BUTTON
+
+
+class FakeFrame:
+    url = "https://bank.example/transfer"
+
+
+class FakePage:
+    """Just enough of playwright.async_api.Page: evaluate() answers SNAPSHOT_JS and records REMEDIATE_JS"""
+
+    def __init__(self, nodes=()):
+        self.url = FakeFrame.url
+        self.main_frame = FakeFrame()
+        self.handlers = {}
+        self.nodes = list(nodes)
+        self.remediations = []
+        self.closed = False
+        self.on_snapshot = None
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def add_init_script(self, script):
+        pass
+
+    async def evaluate(self, script, arg=None):
+        await asyncio.sleep(0)
+        if script == SNAPSHOT_JS:
+            if self.on_snapshot: self.on_snapshot()
+            return {"full": not arg, "nodes": list(self.nodes)}
+        if script == REMEDIATE_JS:
+            self.remediations.append(arg)
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+        self.handlers["close"](self)
+
+
+class NoThreatBrain:
+    def predict_batch(self, texts):
+        return [(False, 0.0, "stub") for _ in texts]
+
+
+def button(id, text="Confirm Transfer"):
+    return {"id": id, "tag": "button", "role": None, "kinds": KIND_BUTTON, "text": text, "placeholder": None,
+            "parentText": None, "style": None}
+
+
+def guard(page, **kwargs):
+    events = []
+    bus = EventBus()
+    bus.subscribe(events.append)
+    return asyncio.run(AsyncBrowserBodyguard.create(page, brain=NoThreatBrain(), bus=bus, **kwargs)), events
+
+
+def test_scan_scores_and_remediates_in_one_evaluate():
+    page = FakePage([button(1), button(2, "Read more")])
+    bodyguard, events = guard(page)
+    asyncio.run(bodyguard.scan_page())
+    assert bodyguard.risk_score > 0
+    assert [[flag["id"] for flag in r["flags"]] for r in page.remediations] == [[1]]
+    assert [e.type for e in events][-1] == "scan_complete"
+
+    # Already known: nothing new to score or remediate
+    asyncio.run(bodyguard.scan_page(budget=0.05))
+    assert len(page.remediations) == 1
+
+
+def test_an_empty_snapshot_still_reports_the_scan():
+    bodyguard, events = guard(FakePage())
+    asyncio.run(bodyguard.scan_page())
+    scans = [e for e in events if e.type == "scan_complete"]
+    assert len(scans) == 1 and scans[0].nodes == 0
+
+
+def test_findings_from_before_a_navigation_are_dropped():
+    page = FakePage([button(1)])
+    bodyguard, _ = guard(page)
+    # The page navigates while the snapshot round trip is in flight
+    page.on_snapshot = lambda: page.handlers["framenavigated"](page.main_frame)
+    asyncio.run(bodyguard.scan_page(budget=0.05))
+    assert page.remediations == [] and bodyguard.risk_score == 0
+    assert bodyguard._needs_full_scan
+
+
+def test_engine_guards_every_page_with_one_brain():
+    async def run():
+        engine = AsyncScanEngine(brain=NoThreatBrain(), interval=0.01)
+        pages = [FakePage([button(1)]), FakePage([button(1, "Authorize All")])]
+        guards = [await engine.guard_page(page) for page in pages]
+        assert await engine.guard_page(pages[0]) is guards[0]
+        assert all(g.brain is engine.brain and g.executor is engine.executor for g in guards)
+
+        await asyncio.sleep(0.05)
+        assert all(page.remediations for page in pages)
+
+        pages[0].close()
+        assert list(engine.guards) == [pages[1]]
+        await engine.scan_all()
+        await engine.stop()
+        assert engine._tasks == {}
+
+    asyncio.run(run())
+
+
+def test_engine_forces_a_full_rescan_every_heartbeat():
+    async def run():
+        engine = AsyncScanEngine(brain=NoThreatBrain(), interval=0.01, heartbeat=0.03)
+        page = FakePage([button(1)])
+        fulls = []
+        page.on_snapshot = lambda: fulls.append(engine.guards[page]._needs_full_scan)
+        await engine.guard_page(page)
+        await asyncio.sleep(0.2)
+        await engine.stop()
+        return fulls
+
+    fulls = asyncio.run(run())
+    # The first scan, then one full snapshot per heartbeat; incremental ones in between
+    assert fulls[0] and fulls.count(True) >= 2 and fulls.count(False) >= 2
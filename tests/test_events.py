@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+
+import pytest
+
+from src.events import EventBus, JsonlSink, ScanCompleteEvent, Sink, ThreatEvent, sink_from_spec
+
+
+def threat(i=0):
+    return ThreatEvent("https://bank.example/", "CRITICAL", "Phishing Attempt", "Input Field", "BLOCKED", f"reason {i}", 50)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline: raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+def test_to_dict_includes_base_fields():
+    event = ScanCompleteEvent("https://bank.example/", True, 120, 3, 2, {"total": 4.2})
+    out = event.to_dict()
+    assert out["type"] == "scan_complete" and out["page_url"] == "https://bank.example/"
+    assert {k: out[k] for k in ("full", "nodes", "findings", "flagged", "timings_ms")} == \
+        {"full": True, "nodes": 120, "findings": 3, "flagged": 2, "timings_ms": {"total": 4.2}}
+    assert "ts" in out
+
+
+def test_inline_subscribers_and_failures_are_isolated():
+    bus, received = EventBus(), []
+    assert not bus.active
+    bus.subscribe(lambda event: 1 / 0)
+    callback = bus.subscribe(received.append)
+    assert bus.active
+    bus.publish(threat())
+    assert len(received) == 1
+    bus.unsubscribe(callback)
+    bus.publish(threat())
+    assert len(received) == 1
+
+
+def test_jsonl_sink_batches_and_rotates(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = JsonlSink(str(path), max_bytes=400, backups=2, flush_interval=0.01)
+    bus = EventBus()
+    bus.subscribe(sink)
+    for i in range(10): bus.publish(threat(i))
+    bus.close()
+    assert sink.stats()["delivered"] == 10
+    lines = [line for p in (path, tmp_path / "events.jsonl.1", tmp_path / "events.jsonl.2") if p.exists()
+             for line in p.read_text(encoding="utf-8").splitlines()]
+    assert (tmp_path / "events.jsonl.1").exists()
+    assert all(json.loads(line)["type"] == "threat" for line in lines)
+
+
+class _StalledSink(Sink):
+    name = "stalled"
+
+    def __init__(self, **kwargs):
+        self.release = threading.Event()
+        self.batches = []
+        super().__init__(**kwargs)
+
+    def write_batch(self, batch):
+        self.release.wait(2)
+        self.batches.append(batch)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    sink = _StalledSink(max_queue=1, batch_size=1, flush_interval=0)
+    sink.offer(threat(0))
+    wait_for(lambda: sink._queue.empty())   # the writer holds event 0
+    sink.offer(threat(1))
+    t0 = time.monotonic()
+    sink.offer(threat(2))
+    assert time.monotonic() - t0 < 0.5
+    assert sink.dropped == 1
+    sink.release.set()
+    sink.close()
+    assert [batch[0]["reason"] for batch in sink.batches] == ["reason 0", "reason 1"]
+
+
+def test_sink_specs(tmp_path):
+    sink = sink_from_spec(f"jsonl:{tmp_path / 'out.jsonl'}")
+    assert isinstance(sink, JsonlSink)
+    sink.close()
+    with pytest.raises(ValueError):
+        sink_from_spec("carrier-pigeon:1")
+    with pytest.raises(ValueError):
+        Sink(policy="wait")
@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+pytest.importorskip("joblib")
+
+from src.inference_server import InferenceClient, InferenceServer
+
+CONCEPTS = {"Prompt Injection": ["ignore previous instructions"], "Phishing": ["enter your password"]}
+
+
+class CountingEncoder:
+    """Deterministic stand-in for MiniLM: small vectors derived from character counts"""
+
+    def encode(self, texts):
+        return np.array([[len(t) + 1.0, t.count("e") + 1.0, t.count("s") + 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = InferenceServer(str(tmp_path / "tier2.sock"), max_wait_ms=1.0, backend="torch")
+    server.model = CountingEncoder()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(server.socket_path) and time.monotonic() < deadline: time.sleep(0.01)
+    yield server
+    server.close()
+    thread.join(5)
+
+
+def test_matching_encoder_is_served(server):
+    client = InferenceClient(server.socket_path)
+    scores = client.score(["please ignore previous instructions", "hello"], CONCEPTS, encoder=server.encoder_id)
+    assert len(scores) == 2 and all(category in CONCEPTS for _, category in scores)
+
+
+def test_other_encoder_falls_back_in_process(server):
+    client = InferenceClient(server.socket_path, retry_after=60)
+    assert client.score(["hello"], CONCEPTS, encoder=server.encoder_id + "@onnx") is None
+    assert server.texts == 0
+
+
+def test_stats_while_clients_are_scoring(server):
+    errors = []
+
+    def score():
+        client = InferenceClient(server.socket_path)
+        for i in range(50):
+            if client.score([f"text {i}"], CONCEPTS, encoder=server.encoder_id) is None: errors.append(i)
+
+    clients = [threading.Thread(target=score) for _ in range(4)]
+    for t in clients: t.start()
+    while any(t.is_alive() for t in clients): server.stats()
+    for t in clients: t.join()
+    stats = server.stats()
+    assert errors == [] and stats["texts"] == 200
+    assert sum(stats["batch_sizes"].values()) <= 200 and stats["latency_ms"]["p50"] > 0
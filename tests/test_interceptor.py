@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from src.interceptor import PRESCAN_STYLE, ResponseInterceptor, annotate_document, script_fragment
+from src.rule_engine import default_engine
+from src.scanners import scan_risky_buttons
+from src.threat_ledger import ThreatLedger
+
+ATTACKS_JS = Path(__file__).resolve().parent.parent / "T4skforce client" / "attacks.js"
+
+
+class NoThreatBrain:
+    def predict_batch(self, texts):
+        return [(False, 0.0, "stub") for _ in texts]
+
+
+class FakePage:
+    url = "http://127.0.0.1:8000/index.html"
+
+
+def test_style_goes_after_head_not_header():
+    html = "<html><header>Bank</header><head><title>x</title></head><body><button>Authorize</button></body></html>"
+    threat = {"pos": (1, html.index("<button")), "tag": "button", "threat_type": "High-Risk Action", "level": "CRITICAL"}
+    out = annotate_document(html, [threat], block=True)
+    assert "<head>" + PRESCAN_STYLE in out
+    assert '<button data-aegis-prescan="High-Risk Action" data-aegis-blocked="true">' in out
+
+
+def test_script_literals_become_a_fragment():
+    fragment = script_fragment('el.innerHTML = `<button class="x">Authorize All</button>`; log("plain message text");')
+    assert '<button class="x">Authorize All</button>' in fragment
+    assert "<p>plain message text</p>" in fragment
+
+
+def test_threat_injected_by_an_intercepted_script_is_scored_once():
+    ledger = ThreatLedger(FakePage(), gui_callback=None)
+    ledger.navigate(FakePage.url)
+    interceptor = ResponseInterceptor(default_engine(), NoThreatBrain(), on_verdict=lambda v: ledger.verdict(v, "MARKED"))
+    verdict = interceptor.verdict("http://127.0.0.1:8000/attacks.js", "script", ATTACKS_JS.read_bytes())
+    button = next(t for t in verdict["threats"] if "Authorize All" in t["text"])
+    score = ledger.risk_score
+    assert score > 0
+
+    # What SNAPSHOT_JS reports once the script has injected the button
+    node = {"id": 41, "tag": "button", "role": None, "kinds": 1, "text": "Authorize All (3)", "placeholder": None,
+            "parentText": None, "style": None, "prescanned": False}
+    findings = scan_risky_buttons([node], default_engine())
+    assert findings and button["threat_type"] == findings[0]["threat_type"]
+    flagged, remediation = ledger.findings(findings)
+    assert flagged == 1 and remediation["flags"][0]["id"] == 41
+    assert ledger.risk_score == score
+
+
+def test_document_threats_apply_once_the_navigation_commits():
+    ledger = ThreatLedger(FakePage(), gui_callback=None)
+    ledger.navigate("about:blank")
+    html = b"<html><body><button>Authorize Transfer</button></body></html>"
+    verdict = ResponseInterceptor(default_engine(), NoThreatBrain()).verdict(FakePage.url, "document", html)
+    ledger.verdict(verdict, "MARKED")
+    ledger.navigate(FakePage.url)
+    node = {"id": 1, "tag": "button", "text": "Authorize Transfer", "placeholder": None}
+    assert ledger.known_threats.add(node) == (True, False)
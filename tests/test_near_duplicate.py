@@ -0,0 +1,55 @@
+import pytest
+
+from src.near_duplicate import NearDuplicateIndex, jaccard, shingles, template_of
+from src.rule_engine import default_engine
+
+THREAT = (True, 88.0, "Tier 2: injection")
+BENIGN = (False, 4.0, "Tier 2: benign")
+
+
+@pytest.fixture
+def index():
+    return NearDuplicateIndex(default_engine())
+
+
+def test_template_masks_variable_parts():
+    assert template_of("Node 12 heartbeat OK at 10:22:05") == "node # heartbeat ok at #"
+    assert template_of("> SRC: 192.168.0.44") == "> src: #"
+    assert template_of("HASH 8f4a2c9e1b") == "hash #"
+
+
+def test_same_template_reuses_the_verdict(index):
+    index.put_many(["Node 12 heartbeat OK at 10:22:05"], [BENIGN])
+    assert index.get_many(["Node 7 heartbeat OK at 23:59:59"]) == [BENIGN]
+
+
+def test_near_duplicate_above_threshold(index):
+    stored, variant = "Your order 1234 has shipped to the warehouse today", "Your order 99 has shipped to the warehouse now"
+    assert jaccard(shingles(template_of(stored)), shingles(template_of(variant))) >= index.threshold
+    index.put_many([stored], [BENIGN])
+    assert index.get_many([variant, "Completely unrelated sentence about kittens"]) == [BENIGN, None]
+    assert index.stats()["hits"] == 1 and index.stats()["misses"] == 1
+
+
+def test_gained_trigger_keyword_is_never_merged(index):
+    index.put_many(["Node 12 heartbeat OK"], [BENIGN])
+    assert index.get_many(["Node 12 heartbeat OK again"]) == [BENIGN]
+    assert index.get_many(["Node 12 heartbeat OK admin"]) == [None]
+
+
+def test_nothing_below_threshold(index):
+    index.put_many(["Please review the transfer request"], [THREAT])
+    assert index.get_many(["Please review the newsletter settings"]) == [None]
+
+
+def test_bounded_and_clear():
+    index = NearDuplicateIndex(default_engine(), max_entries=2)
+    index.put_many(["first line of text", "second line of text", "third line of text"], [BENIGN, BENIGN, THREAT])
+    assert index.stats()["entries"] == 2
+    index.clear()
+    assert index.stats()["entries"] == 0 and index.stats()["buckets"] == 0
+
+
+def test_bands_must_divide_slots():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(default_engine(), bands=3)
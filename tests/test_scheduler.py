@@ -0,0 +1,100 @@
+from src.scheduler import ScanScheduler
+
+
+class FakePage:
+    def __init__(self):
+        self.main_frame = object()
+        self.handlers = {}
+        self.bindings = {}
+        self.probe = {"dirty": 0, "full": False, "mutations": 0, "hidden": False}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def expose_binding(self, name, callback):
+        self.bindings[name] = callback
+
+    def evaluate(self, script):
+        return dict(self.probe)
+
+    def wait_for_timeout(self, ms):
+        pass
+
+
+class FakeGuard:
+    def __init__(self):
+        self.page = FakePage()
+        self.scans = []
+        self._needs_full_scan = False
+
+    def request_full_scan(self):
+        self._needs_full_scan = True
+
+    def scan_page(self, budget=None):
+        self.scans.append((budget, self._needs_full_scan))
+        self._needs_full_scan = False
+
+
+def scheduler(**kwargs):
+    guard = FakeGuard()
+    return guard, ScanScheduler(guard, **kwargs)
+
+
+def test_first_tick_is_a_full_budgeted_scan():
+    guard, sched = scheduler(budget=0.05)
+    assert sched.tick() == sched.min_interval
+    assert guard.scans == [(0.05, True)]
+
+
+def test_quiet_page_backs_off_to_max_interval():
+    guard, sched = scheduler(min_interval=0.1, max_interval=0.8)
+    sched.tick()
+    delays = [sched.tick() for _ in range(5)]
+    assert delays == [0.2, 0.4, 0.8, 0.8, 0.8]
+    assert len(guard.scans) == 1
+
+
+def test_dirty_nodes_scan_incrementally():
+    guard, sched = scheduler()
+    sched.tick()
+    sched.tick()
+    guard.page.probe["dirty"] = 3
+    assert sched.tick() == sched.min_interval
+    assert guard.scans[-1] == (sched.budget, False)
+
+
+def test_mutation_binding_and_navigation_wake_the_loop():
+    guard, sched = scheduler()
+    sched.tick()
+    guard.page.bindings["__aegisNotify"](None)
+    sched.tick()
+    assert len(guard.scans) == 2
+    guard.page.handlers["framenavigated"](guard.page.main_frame)
+    sched.tick()
+    assert guard.scans[-1] == (sched.budget, True)
+    guard.page.handlers["framenavigated"](object())   # a subframe
+    sched.tick()
+    assert len(guard.scans) == 3
+
+
+def test_hidden_tab_and_heartbeat():
+    guard, sched = scheduler(hidden_interval=5.0, heartbeat=0.0)
+    sched.tick()
+    guard.page.probe["hidden"] = True
+    assert sched.tick() == 5.0
+    assert guard.scans[-1] == (sched.budget, True)
+
+
+def test_busy_page_follows_the_mutation_rate():
+    guard, sched = scheduler(min_interval=0.01, max_interval=2.0)
+    sched.tick()
+    sched.mutation_rate = 4.0
+    sched._mutations = None   # keep the rate fixed for this tick
+    assert sched.tick() == 0.25
+
+
+def test_scan_cost_caps_the_duty_cycle(monkeypatch):
+    guard, sched = scheduler(min_interval=0.1, max_duty=0.5)
+    clock = iter([0.0, 1.0])   # the scan takes 1 s
+    monkeypatch.setattr("src.scheduler.time.perf_counter", lambda: next(clock))
+    assert abs(sched.tick() - 1.0) < 1e-9
@@ -0,0 +1,41 @@
+from src.threat_identity import ThreatIdentityIndex, content_hash
+
+
+def node(id, text="Confirm Transfer", tag="BUTTON", placeholder=None, overlay=None):
+    return {"id": id, "tag": tag, "text": text, "placeholder": placeholder, "overlay": overlay}
+
+
+def test_same_element_is_neither_new_element_nor_new_threat():
+    index = ThreatIdentityIndex()
+    assert index.add(node(1)) == (True, True)
+    assert index.add(node(1, text="🚫 BLOCKED THREAT 🚫")) == (False, False)
+
+
+def test_same_content_on_a_new_element_is_remediated_not_rescored():
+    index = ThreatIdentityIndex()
+    index.add(node(1))
+    assert index.add(node(2)) == (True, False)
+    assert index.add(node(3, text="Claim Prize")) == (True, True)
+
+
+def test_navigation_keeps_content_within_the_origin():
+    index = ThreatIdentityIndex()
+    index.navigate("https://bank.example/login")
+    index.add(node(1))
+    index.navigate("https://bank.example/home")
+    assert index.add(node(1)) == (True, False)
+    index.navigate("https://other.example/")
+    assert index.add(node(1)) == (True, True)
+
+
+def test_overlay_hash_covers_the_hijacked_control():
+    a = node(1, text="", tag="DIV", overlay={"controlTag": "BUTTON", "controlText": "Pay now"})
+    b = node(2, text="", tag="DIV", overlay={"controlTag": "BUTTON", "controlText": "Cancel"})
+    assert content_hash(a) != content_hash(b)
+
+
+def test_bounded():
+    index = ThreatIdentityIndex(max_entries=2)
+    for i in range(3): index.add(node(i, text=f"Transfer {i}"))
+    assert len(index) == 2
+    assert index.add(node(0, text="Transfer 0")) == (True, True)
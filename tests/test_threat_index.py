@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import src.threat_index as threat_index
+from src.threat_index import ThreatIndex
+
+DIM = 16
+
+
+def vectors(n, seed=0):
+    v = np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def bump_meta(path):
+    # Readers compare meta.json mtimes: make sure the writer's change is visible on coarse clocks
+    meta = os.path.join(path, "meta.json")
+    stat = os.stat(meta)
+    os.utime(meta, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ThreatIndex.create(str(tmp_path / "threats"), DIM, "test-encoder")
+    rows = vectors(400)
+    index.add(rows, ["Prompt Injection" if i % 2 else "Phishing" for i in range(400)], [f"exemplar {i}" for i in range(400)])
+    return index
+
+
+def brute_force(index, queries, k):
+    sims = queries @ np.asarray(index.vectors).T
+    return [[int(row) for row in np.argsort(-s, kind="stable")[:k]] for s in sims]
+
+
+def test_append_is_memory_mapped_and_labelled(index):
+    assert isinstance(index.vectors, np.memmap)
+    assert index.count == 400 and index.categories == ["Phishing", "Prompt Injection"]
+    hits = index.search(vectors(1, seed=0)[:1], k=1)[0]
+    assert hits[0][2] == 0 and hits[0][1] == "Phishing" and hits[0][0] == pytest.approx(1.0, abs=1e-5)
+    assert index.text(0) == "exemplar 0"
+
+
+def test_exact_top_k_matches_brute_force(index):
+    queries = vectors(20, seed=1)
+    expected = brute_force(index, queries, 5)
+    assert [[row for _, _, row in hits] for hits in index.search(queries, k=5)] == expected
+    for hits in index.search(queries, k=5):
+        scores = [score for score, _, _ in hits]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_ivf_probing_every_list_matches_brute_force(index, monkeypatch):
+    monkeypatch.setattr(threat_index, "IVF_MIN_ROWS", 0)
+    index.build_ivf(nlist=8)
+    index.nprobe = 8
+    queries = vectors(20, seed=2)
+    assert [[row for _, _, row in hits] for hits in index.search(queries, k=5)] == brute_force(index, queries, 5)
+
+
+def test_ivf_finds_stored_rows_and_rows_added_after_the_build(index, monkeypatch):
+    monkeypatch.setattr(threat_index, "IVF_MIN_ROWS", 0)
+    index.build_ivf(nlist=8)
+    index.nprobe = 1
+    assert index.stats()["ivf"]["active"]
+    stored = np.asarray(index.vectors[:50])
+    assert [hits[0][2] for hits in index.search(stored, k=1)] == list(range(50))
+
+    fresh = vectors(3, seed=3)
+    index.add(fresh, ["Data Exfiltration"] * 3, ["new 0", "new 1", "new 2"])
+    assert [hits[0][2] for hits in index.search(fresh, k=1)] == [400, 401, 402]
+
+
+def test_reader_picks_up_appended_exemplars(index):
+    reader = ThreatIndex(index.path, reload_interval=0)
+    assert not reader.maybe_reload()
+    fresh = vectors(2, seed=4)
+    index.add(fresh, ["Data Exfiltration"] * 2, ["new 0", "new 1"])
+    bump_meta(index.path)
+    assert reader.maybe_reload()
+    assert reader.count == 402 and reader.version != ""
+    hits = reader.search(fresh, k=1)
+    assert [(h[0][1], h[0][2]) for h in hits] == [("Data Exfiltration", 400), ("Data Exfiltration", 401)]
+    assert reader.text(401) == "new 1"
+
+
+def test_crashed_append_leaves_no_garbage_rows(index):
+    with open(os.path.join(index.path, "vectors.f32"), "ab") as f:
+        f.write(b"\xff" * DIM * 4 * 3)   # rows written, meta.json never bumped
+    fresh = vectors(1, seed=5)
+    index.add(fresh, ["Phishing"], ["after crash"])
+    assert index.count == 401
+    assert index.search(fresh, k=1)[0][0][2] == 400
+    assert os.path.getsize(os.path.join(index.path, "vectors.f32")) == 401 * DIM * 4
+
+
+def test_merge_only_replaces_strictly_better_concepts(index):
+    queries = np.asarray(index.vectors[:2])
+    merged = index.merge(queries, [(0.5, "Concept"), (1.5, "Concept")])
+    assert merged[0][1] == "Phishing" and merged[1] == (1.5, "Concept")
+
+
+def test_dimension_mismatch(index):
+    with pytest.raises(ValueError):
+        index.add(np.ones((1, DIM + 1), dtype=np.float32), ["Phishing"], ["x"])
@@ -0,0 +1,112 @@
+import time
+
+from src.events import EventBus
+from src.rule_engine import default_engine
+from src.scanners import PASSIVE_CHUNK, _finding
+from src.threat_ledger import ThreatLedger
+
+
+class FakePage:
+    url = "https://bank.example/transfer"
+
+
+class NoThreatBrain:
+    def predict_batch(self, texts):
+        return [(False, 0.0, "stub") for _ in texts]
+
+
+def node(id, text="Confirm Transfer", prescanned=False):
+    return {"id": id, "tag": "button", "role": None, "kinds": 1, "text": text, "placeholder": None,
+            "parentText": None, "style": None, "prescanned": prescanned}
+
+
+def button(n, points=30):
+    return _finding(n, "Button: 'CONFIRM...'", "red", False, points, "High-Risk Action", "Risky keyword")
+
+
+def ledger(**kwargs):
+    log, events = [], []
+    bus = EventBus()
+    bus.subscribe(events.append)
+    return ThreatLedger(FakePage(), gui_callback=lambda kind, data: log.append((kind, data)), bus=bus, **kwargs), log, events
+
+
+def test_new_threat_is_scored_logged_and_remediated():
+    book, log, events = ledger()
+    flagged, remediation = book.findings([button(node(1))])
+    assert flagged == 1 and book.risk_score == 30
+    assert remediation["flags"] == [{"id": 1, "color": "red", "silent": False, "threatType": "High-Risk Action", "defuse": False}]
+    assert remediation["hud"]["score"] == 30
+    assert log[0] == ("log", "CRITICAL:::High-Risk Action:::Button: 'CONFIRM...':::BLOCKED:::Risky keyword")
+    assert log[1] == ("score", 30)
+    assert [e.type for e in events] == ["threat", "score"]
+
+
+def test_same_content_elsewhere_is_remediated_but_scored_once():
+    book, log, _ = ledger()
+    book.findings([button(node(1))])
+    flagged, remediation = book.findings([button(node(1)), button(node(2))])
+    assert flagged == 1 and [f["id"] for f in remediation["flags"]] == [2]
+    assert book.risk_score == 30 and len(log) == 2
+
+
+def test_prescanned_elements_are_remediated_without_rescoring():
+    book, log, _ = ledger()
+    flagged, remediation = book.findings([button(node(1, prescanned=True))])
+    assert flagged == 1 and remediation is not None
+    assert book.risk_score == 0 and log == []
+
+
+def test_remediate_off_scores_without_a_payload():
+    book, log, _ = ledger(remediate=False)
+    assert book.findings([button(node(1), points=80), button(node(2, "Authorize All"), points=80)]) == (2, None)
+    assert book.risk_score == 100
+
+
+def test_interceptor_verdicts():
+    book, log, _ = ledger()
+    book.verdict({"url": "https://bank.example/app.js", "kind": "script", "threats": [
+        {"level": "CRITICAL", "threat_type": "Prompt Injection", "target": "Text Block", "reason": "r", "points": 20},
+        {"level": "WARNING", "threat_type": "Hidden CSS Attack", "target": "Hidden Text Node", "reason": "r", "points": 15},
+    ]}, "MARKED")
+    assert book.risk_score == 35
+    assert [entry[1].split(":::")[3] for entry in log if entry[0] == "log"] == ["MARKED", "LOGGED"]
+
+
+def test_budget_carries_passive_work_over_and_navigation_drops_it():
+    book, _, _ = ledger()
+    texts = [dict(node(i, f"paragraph number {i} with plain text"), kinds=4) for i in range(PASSIVE_CHUNK * 3)]
+    book.passive(texts, default_engine(), NoThreatBrain(), deadline=time.perf_counter() - 1)
+    assert len(book.deferred) == PASSIVE_CHUNK * 2
+    book.passive([], default_engine(), NoThreatBrain(), deadline=None)
+    assert book.deferred == {}
+    book.passive(texts, default_engine(), NoThreatBrain(), deadline=time.perf_counter() - 1)
+    book.navigate("https://bank.example/other")
+    assert book.deferred == {}
+
+
+def test_results_from_before_a_navigation_are_dropped():
+    book, log, _ = ledger()
+    generation = book.generation
+    book.navigate("https://bank.example/other")
+    assert book.findings([button(node(1))], generation) == (0, None)
+    assert book.risk_score == 0 and log == []
+
+    texts = [dict(node(i, f"paragraph number {i} with plain text"), kinds=4) for i in range(PASSIVE_CHUNK * 2)]
+    assert book.passive(texts, default_engine(), NoThreatBrain(), time.perf_counter() - 1, generation=generation) == []
+    assert book.deferred == {}
+
+
+def test_navigation_during_passive_analysis_drops_its_carry_over():
+    book, _, _ = ledger()
+
+    class NavigatingBrain(NoThreatBrain):
+        def predict_batch(self, texts):
+            book.navigate("https://bank.example/other")
+            return super().predict_batch(texts)
+
+    hidden = {"opacity": "0", "fontSize": "16px", "position": "static", "left": "0px"}
+    texts = [dict(node(i, f"hidden paragraph {i}"), kinds=8, style=hidden) for i in range(PASSIVE_CHUNK * 2)]
+    assert book.passive(texts, default_engine(), NavigatingBrain(), time.perf_counter() - 1,
+                        generation=book.generation) == []
+    assert book.deferred == {}